@@ -0,0 +1,396 @@
+# lib/audit.sh — project git-hook audit for `dotconfigs status`
+# Sourced by dotconfigs entry point.
+# Depends on: jq, git, expand_tilde and _have_wait_n (deploy.sh), registry_paths,
+# registry_needs_redeploy and hook_source_hashes (registry.sh), fleet_deploy
+# (fleet.sh) for --fix-stale. Colour vars (COLOUR_*, SYMBOL_*) come from
+# init_colours; plain text if unset.
+#
+# Walks the project registry and reports, per repo, whether the dotconfigs git
+# hooks are in place (missing/dangling/stale), covered by central core.hooksPath,
+# or untuned. A hook is stale when its content differs from the current source:
+# template seeding and old deploys can leave copies behind that no longer
+# follow the catalogue. Each worker hashes all of a repo's installed hooks with
+# one `git hash-object`. With hundreds of registered repos — many on slow network home dirs —
+# a serial walk takes tens of seconds, so:
+#   - repos are audited concurrently by a bounded worker pool (AUDIT_JOBS), each
+#     under a watchdog (AUDIT_TIMEOUT seconds) so one stalled mount can't hang
+#     `status`; results are merged back in registry order;
+#   - results are cached in AUDIT_CACHE keyed by each repo's .git/hooks and
+#     .git/config mtimes (one `stat` call covers every repo), so an unchanged
+#     repo costs no worker at all.
+
+AUDIT_JOBS="${DOTCONFIGS_AUDIT_JOBS:-8}"
+AUDIT_TIMEOUT="${DOTCONFIGS_AUDIT_TIMEOUT:-5}"
+
+# Collect the expected hooks that are absent from hookdir or differ from their
+# source into caller-scoped `problems` (" missing:<name> dangling:<name>
+# stale:<name> ..."). The hooks present are hashed in one batch (hash-object
+# follows symlinks, so a link into the checkout hashes as its source).
+# Args: hookdir, expected ("<name>\t<source blob sha>" lines; "" sha: unchecked)
+_hook_dir_problems() {
+    local hookdir="$1" name hash target i=0
+    local -a present=() want=()
+    problems=""
+    while IFS=$'\t' read -r name hash; do
+        [[ -z "$name" ]] && continue
+        target="$hookdir/$name"
+        if [[ ! -e "$target" ]]; then
+            # -e follows symlinks: a dangling symlink is also caught here.
+            if [[ -L "$target" ]]; then
+                problems="$problems dangling:$name"
+            else
+                problems="$problems missing:$name"
+            fi
+        elif [[ -n "$hash" ]]; then
+            present+=("$name")
+            want+=("$hash")
+        fi
+    done <<< "$2"
+    [[ ${#present[@]} -gt 0 ]] || return 0
+    while IFS= read -r hash; do
+        [[ -n "$hash" && "$hash" != "${want[i]}" ]] && problems="$problems stale:${present[i]}"
+        i=$((i + 1))
+    done < <(printf '%s\n' "${present[@]/#/$hookdir/}" | git hash-object --stdin-paths 2>/dev/null || true)
+}
+
+# Print one audit entry: OK, or the problem list plus a fix hint. Plain printf
+# with the colour vars (no $(colour_*) subshells) — this runs once per repo.
+# Args: label, problems, fix_command
+_print_hook_audit() {
+    if [[ -z "$2" ]]; then
+        printf "  %b%s%b %s\n" "${COLOUR_GREEN:-}" "${SYMBOL_OK:-}" "${COLOUR_RESET:-}" "$1"
+        return 0
+    fi
+    printf "  %b%s%b %s\n" "${COLOUR_RED:-}" "${SYMBOL_MISSING:-}" "${COLOUR_RESET:-}" "$1"
+    local p
+    for p in $2; do
+        printf "      %b%s%b %s\n" "${COLOUR_RED:-}" "${p%%:*}" "${COLOUR_RESET:-}" "${p#*:}"
+    done
+    printf "      %bfix: %s%b\n" "${COLOUR_YELLOW:-}" "$3" "${COLOUR_RESET:-}"
+}
+
+# Audit one repo; print its record as "kind|problems|tuning":
+#   kind     gone | central | hooks
+#   problems " missing:<name> dangling:<name> stale:<name>" (hooks kind only)
+#   tuning   "untuned" when git/config/perf-profile is not deployed
+# `|`-separated because IFS tab/space would collapse the empty fields.
+# Args: repo, expected, central_global
+_audit_repo() {
+    local repo="$1" expected="$2" central_global="$3" problems="" tuning=""
+    if [[ ! -d "$repo/.git" ]]; then
+        printf 'gone||\n'
+        return 0
+    fi
+    [[ -e "$repo/.git/dotconfigs-perf.gitconfig" ]] || tuning="untuned"
+    if [[ "$central_global" == "true" || -e "$repo/.git/dotconfigs-hooks-path.gitconfig" ]]; then
+        printf 'central||%s\n' "$tuning"
+        return 0
+    fi
+    _hook_dir_problems "$repo/.git/hooks" "$expected"
+    printf 'hooks|%s|%s\n' "$problems" "$tuning"
+}
+
+# Run _audit_repo under a watchdog, writing the record to out (or a `timeout`
+# record if it overruns). Meant to be backgrounded by the pool. The watchdog
+# signals this worker rather than the audit itself: `wait` returns as soon as a
+# trapped signal arrives, so a repo stuck in an uninterruptible stat on a hung
+# mount is abandoned instead of holding up `status`.
+# Args: out, timeout, repo, expected, central_global
+_audit_repo_bounded() {
+    local out="$1" timeout="$2"; shift 2
+    # BASHPID is bash >= 4; on 3.2 ask a child for its parent (this subshell).
+    local self="${BASHPID:-}"
+    [[ -n "$self" ]] || self=$(exec sh -c 'echo "$PPID"')
+
+    local timed_out="" inner dog
+    trap 'timed_out=1' USR1
+    # Job control puts the worker in a process group of its own, so a timeout
+    # can kill the git/jq it is waiting on along with it (setsid isn't on macOS).
+    set -m
+    _audit_repo "$@" < /dev/null > "$out.part" 2>/dev/null &
+    inner=$!
+    set +m
+    (
+        trap 'kill "$sp" 2>/dev/null; exit 0' TERM
+        sleep "$timeout" & sp=$!
+        wait "$sp"
+        kill -USR1 "$self" 2>/dev/null
+    ) </dev/null >/dev/null 2>&1 &
+    dog=$!
+
+    # `|| true` throughout: `set -e` is inherited by this subshell, and an
+    # interrupted wait or an already-gone pid must not abort the record write.
+    wait "$inner" 2>/dev/null || true
+    kill "$dog" 2>/dev/null || true
+    if [[ -n "$timed_out" ]]; then
+        kill -- -"$inner" 2>/dev/null || true
+        printf 'timeout||\n' > "$out"
+    else
+        mv "$out.part" "$out" 2>/dev/null || true
+    fi
+    return 0
+}
+
+# One `stat` for every repo's .git/hooks and .git/config (GNU or BSD flavour),
+# as "<mtime> <path>" lines. Paths that don't exist are simply absent.
+# Args: repo...
+_audit_stat_all() {
+    local repo
+    local -a paths=()
+    for repo in "$@"; do
+        paths+=("$repo/.git/hooks" "$repo/.git/config")
+    done
+    # stat exits non-zero when any path is missing; under `set -e` in the
+    # caller's pipeline that would cut the output short.
+    if stat -c '%Y' / >/dev/null 2>&1; then
+        stat -c '%Y %n' "${paths[@]}" 2>/dev/null || true
+    else
+        stat -f '%m %N' "${paths[@]}" 2>/dev/null || true
+    fi
+}
+
+# One "<hooks mtime>|<config mtime>|<needs redeploy>|<cached record>" row per
+# repo, in the order given: a single awk join of the batched stat, the cache
+# body and the needs-redeploy list. Looking each repo up in those tables from
+# bash costs a scan of the table per repo, so a few hundred repos took seconds
+# even when every one was a cache hit.
+# Args: cache file ("" if unusable), needs-redeploy lines, repo...
+_audit_join() {
+    local cache="$1" stale="$2"; shift 2
+    {
+        _audit_stat_all "$@"
+        printf -- '--stale\n%s\n--repos\n' "$stale"
+        printf '%s\n' "$@"
+    } | _AUDIT_CACHE_FILE="$cache" awk '
+        BEGIN {
+            # Cache body lines: "<stamp>|<kind>|<problems>|<tuning>|<repo>" —
+            # repo last, so a `|` in a path lands whole in the final field.
+            f = ENVIRON["_AUDIT_CACHE_FILE"]
+            if (f != "") {
+                getline line < f
+                while ((getline line < f) > 0) {
+                    rec = line; repo = line
+                    for (k = 1; k <= 4; k++) repo = substr(repo, index(repo, "|") + 1)
+                    cached[repo] = substr(rec, 1, length(rec) - length(repo) - 1)
+                }
+            }
+        }
+        $0 == "--stale" { sec = "stale"; next }
+        $0 == "--repos" { sec = "repos"; next }
+        $0 == ""        { next }
+        sec == "" {
+            sp = index($0, " ")
+            mtime[substr($0, sp + 1)] = substr($0, 1, sp - 1)
+            next
+        }
+        sec == "stale" {
+            tab = index($0, "\t")
+            why[substr($0, 1, tab - 1)] = substr($0, tab + 1)
+            next
+        }
+        {
+            print mtime[$0 "/.git/hooks"] "|" mtime[$0 "/.git/config"] "|" why[$0] "|" cached[$0]
+        }
+    '
+}
+
+# Look up key in a "\n<key>\t<value>\n..." string (bash 3.2 has no associative
+# arrays); sets caller-scoped `_hit` to the value, or "" when absent. Cut the
+# head off with `%%` and slice past it: `${1#*<key>}` re-matches `*` from the
+# start for every candidate end, which is quadratic in the table's length.
+# Args: table, key
+_audit_lookup() {
+    local head="${1%%$'\n'"$2"$'\t'*}"
+    if [[ "$head" == "$1" ]]; then
+        _hit=""
+    else
+        _hit="${1:${#head}+${#2}+2}"
+        _hit="${_hit%%$'\n'*}"
+    fi
+}
+
+# Audit every registered repo's git hooks against the git plugin's project
+# include list. Prints a per-repo OK/missing/dangling/stale summary, and leaves
+# the repos with stale hooks in AUDIT_STALE ("<repo>\t<name> <name>..." lines)
+# for --fix-stale. Repos that no
+# longer exist are reported as gone (registry left intact — `dotconfigs projects
+# prune` drops them).
+#
+# Central hooks mode (git/config/hooks-path): git ignores .git/hooks once
+# core.hooksPath points at the dotconfigs hook directory, so that one directory
+# is verified once instead of every repo's copies — globally when ~/.gitconfig
+# carries it, else per repo that has the include deployed.
+#
+# Repos without the git/config/perf-profile fragment deployed are marked
+# "(untuned)", and repos whose selection or the catalogue changed since their
+# last deploy "(needs redeploy: <why>)" — each with one hint at the end.
+audit_project_hooks() {
+    local repo
+    local -a repos=()
+    while IFS= read -r repo; do
+        repos+=("$repo")
+    done < <(registry_paths)
+    [[ ${#repos[@]} -gt 0 ]] || return 0
+
+    AUDIT_STALE=""
+    # Expected hooks, with the blob hash of each current source.
+    local expected; expected=$(hook_source_hashes)
+    [[ -z "$expected" ]] && return 0
+
+    printf "%b%s%b\n" "${COLOUR_CYAN:-}" "project git-hook audit" "${COLOUR_RESET:-}"
+
+    local central="~/.dotconfigs/git-template/hooks"
+    local central_abs; central_abs=$(expand_tilde "$central")
+    local global_path
+    global_path=$(git config --global --includes --get core.hooksPath 2>/dev/null || true)
+    local central_global="false"
+    if [[ "$global_path" == "$central" || "$global_path" == "$central_abs" ]]; then
+        central_global="true"
+    fi
+
+    # The cache is only valid for the same checkout, hook sources and global
+    # mode: editing a hook source invalidates every repo's record.
+    local key="# v2|$REPO_ROOT|$central_global|${expected//[$'\t\n']/,}"
+    local cache_file="" line
+    if [[ -f "$AUDIT_CACHE" ]]; then
+        IFS= read -r line < "$AUDIT_CACHE" || true
+        [[ "$line" == "$key" ]] && cache_file="$AUDIT_CACHE"
+    fi
+
+    # Indexed "needs redeploy" query: not cached (it is keyed on deploy.json
+    # content, not on the .git mtimes the cache tracks) but cheap — a few forks.
+    local stale; stale=$(registry_needs_redeploy)
+
+    # Decide per repo: cache hit, or queue for a worker. A stamp is only
+    # trusted when both mtimes are older than this second (same-second edits
+    # would be invisible to a 1s-resolution mtime).
+    local now="${EPOCHSECONDS:-$(date +%s)}"
+    local i=0 hooks_m config_m why rec stamp kind problems tuning
+    local -a stamp_of=() why_of=() result=() queue=()
+    while IFS='|' read -r hooks_m config_m why rec; do
+        hooks_m="${hooks_m:--}"
+        stamp=""
+        if [[ -n "$config_m" && "$config_m" -lt "$now" ]] \
+           && [[ "$hooks_m" == "-" || "$hooks_m" -lt "$now" ]]; then
+            stamp="$hooks_m:$config_m"
+        fi
+        stamp_of[i]="$stamp"
+        why_of[i]="$why"
+        if [[ -n "$stamp" && "${rec%%|*}" == "$stamp" ]]; then
+            result[i]="${rec#*|}"
+        else
+            queue+=("$i")
+        fi
+        i=$((i + 1))
+    done < <(_audit_join "$cache_file" "$stale" "${repos[@]}")
+
+    # Bounded worker pool. `wait -n` (bash >= 4.3) refills a slot as soon as any
+    # worker finishes; older bash drains each full batch before starting more.
+    if [[ ${#queue[@]} -gt 0 ]]; then
+        local tmp; tmp=$(mktemp -d "${TMPDIR:-/tmp}/dotconfigs-audit.XXXXXX")
+        local running=0 wait_n="false"
+        _have_wait_n && wait_n="true"
+        for i in "${queue[@]}"; do
+            _audit_repo_bounded "$tmp/$i" "$AUDIT_TIMEOUT" "${repos[i]}" "$expected" "$central_global" &
+            running=$((running + 1))
+            if [[ "$running" -ge "$AUDIT_JOBS" ]]; then
+                if [[ "$wait_n" == "true" ]]; then
+                    wait -n || true
+                    running=$((running - 1))
+                else
+                    wait || true
+                    running=0
+                fi
+            fi
+        done
+        wait || true
+        for i in "${queue[@]}"; do
+            result[i]="timeout||"
+            [[ -s "$tmp/$i" ]] && IFS= read -r result[i] < "$tmp/$i"
+        done
+        rm -rf "$tmp"
+    fi
+
+    # Merge in registry order.
+    local central_done="false" untuned=0 outdated=0 body="" names p
+    for i in "${!repos[@]}"; do
+        repo="${repos[i]}"
+        IFS='|' read -r kind problems tuning <<< "${result[i]}"
+        if [[ -n "${stamp_of[i]}" && "$kind" != "timeout" ]]; then
+            body+="${stamp_of[i]}|${result[i]}|$repo"$'\n'
+        fi
+        case "$kind" in
+            gone)
+                printf "  %b%s%b %s %s\n" "${COLOUR_YELLOW:-}" "${SYMBOL_DRIFT:-}" "${COLOUR_RESET:-}" "$repo" "(gone — no .git)"
+                continue ;;
+            timeout)
+                printf "  %b%s%b %s %s\n" "${COLOUR_YELLOW:-}" "${SYMBOL_DRIFT:-}" "${COLOUR_RESET:-}" "$repo" "(timed out after ${AUDIT_TIMEOUT}s — not audited)"
+                continue ;;
+        esac
+        [[ "$tuning" == "untuned" ]] && untuned=$((untuned + 1))
+        tuning="${tuning:+ ($tuning)}"
+        why="${why_of[i]}"
+        if [[ -n "$why" ]]; then
+            outdated=$((outdated + 1))
+            tuning+=" (needs redeploy: $why)"
+        fi
+        if [[ "$kind" == "central" ]]; then
+            if [[ "$central_done" != "true" ]]; then
+                _hook_dir_problems "$central_abs" "$expected"
+                _print_hook_audit "central hooks: $central" "$problems" "dotconfigs deploy"
+                central_done="true"
+            fi
+            printf "  %b%s%b %s %s%s\n" "${COLOUR_GREEN:-}" "${SYMBOL_OK:-}" "${COLOUR_RESET:-}" "$repo" "(central hooks)" "$tuning"
+            continue
+        fi
+        if [[ "$problems" == *" stale:"* ]]; then
+            names=""
+            for p in $problems; do
+                [[ "$p" == stale:* ]] && names+="${names:+ }${p#stale:}"
+            done
+            AUDIT_STALE+="$repo"$'\t'"$names"$'\n'
+            _print_hook_audit "$repo$tuning" "$problems" "dotconfigs status --fix-stale"
+        else
+            _print_hook_audit "$repo$tuning" "$problems" "dotconfigs deploy $repo"
+        fi
+    done
+    if [[ "$untuned" -gt 0 ]]; then
+        printf "  %b%d repo(s) untuned: enable git.config.perf-profile in <repo>/.dotconfigs/deploy.json, then: dotconfigs deploy <repo>%b\n" \
+            "${COLOUR_YELLOW:-}" "$untuned" "${COLOUR_RESET:-}"
+    fi
+    if [[ "$outdated" -gt 0 ]]; then
+        printf "  %b%d repo(s) need redeploy: dotconfigs deploy <repo> (see: dotconfigs projects list)%b\n" \
+            "${COLOUR_YELLOW:-}" "$outdated" "${COLOUR_RESET:-}"
+    fi
+    echo ""
+
+    # Rewrite the cache only when a worker produced something new.
+    if [[ ${#queue[@]} -gt 0 ]]; then
+        mkdir -p "$(dirname "$AUDIT_CACHE")" 2>/dev/null || return 0
+        { printf '%s\n' "$key"; printf '%s' "$body"; } > "$AUDIT_CACHE.tmp.$$" \
+            && mv "$AUDIT_CACHE.tmp.$$" "$AUDIT_CACHE"
+    fi
+    return 0
+}
+
+# `status --fix-stale`: move each stale hook copy the audit found aside (as
+# <hook>.bak.<timestamp>, like a deploy conflict's [b]ackup) and redeploy just
+# those repos through the fleet pool, so the hooks are linked afresh.
+audit_fix_stale() {
+    if [[ -z "$AUDIT_STALE" ]]; then
+        echo "No stale hooks."
+        return 0
+    fi
+    local stamp repo names name
+    local -a repos=()
+    stamp=$(date +%Y%m%d-%H%M%S)
+    while IFS=$'\t' read -r repo names; do
+        [[ -z "$repo" ]] && continue
+        for name in $names; do
+            mv "$repo/.git/hooks/$name" "$repo/.git/hooks/$name.bak.$stamp" || return 1
+            echo "  Backed up stale $repo/.git/hooks/$name"
+        done
+        repos+=("$repo")
+    done <<< "$AUDIT_STALE"
+    fleet_deploy false false "${repos[@]}"
+}
@@ -0,0 +1,75 @@
+# lib/completion.sh — candidate cache for the bash/zsh completion scripts
+# Sourced by dotconfigs entry point.
+# Depends on: discover_plugins (discovery.sh), registry_paths (registry.sh).
+#
+# The completion scripts (plugins/shell/completions/) run on every <Tab>, so they
+# never call dotconfigs, jq or find: they only read $COMPLETION_CACHE, a small
+# tab-separated file written here:
+#   cmd     <subcommand>
+#   flag    <subcommand>  <--option>
+#   arg     <subcommand>  <fixed positional word>
+#   plugin  <plugin name>
+#   project <registered repo path>
+# completion_cache_refresh rewrites it after any init or deploy that left it
+# older than the catalogue, the registry or this file.
+
+_COMPLETION_COMMANDS="setup init deploy watch undeploy cleanup status validate list projects trace hooks help"
+
+# "<subcommand> <word>..." per line: that subcommand's options, and its fixed
+# positional words. Keep in step with the cmd_* argument parsers.
+_COMPLETION_FLAGS='init --force
+deploy --dry-run --force --all-projects --jobs --json
+watch --poll --force
+undeploy --apply --dry-run --json
+cleanup --apply --dry-run --json
+status --no-projects --fix-stale --prompt --json
+validate --strict
+projects --apply --dry-run
+hooks --repo --hook'
+_COMPLETION_ARGS='projects list prune gc
+trace report
+hooks stats'
+
+# Write the cache (atomically: a <Tab> mid-write reads the old file).
+completion_cache_write() {
+    local tmp cmd word plugin path line
+    mkdir -p "${COMPLETION_CACHE%/*}" 2>/dev/null || return 0
+    tmp=$(mktemp "$COMPLETION_CACHE.XXXXXX" 2>/dev/null) || return 0
+    {
+        for cmd in $_COMPLETION_COMMANDS; do
+            printf 'cmd\t%s\n' "$cmd"
+        done
+        while read -r cmd line; do
+            for word in $line; do
+                printf 'flag\t%s\t%s\n' "$cmd" "$word"
+            done
+        done <<< "$_COMPLETION_FLAGS"
+        while read -r cmd line; do
+            for word in $line; do
+                printf 'arg\t%s\t%s\n' "$cmd" "$word"
+            done
+        done <<< "$_COMPLETION_ARGS"
+        while IFS= read -r plugin; do
+            printf 'plugin\t%s\n' "$plugin"
+        done < <(discover_plugins "$PLUGINS_DIR")
+        if [[ -s "$PROJECT_REGISTRY" ]]; then
+            while IFS= read -r path; do
+                [[ -n "$path" ]] && printf 'project\t%s\n' "$path"
+            done < <(registry_paths)
+        fi
+    } > "$tmp"
+    mv -f "$tmp" "$COMPLETION_CACHE"
+}
+
+# Rewrite the cache if it is missing or older than anything it is built from.
+completion_cache_refresh() {
+    local src
+    if [[ -f "$COMPLETION_CACHE" ]]; then
+        for src in "$PLUGINS_DIR"/*/manifest.json "$PROJECT_REGISTRY" "${BASH_SOURCE[0]}"; do
+            [[ "$src" -nt "$COMPLETION_CACHE" ]] && break
+            src=""
+        done
+        [[ -n "$src" ]] || return 0
+    fi
+    completion_cache_write
+}
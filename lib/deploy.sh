@@ -1,6 +1,7 @@
 # lib/deploy.sh — Generic JSON-driven deployment engine
 # Sourced by dotconfigs entry point.
-# Depends on: lib/symlinks.sh (backup_and_link, is_dotconfigs_owned, link_file)
+# Depends on: lib/symlinks.sh (backup_and_link, is_dotconfigs_owned, link_file);
+# lib/events.sh (event_item, event_run_item) in --json mode only.
 
 # Check if jq is installed
 # Returns: 0 if installed, 1 with install instructions if not
@@ -25,6 +26,30 @@ expand_tilde() {
     echo "${1/#\~/$HOME}"
 }
 
+# Wall-clock milliseconds via stdout. EPOCHREALTIME (bash 5) costs no fork; GNU
+# date +%N next; BSD date has no %N, so whole seconds there.
+_now_ms() {
+    local t
+    if [[ -n "${EPOCHREALTIME:-}" ]]; then
+        t="${EPOCHREALTIME/[.,]/}"
+        echo "${t:0:${#t}-3}"
+        return 0
+    fi
+    t=$(date +%s%N)
+    if [[ "$t" == *N ]]; then
+        echo "$(( ${t%N} * 1000 ))"
+    else
+        echo "${t:0:${#t}-6}"
+    fi
+}
+
+# True when `wait -n` is available (bash >= 4.3), so a worker pool can refill a
+# slot as soon as any worker finishes instead of draining whole batches.
+_have_wait_n() {
+    [[ "${BASH_VERSINFO[0]}" -gt 4 ]] \
+        || [[ "${BASH_VERSINFO[0]}" -eq 4 && "${BASH_VERSINFO[1]}" -ge 3 ]]
+}
+
 # Resolve a manifest source (repo-relative or already absolute) to an absolute
 # path against the repo root. Args: source, dotconfigs_root
 _abs_source() {
@@ -212,6 +237,10 @@ _managed_block_remove() {
 # Args: plugins_dir
 _merged_manifest() {
     local plugins_dir="$1" merged="{}" d name
+    if [[ -n "${_COMPILED_CATALOGUE:-}" && "${_COMPILED_CATALOGUE_DIR:-}" == "$plugins_dir" ]]; then
+        printf '%s' "$_COMPILED_CATALOGUE"
+        return 0
+    fi
     for d in "$plugins_dir"/*/; do
         [[ -f "${d}manifest.json" ]] || continue
         name=$(basename "$d")
@@ -220,78 +249,223 @@ _merged_manifest() {
     printf '%s' "$merged"
 }
 
+# Merge the catalogue once and pin it for the rest of this process (and any
+# subshell workers it forks): later _merged_manifest calls for the same
+# plugins_dir return it without re-reading a manifest. Used where one run walks
+# many repos (deploy --all-projects). Args: plugins_dir
+compile_catalogue() {
+    _COMPILED_CATALOGUE=""
+    _COMPILED_CATALOGUE=$(_merged_manifest "$1") || return 1
+    _COMPILED_CATALOGUE_DIR="$1"
+}
+
 # Resolve the deployment plan for a scope: join the merged catalogue with the
 # selection (deploy.json) and emit one TSV row per (item, scope-matching target):
 #   enabled<TAB>source<TAB>target<TAB>method<TAB>label
 # label is "<plugin>/<category>/<name>". Scope is "machine" (~/absolute targets)
 # or "project" (relative targets). enabled is the deploy.json bool (false when
-# the item is absent from the selection).
+# the item is absent from the selection). A `library` item (a file the category's
+# other items source) is not in the selection: it is enabled whenever any of
+# them is, so a selection written before the library existed still deploys it.
 # Args: plugins_dir, deploy_json, scope
 resolve_plan() {
     local plugins_dir="$1" deploy_json="$2" scope="$3"
-    local merged sel
+    local merged sel_file="$deploy_json"
     merged=$(_merged_manifest "$plugins_dir") || return 1
-    sel="{}"; [[ -f "$deploy_json" ]] && sel=$(cat "$deploy_json")
-    jq -rn --argjson m "$merged" --argjson sel "$sel" --arg scope "$scope" '
-        $m | to_entries[] as $p
+    [[ -f "$sel_file" ]] || sel_file=/dev/null
+    # The catalogue goes in on stdin and the selection as a file, never as
+    # --argjson: a large catalogue overflows the kernel's per-argument limit
+    # (128 KiB on Linux), and the failed jq would read as an empty plan.
+    jq -r --slurpfile sel "$sel_file" --arg scope "$scope" '
+        ($sel[0] // {}) as $sel
+        # The on-disk selection may nest per-check toggles under a hook as
+        # {enabled, checks}. Collapse to the bare `enabled` bool here so the
+        # @tsv row never carries an object (which would abort the whole walk and
+        # silently truncate the plan). Bare-bool entries pass through unchanged.
+        | def on: (if type == "object" then .enabled else . end) // false;
+        to_entries[] as $p
         | $p.value | to_entries[] as $c
+        | ([$c.value | to_entries[] | select(.value.library != true)
+            | $sel[$p.key][$c.key][.key] | on] | any) as $any
         | $c.value | to_entries[] as $i
         | $i.value as $e
         | ($e.target | if type=="array" then . else [.] end)[] as $t
         | (if ($t | test("^[~/]")) then "machine" else "project" end) as $ts
         | select($ts == $scope)
-        # The on-disk selection may nest per-check toggles under a hook as
-        # {enabled, checks}. Collapse to the bare `enabled` bool here so the
-        # @tsv row never carries an object (which would abort the whole walk and
-        # silently truncate the plan). Bare-bool entries pass through unchanged.
-        | ($sel[$p.key][$c.key][$i.key]) as $v
-        | ((if ($v | type) == "object" then $v.enabled else $v end) // false) as $en
+        | (if $e.library == true then $any else ($sel[$p.key][$c.key][$i.key] | on) end) as $en
         | [$en, $e.source, $t, $e.method, "\($p.key)/\($c.key)/\($i.key)"] | @tsv
-    ' 2>/dev/null || true
+    ' <<< "$merged" 2>/dev/null || true
 }
 
 # Emit one "<hook>\t<check>\t<enabled-bool>" row per check that any catalogued
 # item declares, resolving the on/off value from the selection's nested
-# `checks` (falling back to the check's manifest `default`, else on). Shared by
-# the materialise and unmaterialise passes. Args: plugins_dir, deploy_json
+# `checks` (falling back to the check's manifest `default`, else on), then one
+# "<hook>\t<check>-pattern\t<name>=<regex>" row per entry in the check's
+# manifest `patterns` (the pre-commit secrets scanner's extra patterns), and a
+# "<item>\trule\t<name>=<kind>|<advice>|<regex>" row per entry in an item's `rules`
+# (the change classifier's table). Shared by the materialise and unmaterialise
+# passes. Args: plugins_dir, deploy_json
 _hook_check_rows() {
-    local plugins_dir="$1" deploy_json="$2" merged sel
+    local plugins_dir="$1" deploy_json="$2" merged sel_file="$deploy_json"
     merged=$(_merged_manifest "$plugins_dir") || return 0
-    sel="{}"; [[ -f "$deploy_json" ]] && sel=$(cat "$deploy_json")
-    jq -rn --argjson m "$merged" --argjson sel "$sel" '
-        $m | to_entries[] as $p
+    [[ -f "$sel_file" ]] || sel_file=/dev/null
+    # stdin and --slurpfile rather than --argjson, as in resolve_plan.
+    jq -r --slurpfile sel "$sel_file" '
+        ($sel[0] // {}) as $sel
+        | to_entries[] as $p
         | $p.value | to_entries[] as $c
         | $c.value | to_entries[] as $i
-        | ($i.value.checks // {}) | to_entries[] as $ck
-        # A hook selection value may be a bare bool (legacy / all-defaults) or
-        # absent; only read nested check overrides when it is an object, else
-        # fall back to the manifest default. Indexing .checks on a bool would
-        # abort the whole jq stream and truncate the materialisation.
-        | ($sel[$p.key][$c.key][$i.key]) as $hv
-        | (if ($hv | type) == "object" then $hv.checks[$ck.key] else null end) as $ov
-        | (if $ov == null then ($ck.value.default // true) else $ov end) as $on
-        | [$i.key, $ck.key, ($on | tostring)] | @tsv
-    ' 2>/dev/null || true
+        | (($i.value.checks // {}) | to_entries[] as $ck
+          # A hook selection value may be a bare bool (legacy / all-defaults) or
+          # absent; only read nested check overrides when it is an object, else
+          # fall back to the manifest default. Indexing .checks on a bool would
+          # abort the whole jq stream and truncate the materialisation.
+          | ($sel[$p.key][$c.key][$i.key]) as $hv
+          | (if ($hv | type) == "object" then $hv.checks[$ck.key] else null end) as $ov
+          | (if $ov == null then ($ck.value.default // true) else $ov end) as $on
+          | ([$i.key, $ck.key, ($on | tostring)] | @tsv),
+            # join, not @tsv: @tsv would double every backslash in the regex.
+            (($ck.value.patterns // {}) | to_entries[]
+             | [$i.key, "\($ck.key)-pattern", "\(.key)=\(.value)"] | join("\t"))),
+          (($i.value.rules // {}) | to_entries[]
+           | [$i.key, "rule", "\(.key)=\(.value.kind)|\(.value.advice)|\(.value.match)"]
+           | join("\t"))
+    ' <<< "$merged" 2>/dev/null || true
+}
+
+# Form of the checks file path written into include.path: `~/...` when under
+# $HOME (portable across machines, like init.templateDir), else absolute.
+# Args: file
+_hook_checks_include_path() {
+    case "$1" in
+        "$HOME"/*) printf '~/%s' "${1#"$HOME"/}" ;;
+        *)         printf '%s' "$1" ;;
+    esac
+}
+
+# Read every `dotconfigs.*` key visible in the global config (including the
+# checks file) with ONE git call, splitting by origin into caller-scoped vars:
+#   _hc_ours    "\n<key> <value>\n..." for keys living in the checks file
+#   _hc_count   how many keys that is
+#   _hc_legacy  " <key> ..." for catalogued check toggles set outside the
+#               checks file: written into ~/.gitconfig by older deploys, or by
+#               hand (migrated out by materialise)
+#   _hc_hand    "\n<key> <value>\n..." for those same keys, as they read
+# Only the exact `dotconfigs.<hook>.<check>` toggles in rows count as legacy:
+# every other key outside the checks file (dotconfigs.pre-commit.parallel,
+# a project's extra rule, ...) is the user's and is left alone.
+# Caller must declare all four `local` first. Args: checks_file, rows
+# (_hook_check_rows output)
+_read_hook_check_config() {
+    local file="$1" origin kv key hook check val toggles=$'\n'
+    _hc_ours=$'\n' _hc_count=0 _hc_legacy=" " _hc_hand=$'\n'
+    while IFS=$'\t' read -r hook check val; do
+        [[ -z "$hook" || "$check" == *-pattern || "$check" == rule ]] && continue
+        toggles+="dotconfigs.$hook.$check"$'\n'
+    done <<< "$2"
+    while IFS=$'\t' read -r origin kv; do
+        [[ -z "$kv" ]] && continue
+        key="${kv%% *}"
+        if [[ "$origin" == "file:$file" ]]; then
+            _hc_ours+="$kv"$'\n'
+            _hc_count=$((_hc_count + 1))
+        elif [[ "$toggles" == *$'\n'"$key"$'\n'* ]]; then
+            [[ "$_hc_legacy" == *" $key "* ]] || _hc_legacy+="$key "
+            # A bare key is true, as git reads it.
+            [[ "$kv" == *" "* ]] || kv+=" true"
+            _hc_hand+="$kv"$'\n'
+        fi
+    done < <(git config --global --includes --show-origin --get-regexp '^dotconfigs\.' 2>/dev/null || true)
+}
+
+# Normalise a git config boolean like `--bool` (1/yes/on -> true) into
+# _hc_bool, leaving anything else as it is. Args: value
+_hook_check_bool() {
+    case "$1" in
+        [Tt][Rr][Uu][Ee]|[Yy][Ee][Ss]|[Oo][Nn]|1)     _hc_bool=true ;;
+        [Ff][Aa][Ll][Ss][Ee]|[Nn][Oo]|[Oo][Ff][Ff]|0) _hc_bool=false ;;
+        *)                                            _hc_bool="$1" ;;
+    esac
+}
+
+# Unset the legacy toggles _read_hook_check_config found in ~/.gitconfig, one
+# key at a time. Args: none (reads _hc_legacy)
+_unset_legacy_hook_checks() {
+    local key
+    for key in $_hc_legacy; do
+        git config --global --unset-all "$key" 2>/dev/null || true
+    done
+}
+
+# Make sure ~/.gitconfig includes the checks file (idempotent; the only write
+# ~/.gitconfig ever sees from the materialiser, and only the first time).
+# Args: checks_file
+_wire_hook_checks_include() {
+    local inc; inc=$(_hook_checks_include_path "$1")
+    local paths; paths=$(git config --global --get-all include.path 2>/dev/null || true)
+    case $'\n'"$paths"$'\n' in
+        *$'\n'"$inc"$'\n'*|*$'\n'"$1"$'\n'*) return 0 ;;
+    esac
+    git config --global --add include.path "$inc"
 }
 
 # Materialise per-check toggles into git config so the deployed hook dispatchers
-# can read them at commit time: `git config --global dotconfigs.<hook>.<check>`.
-# Machine scope only — the toggles are global, mirroring the global git-template
-# hooks. A missing key means "on" (the dispatcher's default), so this only needs
-# to write the values; disabled checks are written as `false`. Args: plugins_dir,
-# deploy_json, dry_run
+# can read them at commit time as `dotconfigs.<hook>.<check>`. Machine scope
+# only — the toggles are global, mirroring the global git-template hooks.
+#
+# The values live in a dotconfigs-owned file ($HOOK_CHECKS_CONFIG, set by the
+# entry point) that ~/.gitconfig merely `[include]`s, so a deploy that flips no
+# toggle never rewrites ~/.gitconfig. Existing keys are read once, diffed in
+# memory against the selection, and the file is rewritten in one atomic tmp+mv
+# only when something changed — a no-op deploy is one `git config` read.
+#
+# `<check>-pattern` and `rule` rows are multi-valued keys (every value counts,
+# in order), so they are compared as one list rather than last-wins.
+#
+# A catalogued toggle set outside the checks file (by an older deploy, or by
+# hand in ~/.gitconfig) is moved out, since the include would shadow or be
+# shadowed by it; one whose value differs from deploy.json's is warned about
+# first, naming the deploy.json key that keeps it.
+# Args: plugins_dir, deploy_json, dry_run
 materialise_hook_checks() {
     local plugins_dir="$1" deploy_json="$2" dry_run="${3:-false}"
-    local rows hook check val cur n=0 changed=0
+    local file="${HOOK_CHECKS_CONFIG:-$HOME/.dotconfigs/hook-checks.gitconfig}"
+    local rows hook check val cur n=0 matched=0 changed=0 section="" body=""
+    local pat_want=$'\n' pat_have=$'\n' pat_n=0 pat_changed=false kv esc
+    local _hc_ours _hc_count _hc_legacy _hc_hand _hc_bool
     rows=$(_hook_check_rows "$plugins_dir" "$deploy_json")
     [[ -z "$rows" ]] && return 0
+    _read_hook_check_config "$file" "$rows"
     while IFS=$'\t' read -r hook check val; do
         [[ -z "$hook" ]] && continue
-        # Compare against the value the dispatcher reads today so stdout reflects
-        # an actual toggle flip, not just a count. `--bool` normalises the stored
-        # value (1/yes/on -> true) so a no-op write never reads as a change; the
-        # `|| true` swallows the exit-1 for an unset (not-yet-materialised) key.
-        cur=$(git config --global --bool --get "dotconfigs.$hook.$check" 2>/dev/null || true)
+        if [[ "$hook" != "$section" ]]; then
+            body+="[dotconfigs \"$hook\"]"$'\n'
+            section="$hook"
+        fi
+        if [[ "$check" == *-pattern || "$check" == rule ]]; then
+            pat_want+="dotconfigs.$hook.$check $val"$'\n'
+            pat_n=$((pat_n + 1))
+            # Quoted, with \ and " escaped: a regex is full of both.
+            esc="${val//\\/\\\\}"
+            body+=$'\t'"$check = \"${esc//\"/\\\"}\""$'\n'
+            continue
+        fi
+        # Last occurrence wins, exactly as the dispatcher's `git config --bool`.
+        cur=""
+        if [[ "$_hc_ours" == *$'\n'"dotconfigs.$hook.$check "* ]]; then
+            cur="${_hc_ours##*$'\n'"dotconfigs.$hook.$check "}"
+            # Normalised, so a hand-written `yes` never reads as a change.
+            _hook_check_bool "${cur%%$'\n'*}"
+            cur="$_hc_bool"
+            matched=$((matched + 1))
+        fi
+        if [[ "$_hc_legacy" == *" dotconfigs.$hook.$check "* ]]; then
+            kv="${_hc_hand##*$'\n'"dotconfigs.$hook.$check "}"
+            _hook_check_bool "${kv%%$'\n'*}"
+            [[ "$_hc_bool" != "$val" ]] \
+                && echo "  ! Warning: ~/.gitconfig sets dotconfigs.$hook.$check = $_hc_bool; deploy.json's $val replaces it (set git.hooks.$hook.checks.$check to keep it)"
+        fi
+        # Stdout reflects an actual toggle flip, not just a count.
         if [[ -z "$cur" ]]; then
             echo "  Hook check set:     $hook.$check = $val"
             changed=$((changed + 1))
@@ -299,9 +473,38 @@ materialise_hook_checks() {
             echo "  Hook check changed: $hook.$check $cur -> $val"
             changed=$((changed + 1))
         fi
-        [[ "$dry_run" != "true" ]] && git config --global "dotconfigs.$hook.$check" "$val"
+        body+=$'\t'"$check = $val"$'\n'
         n=$((n + 1))
     done <<< "$rows"
+    while IFS= read -r kv; do
+        case "${kv%% *}" in
+            *-pattern|*.rule) pat_have+="$kv"$'\n' ;;
+        esac
+    done <<< "$_hc_ours"
+    if [[ "$pat_have" == "$pat_want" ]]; then
+        matched=$((matched + pat_n))
+    else
+        echo "  Hook check patterns/rules changed: $pat_n now"
+        pat_changed=true
+    fi
+    # Write only on a real difference: a flipped/new value or pattern list, or
+    # keys for checks no longer catalogued (the file holds more keys than
+    # matched).
+    if [[ "$dry_run" != "true" ]] \
+       && [[ "$changed" -gt 0 || "$pat_changed" == true || "$_hc_count" -gt "$matched" ]]; then
+        mkdir -p "$(dirname "$file")"
+        local tmp="${file}.tmp.$$"
+        {
+            echo "# Managed by dotconfigs: per-check git hook toggles materialised from deploy.json."
+            echo "# Rewritten by 'dotconfigs deploy'; edit deploy.json instead of this file."
+            printf '%s' "$body"
+        } > "$tmp" && mv "$tmp" "$file"
+        _wire_hook_checks_include "$file"
+    fi
+    # Migration: drop toggles older deploys (or the user) wrote into
+    # ~/.gitconfig itself, which would otherwise fight the include file (whose
+    # values the write above has just brought up to date).
+    [[ "$dry_run" != "true" ]] && _unset_legacy_hook_checks
     if [[ "$changed" -gt 0 ]]; then
         echo "  Hook checks: $changed changed, $((n - changed)) unchanged"
     elif [[ "$n" -gt 0 ]]; then
@@ -310,27 +513,29 @@ materialise_hook_checks() {
     return 0
 }
 
-# Remove every materialised per-check toggle from git config (inverse of
-# materialise_hook_checks), so the dispatchers fall back to their default-on
-# behaviour. Args: plugins_dir, deploy_json, dry_run
+# Remove every materialised per-check toggle (inverse of materialise_hook_checks)
+# so the dispatchers fall back to their default-on behaviour: delete the checks
+# file, drop its include from ~/.gitconfig, and clear any legacy in-place keys.
+# Args: plugins_dir, deploy_json, dry_run
 unmaterialise_hook_checks() {
     local plugins_dir="$1" deploy_json="$2" dry_run="${3:-false}"
-    local rows hook check val seen=" "
-    rows=$(_hook_check_rows "$plugins_dir" "$deploy_json")
-    [[ -z "$rows" ]] && return 0
-    while IFS=$'\t' read -r hook check _; do
-        [[ -z "$hook" ]] && continue
-        if [[ "$dry_run" == "true" ]]; then
-            echo "  Would unset: dotconfigs.$hook.$check"
-        else
-            git config --global --unset "dotconfigs.$hook.$check" 2>/dev/null || true
-            # Drop the now-empty [dotconfigs "<hook>"] section once per hook.
-            if [[ "$seen" != *" $hook "* ]]; then
-                git config --global --remove-section "dotconfigs.$hook" 2>/dev/null || true
-                seen="$seen$hook "
-            fi
-        fi
-    done <<< "$rows"
+    local file="${HOOK_CHECKS_CONFIG:-$HOME/.dotconfigs/hook-checks.gitconfig}"
+    local _hc_ours _hc_count _hc_legacy _hc_hand kv key
+    _read_hook_check_config "$file" "$(_hook_check_rows "$plugins_dir" "$deploy_json")"
+    if [[ "$dry_run" == "true" ]]; then
+        while IFS= read -r kv; do
+            [[ -n "$kv" ]] && echo "  Would unset: ${kv%% *}"
+        done <<< "$_hc_ours"
+        for key in $_hc_legacy; do
+            echo "  Would unset: $key"
+        done
+        return 0
+    fi
+    rm -f "$file"
+    local inc; inc=$(_hook_checks_include_path "$file")
+    git config --global --fixed-value --unset-all include.path "$inc" 2>/dev/null || true
+    git config --global --fixed-value --unset-all include.path "$file" 2>/dev/null || true
+    _unset_legacy_hook_checks
     return 0
 }
 
@@ -350,11 +555,11 @@ _is_synthesised_settings() {
 # Args: plugins_dir, deploy_json
 synthesise_claude_hooks() {
     local plugins_dir="$1" deploy_json="$2"
-    local cm="$plugins_dir/claude/manifest.json" sel="{}"
+    local cm="$plugins_dir/claude/manifest.json" sel_file="$deploy_json"
     [[ -f "$cm" ]] || { printf '{}'; return; }
-    [[ -f "$deploy_json" ]] && sel=$(cat "$deploy_json")
-    jq -n --slurpfile mf "$cm" --argjson sel "$sel" '
-        ($sel.claude.hooks // {}) as $hsel
+    [[ -f "$sel_file" ]] || sel_file=/dev/null
+    jq -n --slurpfile mf "$cm" --slurpfile sel "$sel_file" '
+        ($sel[0].claude.hooks // {}) as $hsel
         | [ $mf[0].hooks | to_entries[]
             | .key as $name | .value as $e
             | select($e.wiring != null and ($hsel[$name] == true))
@@ -450,6 +655,9 @@ cleanup_stale_in_directory() {
                     echo "  ✓ Removed broken symlink: $item_name"
                 fi
                 eval "removed=\$(( \$removed + 1 ))"
+                if [[ "${OUTPUT_JSON:-false}" == "true" ]]; then
+                    event_item "" "$item" symlink drifted-broken removed
+                fi
             fi
         elif is_dotconfigs_owned "$item" "$dotconfigs_root" 2>/dev/null; then
             # Stale dotconfigs-owned symlink — remove
@@ -460,6 +668,9 @@ cleanup_stale_in_directory() {
                 echo "  ✓ Removed stale: $item_name"
             fi
             eval "removed=\$(( \$removed + 1 ))"
+            if [[ "${OUTPUT_JSON:-false}" == "true" ]]; then
+                event_item "" "$item" symlink stale removed
+            fi
         fi
         # Otherwise: foreign file or foreign valid symlink — leave it alone
     done
@@ -1084,6 +1295,18 @@ _undeploy_synthesised_hooks() {
     fi
 }
 
+# Undeploy one plan row. The Claude settings.json carries a synthesised `hooks`
+# block; strip just that (keep the user's other settings) rather than skipping
+# it as an unreversible merge, which would leave hooks wired to removed files.
+# Args: source, resolved_target, method, label, dotconfigs_root, dry_run
+_undeploy_plan_item() {
+    if _is_synthesised_settings "$4"; then
+        _undeploy_synthesised_hooks "$(expand_tilde "$2")" "$6"
+    else
+        undeploy_module "$1" "$2" "$3" "$5" "$6"
+    fi
+}
+
 # Walk a config and undeploy every module. Mirror of deploy_from_json.
 # Args: plugins_dir, deploy_json, scope, dotconfigs_root, [dry_run], [project_root]
 undeploy_from_json() {
@@ -1121,14 +1344,12 @@ undeploy_from_json() {
     while IFS=$'\t' read -r enabled source target method label; do
         [[ -z "$source" ]] && continue
         rtarget=$(resolve_target "$target" "$project_root")
-        # The Claude settings.json carries a synthesised `hooks` block; strip just
-        # that on undeploy (keep the user's other settings) rather than skipping it
-        # as an unreversible merge, which would leave hooks wired to removed files.
-        if _is_synthesised_settings "$label"; then
-            _undeploy_synthesised_hooks "$(expand_tilde "$rtarget")" "$dry_run"
-            continue
+        if [[ "${OUTPUT_JSON:-false}" == "true" ]]; then
+            event_run_item "$label" "$rtarget" "$method" "$source" "$dotconfigs_root" \
+                _undeploy_plan_item "$source" "$rtarget" "$method" "$label" "$dotconfigs_root" "$dry_run"
+        else
+            _undeploy_plan_item "$source" "$rtarget" "$method" "$label" "$dotconfigs_root" "$dry_run"
         fi
-        undeploy_module "$source" "$rtarget" "$method" "$dotconfigs_root" "$dry_run"
     done <<< "$plan"
 
     # Remove materialised per-check toggles (machine scope only), so the
@@ -1151,18 +1372,46 @@ undeploy_from_json() {
 # Scan merge-method targets for dangling command references (the statusLine /
 # hook-command class of bug). Shared by deploy_from_json (post-deploy) and
 # `dotconfigs validate`; takes the already-parsed module rows so neither caller
-# re-parses. No-op if refcheck.sh isn't sourced — deploy.sh only soft-depends
-# on it, so standalone-sourced callers (and tests) still work.
+# re-parses. Each distinct target is scanned once, all in one refcheck_targets
+# pass, however many merge items share it. No-op if refcheck.sh isn't sourced —
+# deploy.sh only soft-depends on it, so standalone-sourced callers (and tests)
+# still work.
 # Args: plan (TSV rows: enabled<TAB>source<TAB>target<TAB>method<TAB>label), [project_root]
 _refcheck_merge_targets() {
     local plan="$1" project_root="${2:-}"
-    declare -f refcheck_settings_json >/dev/null 2>&1 || return 0
-    local enabled source target method label rc_target
+    declare -f refcheck_targets >/dev/null 2>&1 || return 0
+    local enabled source target method label rc_target seen=$'\n'
+    local -a pairs=()
     while IFS=$'\t' read -r enabled source target method label; do
         [[ "$enabled" == "true" && "$method" == "merge" ]] || continue
         rc_target=$(resolve_target "$target" "$project_root")
-        refcheck_settings_json "$rc_target" "$(dirname "$rc_target")" || true
+        [[ "$seen" == *$'\n'"$rc_target"$'\n'* ]] && continue
+        seen+="$rc_target"$'\n'
+        pairs+=("$rc_target" "${rc_target%/*}")
     done <<< "$plan"
+    [[ ${#pairs[@]} -gt 0 ]] || return 0
+    refcheck_targets "${pairs[@]}" || true
+}
+
+# Apply one plan row: deploy it when enabled, tear it down when not. The Claude
+# settings fragment carries a hooks block synthesised from the selected, wired
+# hooks (no hand-maintained wiring), so it is rebuilt from the selection first.
+# Args: enabled, source, resolved_target, method, label, plugins_dir,
+#       deploy_json, dotconfigs_root, dry_run, interactive_mode
+_deploy_plan_item() {
+    local enabled="$1" source="$2" rtarget="$3" method="$4" label="$5"
+    local plugins_dir="$6" deploy_json="$7" dotconfigs_root="$8" dry_run="$9"
+    local interactive_mode="${10}"
+    if [[ "$enabled" != "true" ]]; then
+        undeploy_module "$source" "$rtarget" "$method" "$dotconfigs_root" "$dry_run"
+    elif _is_synthesised_settings "$label"; then
+        local _ssrc
+        _ssrc=$(_synthesise_settings_source "$plugins_dir" "$deploy_json" "$dotconfigs_root/$source")
+        deploy_module "$_ssrc" "$rtarget" "$method" "$dotconfigs_root" "$dry_run" "$interactive_mode"
+        rm -f "$_ssrc"
+    else
+        deploy_module "$source" "$rtarget" "$method" "$dotconfigs_root" "$dry_run" "$interactive_mode"
+    fi
 }
 
 # Main deployment entry point
@@ -1187,11 +1436,13 @@ deploy_from_json() {
         return 1
     fi
 
-    if [[ "$force" == "true" ]]; then
-        interactive_mode="force"
-    else
-        interactive_mode="true"
-    fi
+    # force: true overwrites conflicts; batch (unattended, e.g. parallel fleet
+    # workers) skips them without prompting; anything else prompts.
+    case "$force" in
+        true)  interactive_mode="force" ;;
+        batch) interactive_mode="false" ;;
+        *)     interactive_mode="true" ;;
+    esac
 
     created=0; updated=0; unchanged=0; skipped=0; removed=0; errors=0; warnings=0
 
@@ -1217,19 +1468,13 @@ deploy_from_json() {
         # bumps back to its target — each deploy/undeploy_module call moves exactly
         # one. This keeps the digest honest without instrumenting every bump site.
         c0=$created u0=$updated r0=$removed
-        if [[ "$enabled" == "true" ]]; then
-            if _is_synthesised_settings "$label"; then
-                # The Claude settings fragment carries a hooks block synthesised
-                # from the selected, wired hooks (no hand-maintained wiring).
-                local _ssrc
-                _ssrc=$(_synthesise_settings_source "$plugins_dir" "$deploy_json" "$dotconfigs_root/$source")
-                deploy_module "$_ssrc" "$rtarget" "$method" "$dotconfigs_root" "$dry_run" "$interactive_mode"
-                rm -f "$_ssrc"
-            else
-                deploy_module "$source" "$rtarget" "$method" "$dotconfigs_root" "$dry_run" "$interactive_mode"
-            fi
+        if [[ "${OUTPUT_JSON:-false}" == "true" ]]; then
+            event_run_item "$label" "$rtarget" "$method" "$source" "$dotconfigs_root" \
+                _deploy_plan_item "$enabled" "$source" "$rtarget" "$method" "$label" \
+                "$plugins_dir" "$deploy_json" "$dotconfigs_root" "$dry_run" "$interactive_mode"
         else
-            undeploy_module "$source" "$rtarget" "$method" "$dotconfigs_root" "$dry_run"
+            _deploy_plan_item "$enabled" "$source" "$rtarget" "$method" "$label" \
+                "$plugins_dir" "$deploy_json" "$dotconfigs_root" "$dry_run" "$interactive_mode"
         fi
         if [[ "$created" -gt "$c0" ]]; then change_log+="    + $rtarget"$'\n'
         elif [[ "$updated" -gt "$u0" ]]; then change_log+="    ~ $rtarget"$'\n'
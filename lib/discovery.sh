@@ -11,11 +11,14 @@ discover_plugins() {
         return 0
     fi
 
+    # A glob rather than `find | sort`: pathname expansion is already sorted,
+    # and this runs on every `help`, so it costs no forks.
     local manifest_path dir
-    find "$plugins_dir" -mindepth 2 -maxdepth 2 -name manifest.json -type f | while read -r manifest_path; do
+    for manifest_path in "$plugins_dir"/*/manifest.json; do
+        [[ -f "$manifest_path" ]] || continue
         dir="${manifest_path%/*}"
         echo "${dir##*/}"
-    done | sort
+    done
 }
 
 # Check if a plugin exists. Single source of truth for "what is a plugin":
@@ -0,0 +1,133 @@
+# lib/events.sh — `--json`: NDJSON event stream for deploy/status/undeploy/cleanup
+# Sourced by dotconfigs entry point.
+# Depends on: check_module_state and _now_ms (deploy.sh).
+#
+# In JSON mode stdout carries only events, one JSON object per line, written the
+# moment each is known (nothing is buffered until the end):
+#   {"event":"start","command":"deploy","scope":"machine","dry_run":false}
+#   {"event":"item","command":"deploy","label":"git/hooks/pre-commit",
+#    "target":"/abs/path","method":"symlink","prior":"not-deployed",
+#    "action":"created","duration_ms":4,"error":null}
+#   {"event":"summary","command":"deploy","created":1,...,"duration_ms":812}
+# Item actions: created, updated, removed, unchanged, skipped, error (status
+# reports "checked"; a dry run reports what it would do). The human text is
+# discarded rather than scraped, and colours are never initialised. When an
+# item is skipped or fails, its "error" is its stderr, else the last line it
+# printed (the reason, e.g. "Skipped (foreign): ..."); other stderr (run-level
+# warnings) passes through to stderr untouched.
+#
+# events_begin moves the real stdout to fd 5 and points fd 1 at /dev/null, so
+# every existing echo goes quiet without touching its call site. stdin is
+# closed too: with nobody reading the prompts, conflicts are skipped, not asked.
+
+OUTPUT_JSON="false"
+
+# Enter JSON mode. Args: command, scope, dry_run
+events_begin() {
+    OUTPUT_JSON="true"
+    _EVENT_COMMAND="$1"
+    _EVENT_START=$(_now_ms)
+    _EVENT_ERR=$(mktemp "${TMPDIR:-/tmp}/dotconfigs-events.XXXXXX")
+    _EVENT_OUT="$_EVENT_ERR.out"
+    exec 5>&1 1>/dev/null 0</dev/null
+    _json_string "$2"
+    printf '{"event":"start","command":"%s","scope":%s,"dry_run":%s}\n' \
+        "$1" "$_JSON_STR" "${3:-false}" >&5
+}
+
+# Encode a value as a JSON string literal into _JSON_STR (builtins only: this
+# runs once per field per item). An empty value encodes as null.
+_json_string() {
+    local s="$1"
+    if [[ -z "$s" ]]; then
+        _JSON_STR="null"
+        return 0
+    fi
+    s="${s//\\/\\\\}"
+    s="${s//\"/\\\"}"
+    s="${s//$'\n'/\\n}"
+    s="${s//$'\r'/\\r}"
+    s="${s//$'\t'/\\t}"
+    # Any other control character (bash strings hold no NUL) as \u00XX, which
+    # JSON requires; the 31-substitution loop runs only when there is one.
+    if [[ "$s" == *[[:cntrl:]]* ]]; then
+        local i c u
+        for (( i = 1; i < 32; i++ )); do
+            printf -v c '\\%03o' "$i"
+            printf -v c "$c"
+            printf -v u '\\u%04x' "$i"
+            s=${s//"$c"/$u}
+        done
+    fi
+    _JSON_STR="\"$s\""
+}
+
+# Emit one item event. Args: label, target, method, prior, action,
+# duration_ms, error (empty fields are null)
+event_item() {
+    local line="{\"event\":\"item\",\"command\":\"$_EVENT_COMMAND\"" key i=1
+    for key in label target method prior action; do
+        _json_string "${!i}"
+        line+=",\"$key\":$_JSON_STR"
+        i=$(( i + 1 ))
+    done
+    _json_string "$7"
+    printf '%s,"duration_ms":%s,"error":%s}\n' "$line" "${6:-null}" "$_JSON_STR" >&5
+}
+
+# Run one plan row's handler as an item event: probe the prior state, run the
+# handler with its output silenced, and name the action after whichever
+# counter it bumped (each deploy/undeploy handler moves exactly one).
+# Args: label, target, method, source, dotconfigs_root, handler [args...]
+event_run_item() {
+    local label="$1" target="$2" method="$3" source="$4" root="$5"
+    shift 5
+    local prior start action err="" rc=0
+    local c0="${created:-0}" u0="${updated:-0}" r0="${removed:-0}" s0="${skipped:-0}" e0="${errors:-0}"
+    prior=$(check_module_state "$source" "$target" "$method" "$root" 2>/dev/null)
+    prior="${prior%%$'\t'*}"
+    start=$(_now_ms)
+    "$@" > "$_EVENT_OUT" 2> "$_EVENT_ERR" || rc=$?
+    if   [[ "${errors:-0}" -gt "$e0" || "$rc" -ne 0 ]]; then action="error"
+    elif [[ "${created:-0}" -gt "$c0" ]]; then action="created"
+    elif [[ "${updated:-0}" -gt "$u0" ]]; then action="updated"
+    elif [[ "${removed:-0}" -gt "$r0" ]]; then action="removed"
+    elif [[ "${skipped:-0}" -gt "$s0" ]]; then action="skipped"
+    else action="unchanged"
+    fi
+    case "$action" in
+        error|skipped)
+            if [[ -s "$_EVENT_ERR" ]]; then
+                err=$(< "$_EVENT_ERR")
+            else
+                local line
+                while IFS= read -r line; do
+                    [[ -n "$line" ]] && err="$line"
+                done < "$_EVENT_OUT"
+                err="${err#"${err%%[![:space:]]*}"}"
+                err="${err#- }"
+            fi
+            ;;
+    esac
+    event_item "$label" "$(expand_tilde "$target")" "$method" "$prior" "$action" \
+        "$(( $(_now_ms) - start ))" "$err"
+}
+
+# Emit the closing summary and leave JSON mode. Args: key=value... (numbers
+# and true/false are written bare, anything else as a string)
+events_end() {
+    local line="{\"event\":\"summary\",\"command\":\"$_EVENT_COMMAND\"" kv val
+    for kv in "$@"; do
+        val="${kv#*=}"
+        if [[ "$val" =~ ^(-?[0-9]+|true|false)$ ]]; then
+            line+=",\"${kv%%=*}\":$val"
+        else
+            _json_string "$val"
+            line+=",\"${kv%%=*}\":$_JSON_STR"
+        fi
+    done
+    printf '%s,"duration_ms":%s}\n' "$line" "$(( $(_now_ms) - _EVENT_START ))" >&5
+    rm -f "$_EVENT_ERR" "$_EVENT_OUT"
+    exec 1>&5 5>&-
+    OUTPUT_JSON="false"
+}
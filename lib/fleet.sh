@@ -0,0 +1,150 @@
+# lib/fleet.sh — `dotconfigs deploy --all-projects`: redeploy every registered repo
+# Sourced by dotconfigs entry point.
+# Depends on: _deploy_project (entry point), compile_catalogue, _now_ms and
+# _have_wait_n (deploy.sh), _audit_lookup (audit.sh), registry_paths,
+# registry_needs_redeploy and _catalogue_fingerprint (registry.sh). Colour
+# vars come from init_colours.
+#
+# Rolling a catalogue change out repo by repo pays the whole CLI start-up, the
+# catalogue merge and the plan per repo. Fleet mode instead:
+#   - compiles the catalogue (and its fingerprint) once; the forked workers
+#     inherit both;
+#   - skips repos whose selection hash and catalogue fingerprint match their
+#     last registry record (the `status` "needs redeploy" query) — --force
+#     redeploys them anyway;
+#   - deploys the rest FLEET_JOBS at a time, each worker unattended (conflicts
+#     are skipped, never prompted) with its output captured to a log;
+#   - prints one summary row per repo, in registry order, with timings, then
+#     the logs of any failures, and returns non-zero if any repo failed.
+
+FLEET_JOBS="${DOTCONFIGS_DEPLOY_JOBS:-4}"
+
+# One fleet worker: deploy repo, capturing its output to "<out>.log", then write
+# "<rc> <elapsed_ms>" to out. Args: out, repo, dry_run, force
+_fleet_deploy_one() {
+    local out="$1" repo="$2" dry_run="$3" force="$4" start rc=0
+    start=$(_now_ms)
+    _deploy_project "$repo" "$dry_run" "$force" < /dev/null > "$out.log" 2>&1 || rc=$?
+    printf '%s %s\n' "$rc" "$(( $(_now_ms) - start ))" > "$out"
+}
+
+# Format milliseconds as seconds with millisecond precision. Args: ms
+_fleet_secs() {
+    printf '%d.%03ds' "$(( $1 / 1000 ))" "$(( $1 % 1000 ))"
+}
+
+# Args: dry_run, force (true: also redeploy unchanged repos, overwriting
+# conflicts), [repo...] (just these, whatever their state: status --fix-stale)
+fleet_deploy() {
+    local dry_run="${1:-false}" force="${2:-false}"
+    shift 2 || shift $#
+    local repo only="false"
+    local -a repos=("$@")
+    if [[ ${#repos[@]} -gt 0 ]]; then
+        only="true"
+    else
+        while IFS= read -r repo; do
+            repos+=("$repo")
+        done < <(registry_paths)
+    fi
+    if [[ ${#repos[@]} -eq 0 ]]; then
+        echo "No registered projects ($PROJECT_REGISTRY). Deploy a repo first: dotconfigs deploy <repo>"
+        return 0
+    fi
+
+    local fleet_start; fleet_start=$(_now_ms)
+    compile_catalogue "$PLUGINS_DIR" || return 1
+    _CATALOGUE_FP=$(_catalogue_fingerprint)
+    local stale=$'\n'$(registry_needs_redeploy)$'\n'
+
+    # Classify: gone / no selection / unchanged are settled here; the rest queue.
+    local i _hit
+    local -a state=() queue=()
+    for i in "${!repos[@]}"; do
+        repo="${repos[i]}"
+        if [[ ! -d "$repo/.git" ]]; then
+            state[i]="gone"
+        elif [[ ! -f "$repo/.dotconfigs/deploy.json" ]]; then
+            state[i]="no-selection"
+        else
+            _audit_lookup "$stale" "$repo"
+            if [[ -z "$_hit" && "$force" != "true" && "$only" != "true" ]]; then
+                state[i]="unchanged"
+            else
+                queue+=("$i")
+            fi
+        fi
+    done
+
+    local worker_force="batch"
+    [[ "$force" == "true" ]] && worker_force="true"
+    local tmp; tmp=$(mktemp -d "${TMPDIR:-/tmp}/dotconfigs-fleet.XXXXXX")
+    if [[ ${#queue[@]} -gt 0 ]]; then
+        echo "Deploying ${#queue[@]} of ${#repos[@]} registered repo(s), $FLEET_JOBS at a time..."
+        local running=0 wait_n="false"
+        _have_wait_n && wait_n="true"
+        for i in "${queue[@]}"; do
+            _fleet_deploy_one "$tmp/$i" "${repos[i]}" "$dry_run" "$worker_force" &
+            running=$((running + 1))
+            if [[ "$running" -ge "$FLEET_JOBS" ]]; then
+                if [[ "$wait_n" == "true" ]]; then
+                    wait -n || true
+                    running=$((running - 1))
+                else
+                    wait || true
+                    running=0
+                fi
+            fi
+        done
+        wait || true
+    fi
+
+    # Summary, in registry order.
+    local rc ms label colour deployed=0 skipped=0 failed=0 failed_logs=""
+    echo ""
+    printf "  %-14s %9s  %s\n" "RESULT" "TIME" "REPO"
+    for i in "${!repos[@]}"; do
+        repo="${repos[i]}"
+        ms=""
+        case "${state[i]:-}" in
+            gone)         label="gone";         colour="${COLOUR_YELLOW:-}" ;;
+            no-selection) label="no selection"; colour="${COLOUR_YELLOW:-}" ;;
+            unchanged)    label="unchanged";    colour="" ;;
+            *)
+                rc="" ms=""
+                [[ -s "$tmp/$i" ]] && read -r rc ms < "$tmp/$i"
+                if [[ "$rc" == "0" ]]; then
+                    label="deployed"; colour="${COLOUR_GREEN:-}"
+                    [[ "$dry_run" == "true" ]] && label="would deploy"
+                    deployed=$((deployed + 1))
+                else
+                    label="FAILED"; colour="${COLOUR_RED:-}"
+                    failed=$((failed + 1))
+                    failed_logs+="$i"$'\n'
+                fi
+                ;;
+        esac
+        case "$label" in gone|"no selection"|unchanged) skipped=$((skipped + 1)) ;; esac
+        printf "  %b%-14s%b %9s  %s\n" "$colour" "$label" "${COLOUR_RESET:-}" \
+            "${ms:+$(_fleet_secs "$ms")}" "$repo"
+    done
+
+    echo ""
+    printf "Fleet summary: %d deployed, %d skipped, %d failed in %s\n" \
+        "$deployed" "$skipped" "$failed" "$(_fleet_secs "$(( $(_now_ms) - fleet_start ))")"
+
+    if [[ "$failed" -gt 0 ]]; then
+        while IFS= read -r i; do
+            [[ -z "$i" ]] && continue
+            echo ""
+            printf "%b--- %s ---%b\n" "${COLOUR_RED:-}" "${repos[i]}" "${COLOUR_RESET:-}"
+            if [[ -s "$tmp/$i.log" ]]; then
+                cat "$tmp/$i.log"
+            else
+                echo "(no output)"
+            fi
+        done <<< "$failed_logs"
+    fi
+    rm -rf "$tmp"
+    [[ "$failed" -eq 0 ]]
+}
@@ -0,0 +1,61 @@
+# lib/hookstats.sh — `dotconfigs hooks stats`: git hook latency per check
+# Sourced by dotconfigs entry point (only for `hooks`).
+# Depends on: HOOK_STATS_LOG (entry point); sort and awk only, no jq.
+#
+# Every git hook run appends one tab-separated row per check, then one for the
+# whole hook (check "-"), from _hook-runtime.sh's EXIT trap:
+#   <repo>  <hook>  <check>  <outcome: pass|block|skip>  <ms>
+# to $HOOK_STATS_LOG, which the hooks rotate to $HOOK_STATS_LOG.1 past 256 KiB,
+# so the two files hold the last few thousand runs across every repo.
+
+# Print p50/p95/max per hook and check, slowest p95 first within each hook.
+# Args: repo filter (toplevel path, or ""), hook filter (or "")
+hook_stats_report() {
+    local repo="$1" hook="$2" file files=()
+    for file in "$HOOK_STATS_LOG.1" "$HOOK_STATS_LOG"; do
+        [[ -s "$file" ]] && files+=("$file")
+    done
+    if [[ ${#files[@]} -eq 0 ]]; then
+        echo "No hook stats at $HOOK_STATS_LOG yet: they are recorded by every git hook run." >&2
+        return 1
+    fi
+
+    # Sorted by hook, check and ms, each group is a run of rows whose
+    # percentiles are nearest ranks into it.
+    LC_ALL=C sort -t $'\t' -k2,2 -k3,3 -k5,5n "${files[@]}" | awk -F '\t' \
+        -v repo="$repo" -v hook="$hook" -v file="$HOOK_STATS_LOG" '
+        function after(j, h, c, p) {
+            if (k_hook[j] != h) return k_hook[j] > h
+            if (c == "-" || k_check[j] == "-") return c == "-"
+            return k_p95[j] < p
+        }
+        function flush(   p50, p95, i) {
+            if (!n) return
+            p50 = v[int((n * 50 + 99) / 100)]; p95 = v[int((n * 95 + 99) / 100)]
+            # Insertion-sort into place: by hook, its "-" row first, then p95 down.
+            for (i = ++rows; i > 1 && after(i - 1, g_hook, g_check, p95); i--) {
+                out[i] = out[i - 1]; k_hook[i] = k_hook[i - 1]
+                k_check[i] = k_check[i - 1]; k_p95[i] = k_p95[i - 1]
+            }
+            out[i] = sprintf("  %-20s %-24s %6d %6d %6d %8d %8d %8d", g_hook,
+                g_check == "-" ? "(whole hook)" : g_check, n, blocks, skips, p50, p95, v[n])
+            k_hook[i] = g_hook; k_check[i] = g_check; k_p95[i] = p95
+            n = blocks = skips = 0
+        }
+        NF != 5 || (repo != "" && $1 != repo) || (hook != "" && $2 != hook) { next }
+        $2 != g_hook || $3 != g_check { flush(); g_hook = $2; g_check = $3 }
+        {
+            v[++n] = $5
+            blocks += ($4 == "block"); skips += ($4 == "skip")
+            if ($3 == "-") { runs++; if (!($1 in seen)) { seen[$1] = 1; repos++ } }
+        }
+        END {
+            flush()
+            if (!rows) { print "No hook runs match." > "/dev/stderr"; exit 1 }
+            printf "Git hook timings: %d run(s) across %d repo(s) (%s)\n\n", runs, repos, file
+            printf "  %-20s %-24s %6s %6s %6s %8s %8s %8s\n", "HOOK", "CHECK", "RUNS",
+                "BLOCK", "SKIP", "P50 ms", "P95 ms", "MAX ms"
+            for (i = 1; i <= rows; i++) print out[i]
+        }
+    '
+}
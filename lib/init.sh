@@ -5,13 +5,17 @@
 # Seed a deploy.json selection (the toggle board) for a scope from the plugin
 # catalogues. Lists every catalogued item that has a target in this scope, keyed
 # plugin -> category -> name, with its `default` as the on/off value. The user
-# edits this file to toggle what gets deployed on this instance.
+# edits this file to toggle what gets deployed on this instance. `library` items
+# are left out: they follow their category's other items (see resolve_plan).
 # Args: scope ("machine" or "project")
 # Output: JSON to stdout
 seed_deploy_json() {
-    local scope="$1"
-    jq -n --argjson m "$(_merged_manifest "$PLUGINS_DIR")" --arg scope "$scope" '
-        $m | to_entries
+    local scope="$1" merged
+    merged=$(_merged_manifest "$PLUGINS_DIR") || return 1
+    # The catalogue goes in on stdin: as --argjson a large one overflows the
+    # kernel's per-argument limit.
+    jq --arg scope "$scope" '
+        to_entries
         | map({ key: .key, value: (
             .value | to_entries
             | map({ key: .key, value: (
@@ -20,7 +24,7 @@ seed_deploy_json() {
                        | (($e.target | if type=="array" then . else [.] end)
                           | map(if test("^[~/]") then "machine" else "project" end)
                           | index($scope)) as $has
-                       | select($has != null)
+                       | select($has != null and $e.library != true)
                        | { key: $n, value: (
                            if ($e.checks != null)
                            then { enabled: ($e.default // false),
@@ -34,7 +38,7 @@ seed_deploy_json() {
             | from_entries ) })
         | map(select(.value | length > 0))
         | from_entries
-    '
+    ' <<< "$merged"
 }
 
 # Write JSON content with overwrite protection
@@ -0,0 +1,115 @@
+# lib/prompt.sh — `dotconfigs status --prompt`: a one-line drift summary for shell
+# prompts and status lines
+# Sourced by dotconfigs entry point.
+# Depends on (writer only): resolve_plan, _collect_plugin_states, _tally_states,
+# expand_tilde (deploy.sh), discover_plugins (discovery.sh). The reader,
+# prompt_summary, uses shell builtins only.
+#
+# A full `status` resolves the plan with jq and probes every target — far too
+# slow to run per prompt. So `deploy` and `status` leave the verdict in
+# $PROMPT_STATE, and the prompt reads it back, trusting it only while cheap
+# builtin tests agree nothing moved since it was written:
+#   - the selection and the plugin manifests are not newer than the state file;
+#   - a handful of sentinel targets still have the kind (symlink / file / dir /
+#     absent) they had, and deployed files and dirs are not newer either.
+# Anything else reads as `stale` until the next deploy or status rewrites it.
+# The state file is tab-separated "<kind>\t<value>" lines:
+#   summary   ok | <N> drifted | not deployed
+#   selection <abs path of the deploy.json it describes>
+#   link|file|dir|absent  <abs sentinel target>
+
+# How many enabled targets to record as sentinels, sampled evenly across the
+# plan so every plugin gets a look-in.
+PROMPT_SENTINELS="${DOTCONFIGS_PROMPT_SENTINELS:-8}"
+
+# Record the machine verdict. Args: states (every plugin's "<state>\t<name>"
+# lines, as from _collect_plugin_states), plan (the machine resolve_plan output)
+prompt_state_write() {
+    local states="$1" plan="$2"
+    local has_ok has_drift has_missing count_ok total summary
+    _tally_states "$states" has_ok has_drift has_missing count_ok total
+    if [[ "$count_ok" -eq 0 ]]; then
+        summary="not deployed"
+    elif [[ "$count_ok" -lt "$total" ]]; then
+        summary="$(( total - count_ok )) drifted"
+    else
+        summary="ok"
+    fi
+
+    local body enabled source target method label kind
+    local targets=() i stride
+    body=$(printf 'summary\t%s\nselection\t%s' "$summary" "$DEPLOY_CONFIG")
+    while IFS=$'\t' read -r enabled source target method label; do
+        [[ "$enabled" == "true" ]] && targets+=("$target")
+    done <<< "$plan"
+    stride=$(( (${#targets[@]} + PROMPT_SENTINELS - 1) / PROMPT_SENTINELS ))
+    [[ "$stride" -ge 1 ]] || stride=1
+    for (( i = 0; i < ${#targets[@]}; i += stride )); do
+        target=$(expand_tilde "${targets[i]}")
+        if [[ -L "$target" ]]; then
+            kind="link"
+        elif [[ -d "$target" ]]; then
+            kind="dir"
+        elif [[ -f "$target" ]]; then
+            kind="file"
+        else
+            kind="absent"
+        fi
+        body+=$'\n'"$kind"$'\t'"$target"
+    done
+
+    mkdir -p "${PROMPT_STATE%/*}" 2>/dev/null || return 0
+    local tmp="$PROMPT_STATE.$$"
+    printf '%s\n' "$body" > "$tmp" 2>/dev/null && mv -f "$tmp" "$PROMPT_STATE" 2>/dev/null
+    rm -f "$tmp" 2>/dev/null
+    return 0
+}
+
+# Re-check the machine selection and record the verdict (after a deploy).
+prompt_state_refresh() {
+    [[ -f "$DEPLOY_CONFIG" ]] || return 0
+    local plan plugin states=""
+    plan=$(resolve_plan "$PLUGINS_DIR" "$DEPLOY_CONFIG" "machine")
+    while IFS= read -r plugin; do
+        states+=$(_collect_plugin_states "$plugin" "$plan")$'\n'
+    done < <(discover_plugins "$PLUGINS_DIR")
+    prompt_state_write "$states" "$plan"
+}
+
+# Print the recorded verdict, or `stale` / `unknown` when it can't be trusted.
+# Builtins only: no jq, no subshells, no forks.
+# Returns: 0 ok, 1 drifted or not deployed, 2 stale or unknown.
+prompt_summary() {
+    local state="$PROMPT_STATE"
+    if [[ ! -f "$DEPLOY_CONFIG" ]]; then
+        echo "not deployed"
+        return 1
+    fi
+    if [[ ! -f "$state" ]]; then
+        echo "unknown"
+        return 2
+    fi
+
+    local kind value summary="" fresh="true" manifest
+    while IFS=$'\t' read -r kind value; do
+        case "$kind" in
+            summary)   summary="$value" ;;
+            selection) [[ "$value" == "$DEPLOY_CONFIG" && ! "$value" -nt "$state" ]] || fresh="false" ;;
+            link)      [[ -L "$value" ]] || fresh="false" ;;
+            file)      [[ -f "$value" && ! -L "$value" && ! "$value" -nt "$state" ]] || fresh="false" ;;
+            dir)       [[ -d "$value" && ! -L "$value" && ! "$value" -nt "$state" ]] || fresh="false" ;;
+            absent)    [[ ! -e "$value" && ! -L "$value" ]] || fresh="false" ;;
+        esac
+        [[ "$fresh" == "true" ]] || break
+    done < "$state"
+    for manifest in "$PLUGINS_DIR"/*/manifest.json; do
+        [[ "$manifest" -nt "$state" ]] && fresh="false"
+    done
+
+    if [[ "$fresh" != "true" || -z "$summary" ]]; then
+        echo "stale"
+        return 2
+    fi
+    echo "$summary"
+    [[ "$summary" == "ok" ]]
+}
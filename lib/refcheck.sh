@@ -1,6 +1,7 @@
 # lib/refcheck.sh — strict deployed-reference scanner for dotconfigs
 # Sourced by dotconfigs entry point and by `dotconfigs validate`.
-# Depends on: jq. Colour vars (COLOUR_*) are used if set, else degrade to plain.
+# Depends on: jq; registry_paths (registry.sh) and _have_wait_n (deploy.sh) for
+# refcheck_projects. Colour vars (COLOUR_*) are used if set, else degrade to plain.
 #
 # Purpose: catch dangling references that a plain deploy would happily install —
 # e.g. a settings.json `statusLine.command` or hook `command` pointing at a
@@ -9,6 +10,29 @@
 #
 # Functions emit "  ! <message>" warnings on stderr and tally into the caller's
 # `warnings` counter when one is in scope (via the optional refcheck_warn shim).
+#
+# A scan parses each settings file once (one jq call covers every file given to
+# refcheck_targets) and stats each resolved path once per run, however many
+# references share it. refcheck_projects scans the registered repos'
+# .claude/settings.json concurrently, AUDIT_JOBS at a time.
+
+# Every command/helper reference in a settings file, as "<file>\t<reference>":
+# statusLine.command, each hooks[*][*].hooks[*].command, apiKeyHelper and
+# awsCredentialExport.
+_REFCHECK_JQ='
+    input_filename as $f
+    | [ .statusLine.command?,
+        .apiKeyHelper?,
+        .awsCredentialExport?,
+        (.hooks // {} | .[]? | .[]? | .hooks[]? | .command?)
+      ] | map(select(type == "string" and . != "")) | .[]
+    | "\($f)\t\(.)"
+'
+
+# Resolved paths already checked this run, "\n<path>\n..." (bash 3.2 has no
+# associative arrays).
+_RC_PRESENT=$'\n'
+_RC_MISSING=$'\n'
 
 # Increment the caller's `warnings` counter if it exists; always print to stderr.
 # Args: message
@@ -50,9 +74,16 @@ refcheck_claude_duplication() {
 # Args: raw_reference, base_dir
 # Output: absolute path to check via stdout, or empty if it's a PATH-style name.
 refcheck_resolve_path() {
+    _refcheck_resolve "$1" "$2"
+    echo "$_RC_PATH"
+}
+
+# refcheck_resolve_path without the subshell: sets _RC_PATH. Args: as above
+_refcheck_resolve() {
     local ref="$1" base="$2"
     # Drop any argument suffix: keep only the first whitespace-delimited token.
     ref="${ref%%[[:space:]]*}"
+    _RC_PATH=""
     [[ -z "$ref" ]] && return 0
 
     # Substitute the project-dir variable in both ${VAR} and $VAR forms.
@@ -62,44 +93,116 @@ refcheck_resolve_path() {
     ref="${ref//\$\{CLAUDE_PLUGIN_ROOT\}/$base}"
 
     case "$ref" in
-        '~'/*) echo "${ref/#\~/$HOME}" ;;
-        /*)    echo "$ref" ;;
-        ./*)   echo "$base/${ref#./}" ;;
-        */*)   echo "$base/$ref" ;;          # relative path with a slash
-        *)     echo "" ;;                    # bare name → PATH lookup, skip
+        '~'/*) _RC_PATH="${ref/#\~/$HOME}" ;;
+        /*)    _RC_PATH="$ref" ;;
+        ./*)   _RC_PATH="$base/${ref#./}" ;;
+        */*)   _RC_PATH="$base/$ref" ;;      # relative path with a slash
+        *)     ;;                            # bare name → PATH lookup, skip
     esac
 }
 
-# Scan one JSON settings file for command/helper references that point at
-# files which do not exist. Checks statusLine.command, every
-# hooks[*][*].hooks[*].command, apiKeyHelper, and awsCredentialExport.
-# Args: json_file, base_dir (for relative/${CLAUDE_PROJECT_DIR} resolution)
+# Does path exist? Each path is stat'ed once per run. Args: path
+_refcheck_exists() {
+    [[ "$_RC_PRESENT" == *$'\n'"$1"$'\n'* ]] && return 0
+    [[ "$_RC_MISSING" == *$'\n'"$1"$'\n'* ]] && return 1
+    if [[ -e "$1" ]]; then
+        _RC_PRESENT+="$1"$'\n'
+        return 0
+    fi
+    _RC_MISSING+="$1"$'\n'
+    return 1
+}
+
+# Scan settings files for references to files that do not exist. One jq call
+# parses them all; missing files are skipped.
+# Args: json_file, base_dir (for relative/${CLAUDE_PROJECT_DIR} resolution),
+#       [json_file, base_dir]...
 # Returns: 0 if all references resolve, 1 if any dangle (warnings emitted).
-refcheck_settings_json() {
-    local json_file="$1" base_dir="${2:-$PWD}"
-    [[ -f "$json_file" ]] || return 0
-
-    local refs
-    refs=$(jq -r '
-        [ .statusLine.command?,
-          .apiKeyHelper?,
-          .awsCredentialExport?,
-          (.hooks // {} | .[]? | .[]? | .hooks[]? | .command?)
-        ] | map(select(. != null and . != "")) | .[]
-    ' "$json_file" 2>/dev/null)
-
-    [[ -z "$refs" ]] && return 0
-
-    local rc=0 ref resolved
-    while IFS= read -r ref; do
-        [[ -z "$ref" ]] && continue
-        resolved=$(refcheck_resolve_path "$ref" "$base_dir")
+refcheck_targets() {
+    local -a files=() bases=()
+    while [[ $# -ge 2 ]]; do
+        [[ -f "$1" ]] && { files+=("$1"); bases+=("$2"); }
+        shift 2
+    done
+    [[ ${#files[@]} -gt 0 ]] || return 0
+
+    local rows f
+    if ! rows=$(jq -r "$_REFCHECK_JQ" "${files[@]}" 2>/dev/null); then
+        # Files are one jq stream, so an unparsable one ends the scan of the
+        # rest: fall back to one parse each (a broken file yields nothing).
+        rows=""
+        for f in "${files[@]}"; do
+            rows+=$(jq -r "$_REFCHECK_JQ" "$f" 2>/dev/null)$'\n'
+        done
+    fi
+    [[ -n "$rows" ]] || return 0
+
+    # Rows come out in file order, so the base dir is found by walking forward.
+    local rc=0 ref j=0 shown tilde='~'
+    while IFS=$'\t' read -r f ref; do
+        [[ -n "$ref" ]] || continue
+        while [[ $j -lt ${#files[@]} && "${files[j]}" != "$f" ]]; do
+            j=$((j + 1))
+        done
+        _refcheck_resolve "$ref" "${bases[j]}"
         # Empty → bare PATH-style command; nothing to existence-check.
-        [[ -z "$resolved" ]] && continue
-        if [[ ! -e "$resolved" ]]; then
-            refcheck_warn "dangling reference in $(basename "$json_file"): '$ref' → $resolved (not found)"
+        [[ -z "$_RC_PATH" ]] && continue
+        if ! _refcheck_exists "$_RC_PATH"; then
+            shown="${f/#"$HOME"\//$tilde/}"
+            refcheck_warn "dangling reference in $shown: '$ref' → $_RC_PATH (not found)"
             rc=1
         fi
-    done <<< "$refs"
+    done <<< "$rows"
+    return $rc
+}
+
+# Scan one JSON settings file. Args: json_file, base_dir (default: $PWD)
+# Returns: 0 if all references resolve, 1 if any dangle (warnings emitted).
+refcheck_settings_json() {
+    refcheck_targets "$1" "${2:-$PWD}"
+}
+
+# Scan every registered project's .claude/settings.json (relative references
+# and ${CLAUDE_PROJECT_DIR} resolve against the repo), AUDIT_JOBS repos at a
+# time. Warnings print in registry order and tally like refcheck_warn's.
+# Returns: 0 if all references resolve, 1 if any dangle.
+refcheck_projects() {
+    declare -f registry_paths >/dev/null 2>&1 || return 0
+    local repo
+    local -a repos=()
+    while IFS= read -r repo; do
+        [[ -f "$repo/.claude/settings.json" ]] && repos+=("$repo")
+    done < <(registry_paths)
+    [[ ${#repos[@]} -gt 0 ]] || return 0
+
+    local tmp; tmp=$(mktemp -d "${TMPDIR:-/tmp}/dotconfigs-refcheck.XXXXXX")
+    local i running=0 jobs="${AUDIT_JOBS:-8}" wait_n="false"
+    _have_wait_n && wait_n="true"
+    for i in "${!repos[@]}"; do
+        # `|| true`: a dangling reference is this worker's result, not a failure.
+        ( refcheck_targets "${repos[i]}/.claude/settings.json" "${repos[i]}" 2> "$tmp/$i" || true ) &
+        running=$((running + 1))
+        if [[ "$running" -ge "$jobs" ]]; then
+            if [[ "$wait_n" == "true" ]]; then
+                wait -n || true
+                running=$((running - 1))
+            else
+                wait || true
+                running=0
+            fi
+        fi
+    done
+    wait || true
+
+    local rc=0 line
+    for i in "${!repos[@]}"; do
+        [[ -s "$tmp/$i" ]] || continue
+        rc=1
+        while IFS= read -r line; do
+            printf '%s\n' "$line" >&2
+            [[ -n "${warnings+x}" ]] && warnings=$(( warnings + 1 ))
+        done < "$tmp/$i"
+    done
+    rm -rf "$tmp"
     return $rc
 }
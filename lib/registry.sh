@@ -0,0 +1,288 @@
+# lib/registry.sh — project registry (every repo that has had a project deploy)
+# Sourced by dotconfigs entry point.
+# Depends on: jq, git.
+#
+# The registry at $PROJECT_REGISTRY is a JSON-lines log, one record per project
+# deploy:
+#   {"path": "/abs/repo", "deployed_at": "2026-10-19T12:00:00Z",
+#    "commit": "<dotconfigs HEAD>", "selection_hash": "<blob sha of deploy.json>",
+#    "catalogue": "<blob sha of the plugin manifests>", "hooks": ["pre-commit", ...],
+#    "hook_hashes": {"pre-commit": "<blob sha of the hook source deployed>", ...}}
+# Records are only ever appended — one printf, so one O_APPEND write, so two
+# concurrent deploys can't interleave a line — and the latest record per path
+# wins. `dotconfigs projects gc` compacts the log to one record per path; it and
+# prune rewrite under a lock and carry over records appended meanwhile.
+# Legacy flat lines (a bare path: the old projects.list format) read as
+# {"path": <line>} until the next gc rewrites them.
+
+# jq: normalise one raw registry line (`-R` string) to a record.
+_REGISTRY_JQ_RECORD='((fromjson? | select(type == "object")) // {path: .})'
+
+# Pre-JSONL installs kept a flat ~/.dotconfigs/projects.list. Adopt it in place
+# (its lines already read as legacy records). Default location only — an
+# explicit DOTCONFIGS_PROJECT_REGISTRY is used as given.
+_registry_adopt_legacy() {
+    [[ -z "${DOTCONFIGS_PROJECT_REGISTRY:-}" && ! -e "$PROJECT_REGISTRY" ]] || return 0
+    local legacy="$HOME/.dotconfigs/projects.list"
+    [[ -f "$legacy" ]] && mv "$legacy" "$PROJECT_REGISTRY"
+    return 0
+}
+
+# Blob hash of the concatenated plugin manifests: changes whenever the catalogue
+# a deploy read from changes, committed or not. Pinned (like compile_catalogue)
+# once _CATALOGUE_FP is set, so fleet workers don't each re-hash it.
+_catalogue_fingerprint() {
+    if [[ -n "${_CATALOGUE_FP:-}" ]]; then
+        echo "$_CATALOGUE_FP"
+        return 0
+    fi
+    cat "$PLUGINS_DIR"/*/manifest.json 2>/dev/null | git hash-object --stdin 2>/dev/null
+}
+
+# Print the latest record per repo as compact JSON lines, in first-registered
+# order (jq objects keep first-insertion key order; later records overwrite).
+registry_latest() {
+    _registry_adopt_legacy
+    [[ -f "$PROJECT_REGISTRY" ]] || return 0
+    jq -Rcn "
+        reduce (inputs | $_REGISTRY_JQ_RECORD | select((.path // \"\") != \"\")) as \$r
+            ({}; .[\$r.path] = \$r)
+        | .[]
+    " "$PROJECT_REGISTRY" 2>/dev/null || true
+}
+
+# Print every registered repo path once, in first-registered order.
+registry_paths() {
+    _registry_adopt_legacy
+    [[ -f "$PROJECT_REGISTRY" ]] || return 0
+    jq -Rrn "
+        reduce (inputs | $_REGISTRY_JQ_RECORD | .path // \"\" | select(. != \"\")) as \$p
+            ({}; .[\$p] = true)
+        | keys_unsorted[]
+    " "$PROJECT_REGISTRY" 2>/dev/null || true
+}
+
+# "<hook file>\t<blob sha>" per git hook the catalogue installs into .git/hooks,
+# hashing each current source with one batched `git hash-object`. The file name
+# is the target's basename (check-facade-consumers.py keeps its extension,
+# unlike its key). Given a selection, only the hooks it enables, plus the
+# libraries they source when it enables any.
+# Args: [deploy_json]
+hook_source_hashes() {
+    local sel="${1:-/dev/null}" name src hash i=0
+    local -a names=() srcs=()
+    [[ -f "$sel" ]] || sel=/dev/null
+    while IFS=$'\t' read -r name src; do
+        [[ -f "$REPO_ROOT/$src" ]] || continue
+        names+=("$name")
+        srcs+=("$REPO_ROOT/$src")
+    done < <(jq -r --slurpfile s "$sel" '
+        ($s[0].git.hooks // null) as $on
+        | def on: $on[.key] | if type == "object" then .enabled else . end;
+        ([.hooks | to_entries[] | select(.value.library != true) | on == true] | any) as $any
+        | .hooks | to_entries[]
+        | select($on == null
+                 or (if .value.library == true then $any else on == true end))
+        | .value.source as $src
+        | (.value.target | if type == "array" then . else [.] end)[]
+        | select(startswith(".git/hooks/")) | "\(sub(".*/"; ""))\t\($src)"
+    ' "$PLUGINS_DIR/git/manifest.json" 2>/dev/null)
+    [[ ${#srcs[@]} -gt 0 ]] || return 0
+    while IFS= read -r hash; do
+        printf '%s\t%s\n' "${names[i]}" "$hash"
+        i=$((i + 1))
+    done < <(printf '%s\n' "${srcs[@]}" | git hash-object --stdin-paths 2>/dev/null)
+}
+
+# Append a deploy record for repo. Args: repo (absolute), deploy_json
+registry_record() {
+    local repo="$1" deploy_json="$2"
+    _registry_adopt_legacy
+    mkdir -p "$(dirname "$PROJECT_REGISTRY")"
+
+    local at commit selection catalogue
+    at=$(date -u +%Y-%m-%dT%H:%M:%SZ)
+    commit=$(git -C "$REPO_ROOT" rev-parse HEAD 2>/dev/null || true)
+    selection=$(git hash-object "$deploy_json" 2>/dev/null || true)
+    catalogue=$(_catalogue_fingerprint)
+
+    local hashes; hashes=$(hook_source_hashes "$deploy_json")
+
+    local rec
+    rec=$(jq -cn --arg path "$repo" --arg at "$at" --arg commit "$commit" \
+            --arg sel "$selection" --arg cat "$catalogue" --arg hashes "$hashes" \
+            --slurpfile s "$deploy_json" '
+        {path: $path, deployed_at: $at, commit: $commit,
+         selection_hash: $sel, catalogue: $cat,
+         hooks: (($s[0].git.hooks // {}) | to_entries
+                 | map(select(.value | if type == "object" then .enabled else . end) | .key)),
+         hook_hashes: ($hashes | split("\n") | map(select(length > 0) | split("\t")
+                       | {(.[0]): .[1]}) | add // {})}
+    ' 2>/dev/null) || return 0
+    printf '%s\n' "$rec" >> "$PROJECT_REGISTRY"
+}
+
+# The "needs redeploy" query: one "<path>\t<reason>" line per registered repo
+# whose last deploy no longer matches its current selection or the catalogue.
+# Indexed, not probed: the latest records are joined against ONE batched
+# `git hash-object` of every repo's deploy.json, so the cost is a few forks
+# regardless of how many repos are registered. Gone repos are not reported.
+registry_needs_redeploy() {
+    local latest; latest=$(registry_latest)
+    [[ -z "$latest" ]] && return 0
+
+    local path
+    local -a selections=()
+    while IFS= read -r path; do
+        [[ -f "$path/.dotconfigs/deploy.json" ]] && selections+=("$path")
+    done < <(jq -r '.path' <<< "$latest")
+
+    local current="" hash i=0
+    if [[ ${#selections[@]} -gt 0 ]]; then
+        while IFS= read -r hash; do
+            current+="${selections[i]}"$'\t'"$hash"$'\n'
+            i=$((i + 1))
+        done < <(printf '%s/.dotconfigs/deploy.json\n' "${selections[@]}" \
+                    | git hash-object --stdin-paths 2>/dev/null)
+    fi
+
+    local catalogue; catalogue=$(_catalogue_fingerprint)
+    jq -rn --arg current "$current" --arg cat "$catalogue" '
+        ($current | split("\n") | map(select(length > 0) | split("\t") | {(.[0]): .[1]})
+            | add // {}) as $now
+        | inputs
+        | select($now[.path] != null)
+        | (if (.selection_hash // "") == "" then "no deploy record"
+           elif .selection_hash != $now[.path] then "selection changed"
+           elif .catalogue != $cat then "catalogue changed"
+           else empty end) as $why
+        | "\(.path)\t\($why)"
+    ' <<< "$latest" 2>/dev/null || true
+}
+
+# `dotconfigs projects list`: one line per repo with its last deploy and state.
+registry_list() {
+    local latest; latest=$(registry_latest)
+    if [[ -z "$latest" ]]; then
+        echo "No registered projects ($PROJECT_REGISTRY)."
+        return 0
+    fi
+    local needs; needs=$'\n'$(registry_needs_redeploy)$'\n'
+
+    local path at commit nhooks state head rest
+    while IFS=$'\t' read -r path at commit nhooks; do
+        if [[ ! -d "$path/.git" ]]; then
+            state="$(printf '%b%s%b' "${COLOUR_YELLOW:-}" "gone" "${COLOUR_RESET:-}")"
+        else
+            # Split with `%%` and slice, not `${needs#*...}`: see _audit_lookup.
+            head="${needs%%$'\n'"$path"$'\t'*}"
+            if [[ "$head" != "$needs" ]]; then
+                rest="${needs:${#head}+${#path}+2}"
+                state="$(printf '%b%s%b' "${COLOUR_YELLOW:-}" "needs redeploy: ${rest%%$'\n'*}" "${COLOUR_RESET:-}")"
+            else
+                state="$(printf '%b%s%b' "${COLOUR_GREEN:-}" "current" "${COLOUR_RESET:-}")"
+            fi
+        fi
+        printf "  %s\n      deployed %s  dotconfigs %s  hooks %s  %s\n" \
+            "$path" "$at" "$commit" "$nhooks" "$state"
+    done < <(jq -r '[.path, (.deployed_at // "?"), ((.commit // "")[:7] | if . == "" then "?" else . end),
+                     ((.hooks // []) | length | tostring)] | @tsv' <<< "$latest")
+}
+
+# Registry size in bytes (0 if absent). Args: file
+_registry_size() {
+    local n=0
+    [[ -f "$1" ]] && n=$(wc -c < "$1")
+    echo $((n))
+}
+
+# Run "$@" holding the rewrite lock (a mkdir, so no flock dependency), so two
+# prune/gc runs can't rewrite the registry at once. Appends never take it.
+_registry_locked() {
+    _registry_adopt_legacy
+    [[ -f "$PROJECT_REGISTRY" ]] || { "$@"; return; }
+    local lock="$PROJECT_REGISTRY.lock" tries=0 rc=0
+    until mkdir "$lock" 2>/dev/null; do
+        if (( ++tries > 50 )); then
+            echo "Error: $lock is held; remove it if no other dotconfigs is running" >&2
+            return 1
+        fi
+        sleep 0.1
+    done
+    "$@" || rc=$?
+    rmdir "$lock"
+    return "$rc"
+}
+
+# Replace the registry with the records on stdin, which were derived from its
+# first <offset> bytes. Deploys keep appending meanwhile (fleet workers), so
+# whatever lies past the offset is carried over: once before the mv, and once
+# more from the replaced file for an append that raced the mv itself.
+# Args: offset
+_registry_rewrite() {
+    local offset="$1" tmp="$PROJECT_REGISTRY.tmp.$$" old="$PROJECT_REGISTRY.old.$$"
+    cat > "$tmp" && ln -f "$PROJECT_REGISTRY" "$old" || { rm -f "$tmp"; return 1; }
+    local size; size=$(_registry_size "$old")
+    tail -c "+$((offset + 1))" "$old" | head -c "$((size - offset))" >> "$tmp"
+    mv "$tmp" "$PROJECT_REGISTRY"
+    tail -c "+$((size + 1))" "$old" >> "$PROJECT_REGISTRY"
+    rm -f "$old"
+}
+
+# `dotconfigs projects prune`: drop repos that no longer exist (no .git).
+# Args: dry_run
+registry_prune() {
+    if [[ "${1:-true}" == "true" ]]; then
+        _registry_prune true
+    else
+        _registry_locked _registry_prune false
+    fi
+}
+
+_registry_prune() {
+    local dry_run="$1" offset; offset=$(_registry_size "$PROJECT_REGISTRY")
+    local latest; latest=$(registry_latest)
+    [[ -z "$latest" ]] && { echo "No registered projects."; return 0; }
+
+    # One jq lists the paths and one drops the gone ones; the test is a builtin.
+    local path gone="" pruned=0
+    while IFS= read -r path; do
+        [[ -d "$path/.git" ]] && continue
+        gone+="$path"$'\n'
+        pruned=$((pruned + 1))
+        if [[ "$dry_run" == "true" ]]; then
+            echo "  Would prune: $path"
+        else
+            echo "  Pruned: $path"
+        fi
+    done < <(jq -r '.path' <<< "$latest")
+
+    if [[ "$pruned" -eq 0 ]]; then
+        echo "Nothing to prune."
+    elif [[ "$dry_run" == "true" ]]; then
+        echo ""
+        echo "Run 'dotconfigs projects prune --apply' to remove."
+    else
+        jq -c --arg gone "$gone" '
+            ($gone | split("\n")) as $g | select(.path as $p | any($g[]; . == $p) | not)
+        ' <<< "$latest" | _registry_rewrite "$offset"
+    fi
+}
+
+# `dotconfigs projects gc`: compact the append-only log to the latest record
+# per repo (legacy flat lines become {"path": ...} records).
+registry_gc() {
+    _registry_locked _registry_gc
+}
+
+_registry_gc() {
+    [[ -f "$PROJECT_REGISTRY" ]] || { echo "No registered projects."; return 0; }
+    local before after latest offset
+    offset=$(_registry_size "$PROJECT_REGISTRY")
+    before=$(grep -c . "$PROJECT_REGISTRY" || true)
+    latest=$(registry_latest)
+    after=0
+    [[ -n "$latest" ]] && after=$(grep -c . <<< "$latest")
+    printf '%s' "${latest:+$latest$'\n'}" | _registry_rewrite "$offset"
+    echo "Compacted $PROJECT_REGISTRY: $before record(s) -> $after repo(s)."
+}
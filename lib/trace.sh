@@ -0,0 +1,177 @@
+# lib/trace.sh — DOTCONFIGS_TRACE: per-function timings and fork counts
+# Sourced by dotconfigs entry point (only when tracing, or for `trace report`).
+# Depends on: _json_string (events.sh); jq for trace_report.
+#
+# DOTCONFIGS_TRACE=1 (or =<file>) traces one CLI run into a JSONL file
+# (default ~/.dotconfigs/trace.jsonl, rewritten per run):
+#   {"type":"run","argv":"deploy","bash":"5.2.15"}
+#   {"type":"call","fn":"link_one","item":"claude/hooks/notify","depth":4,"us":1830,"self_us":1210,"rc":0}
+#   {"type":"fork","cmd":"readlink","fn":"link_one","item":"claude/hooks/notify"}
+# Nothing in the engine changes for this. trace_enable renames each function in
+# _TRACE_FUNCS to _trace_orig_<name> and puts a timing wrapper in its place,
+# and shadows each command in _TRACE_COMMANDS with a function that logs the
+# fork and then runs the real binary. Records are single printf appends, so
+# calls made inside $(...) subshells and pipelines are logged too. `self_us`
+# excludes time spent in traced children called directly; a child run in a
+# subshell still counts towards its caller's self time. `item` is the plan row
+# (label) or repo being worked on, taken from the argument named in the table.
+
+# "<function>[:<arg index naming the item>]" — the engine's hot paths.
+_TRACE_FUNCS="resolve_plan _merged_manifest compile_catalogue deploy_from_json
+_deploy_plan_item:5 deploy_module link_one backup_and_link check_file_state
+check_module_state merge_json_settings _merge_to_tmp _substitute_placeholders
+_managed_block_sync _managed_block_in_sync materialise_hook_checks
+unmaterialise_hook_checks synthesise_claude_hooks _synthesise_settings_source
+_sweep_stale_symlinks cleanup_stale_in_directory undeploy_from_json
+_undeploy_plan_item:4 undeploy_module _refcheck_merge_targets
+refcheck_targets refcheck_projects refcheck_claude_duplication registry_record
+registry_needs_redeploy hook_source_hashes audit_project_hooks audit_fix_stale
+fleet_deploy _deploy_project:1
+_reconcile_git_templatedir _reconcile_git_hookspath _reconcile_git_perf
+_create_path_symlink _collect_plugin_states prompt_state_refresh
+completion_cache_write"
+
+# External commands counted as forks.
+_TRACE_COMMANDS="jq git readlink awk sed grep cmp mktemp dirname basename cat
+cut sort mv rm ln mkdir date stat find tr head tail wc"
+
+# Current microseconds into _TRACE_NOW. EPOCHREALTIME (bash 5) costs nothing;
+# older bash pays an untraced `date` fork, and BSD date only has seconds.
+_trace_now() {
+    if [[ -n "${EPOCHREALTIME:-}" ]]; then
+        _TRACE_NOW="${EPOCHREALTIME/[.,]/}"
+        return 0
+    fi
+    _TRACE_NOW=$(command date +%s%N)
+    if [[ "$_TRACE_NOW" == *N ]]; then
+        _TRACE_NOW=$(( ${_TRACE_NOW%N} * 1000000 ))
+    else
+        _TRACE_NOW=$(( _TRACE_NOW / 1000 ))
+    fi
+}
+
+# The trace file DOTCONFIGS_TRACE names (1/true/yes mean the default).
+_trace_file() {
+    case "${DOTCONFIGS_TRACE:-}" in
+        1|true|yes) echo "$HOME/.dotconfigs/trace.jsonl" ;;
+        *)          echo "$DOTCONFIGS_TRACE" ;;
+    esac
+}
+
+# Timing wrapper installed in place of each traced function. Its locals are
+# _tr_-prefixed so they never shadow the caller-scoped counters the engine
+# assigns by dynamic scope (created, updated, _mb_begin, ...). set -e behaves
+# as it did unwrapped: a plain call that fails still exits.
+# Args: function, item arg index (0: none), the function's own args...
+_trace_call() {
+    local _tr_fn="$1" _tr_idx="$2"
+    shift 2
+    local _tr_item="$_TRACE_ITEM" _tr_parent="$_TRACE_FN" _tr_t0 _tr_us _tr_self _tr_rc=0
+    [[ "$_tr_idx" -gt 0 ]] && _TRACE_ITEM="${!_tr_idx}"
+    _TRACE_FN="$_tr_fn"
+    _TRACE_DEPTH=$(( _TRACE_DEPTH + 1 ))
+    _TRACE_CHILD[_TRACE_DEPTH]=0
+    _trace_now; _tr_t0=$_TRACE_NOW
+
+    "_trace_orig_$_tr_fn" "$@"
+    _tr_rc=$?
+
+    _trace_now
+    _tr_us=$(( _TRACE_NOW - _tr_t0 ))
+    _tr_self=$(( _tr_us - _TRACE_CHILD[_TRACE_DEPTH] ))
+    _json_string "$_TRACE_ITEM"
+    printf '{"type":"call","fn":"%s","item":%s,"depth":%d,"us":%d,"self_us":%d,"rc":%d}\n' \
+        "$_tr_fn" "$_JSON_STR" "$_TRACE_DEPTH" "$_tr_us" "$_tr_self" "$_tr_rc" >> "$TRACE_FILE"
+    _TRACE_DEPTH=$(( _TRACE_DEPTH - 1 ))
+    _TRACE_CHILD[_TRACE_DEPTH]=$(( ${_TRACE_CHILD[_TRACE_DEPTH]:-0} + _tr_us ))
+    _TRACE_FN="$_tr_parent" _TRACE_ITEM="$_tr_item"
+    return "$_tr_rc"
+}
+
+# Stand-in for a counted external command: log it, then run the real one.
+# Args: command, its args...
+_trace_exec() {
+    local _tr_cmd="$1"
+    shift
+    _json_string "$_TRACE_ITEM"
+    printf '{"type":"fork","cmd":"%s","fn":"%s","item":%s}\n' \
+        "$_tr_cmd" "${_TRACE_FN:-main}" "$_JSON_STR" >> "$TRACE_FILE"
+    command "$_tr_cmd" "$@"
+}
+
+# Install the wrappers and start a fresh trace file. Call after the command's
+# libraries are loaded; functions that aren't loaded are skipped.
+# Args: the CLI argv (recorded in the run header)
+trace_enable() {
+    TRACE_FILE=$(_trace_file)
+    mkdir -p "${TRACE_FILE%/*}" 2>/dev/null
+    _json_string "$*"
+    printf '{"type":"run","argv":%s,"bash":"%s"}\n' "$_JSON_STR" "$BASH_VERSION" > "$TRACE_FILE" || {
+        echo "Warning: cannot write trace file $TRACE_FILE; tracing off" >&2
+        return 0
+    }
+    _TRACE_FN="" _TRACE_ITEM="" _TRACE_DEPTH=0
+    _TRACE_CHILD=(0)
+
+    local entry fn idx def
+    for entry in $_TRACE_FUNCS; do
+        fn="${entry%%:*}" idx=0
+        [[ "$entry" == *:* ]] && idx="${entry#*:}"
+        declare -F "$fn" >/dev/null || continue
+        def=$(declare -f "$fn")
+        eval "_trace_orig_$def"
+        eval "$fn() { _trace_call $fn $idx \"\$@\"; }"
+    done
+    for fn in $_TRACE_COMMANDS; do
+        eval "$fn() { _trace_exec $fn \"\$@\"; }"
+    done
+}
+
+# `dotconfigs trace report [file]`: the hottest functions by self time, forks
+# by command, and the items that forked most.
+# Args: [trace file] (default: the DOTCONFIGS_TRACE file, else ~/.dotconfigs/trace.jsonl)
+trace_report() {
+    local file="${1:-}"
+    [[ -n "$file" ]] || file=$(DOTCONFIGS_TRACE="${DOTCONFIGS_TRACE:-1}" _trace_file)
+    if [[ ! -s "$file" ]]; then
+        echo "No trace at $file. Record one with: DOTCONFIGS_TRACE=1 dotconfigs <command>" >&2
+        return 1
+    fi
+
+    local argv
+    argv=$(jq -r 'select(.type == "run") | .argv' "$file" | head -1)
+    echo "Trace of 'dotconfigs $argv' ($file)"
+    echo ""
+    printf "  %-32s %7s %11s %11s\n" "FUNCTION" "CALLS" "TOTAL ms" "SELF ms"
+    jq -rs '
+        [.[] | select(.type == "call")]
+        | group_by(.fn)
+        | map({fn: .[0].fn, calls: length,
+               total: (map(.us) | add), self: (map(.self_us) | add)})
+        | sort_by(-.self) | .[:15][]
+        | [.fn, .calls, (.total / 1000), (.self / 1000)] | @tsv
+    ' "$file" | while IFS=$'\t' read -r fn calls total self; do
+        printf "  %-32s %7d %11.1f %11.1f\n" "$fn" "$calls" "$total" "$self"
+    done
+
+    echo ""
+    printf "  %-32s %7s\n" "COMMAND" "FORKS"
+    jq -rs '
+        [.[] | select(.type == "fork")] | group_by(.cmd)
+        | map([.[0].cmd, length]) | sort_by(-.[1])[] | @tsv
+    ' "$file" | while IFS=$'\t' read -r cmd n; do
+        printf "  %-32s %7d\n" "$cmd" "$n"
+    done
+
+    echo ""
+    printf "  %-40s %7s  %s\n" "ITEM" "FORKS" "TOP COMMANDS"
+    jq -rs '
+        [.[] | select(.type == "fork")] | group_by(.item)
+        | map({item: (.[0].item // "(no item)"), n: length,
+               top: (group_by(.cmd) | map({c: .[0].cmd, n: length})
+                     | sort_by(-.n) | .[:4] | map("\(.c) \(.n)") | join(", "))})
+        | sort_by(-.n) | .[:15][] | [.item, .n, .top] | @tsv
+    ' "$file" | while IFS=$'\t' read -r item n top; do
+        printf "  %-40s %7d  %s\n" "$item" "$n" "$top"
+    done
+}
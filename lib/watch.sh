@@ -0,0 +1,306 @@
+# lib/watch.sh — `dotconfigs watch`: keep a scope deployed while you edit
+# Sourced by dotconfigs entry point.
+# Depends on: compile_catalogue, resolve_plan, resolve_target, _abs_source,
+# deploy_from_json, _deploy_plan_item, _sweep_stale_symlinks,
+# materialise_hook_checks, check_module_state and _now_ms (deploy.sh),
+# registry_record (registry.sh). Colour vars come from init_colours.
+#
+# One converging deploy, then the compiled catalogue and the plan stay in
+# memory and each change re-applies only the items it affects:
+#   - a manifest.json edit recompiles the catalogue and re-applies the items
+#     whose catalogue entry or plan row changed (a Claude hook's `wiring` or
+#     selection re-synthesises settings.json), then sweeps orphaned symlinks;
+#   - a selection (deploy.json) edit re-applies the items whose row changed;
+#   - a source edit re-applies the items built from it (re-renders a managed
+#     block, re-merges a settings fragment);
+#   - a deployed target that drifts (deleted, replaced) is re-applied — our own
+#     writes read back as in sync, so they never loop.
+# Events come from inotifywait when it is installed (and --poll isn't given),
+# else from polling one stat call per interval. A burst of events ends after
+# WATCH_DEBOUNCE quiet seconds and is applied as one batch, logged with its
+# latency from the first and the last event.
+
+WATCH_INTERVAL="${DOTCONFIGS_WATCH_INTERVAL:-1}"
+WATCH_DEBOUNCE="${DOTCONFIGS_WATCH_DEBOUNCE:-0.3}"
+
+# "<mtime>|<size>|<path>" per existing path, from one stat call. Symlinks are
+# not followed: a repointed or deleted link is itself the change. Args: paths...
+_watch_stat() {
+    [[ $# -gt 0 ]] || return 0
+    if stat -c '%y' / >/dev/null 2>&1; then
+        stat -c '%y|%s|%n' "$@" 2>/dev/null || true
+    else
+        stat -f '%Fm|%z|%N' "$@" 2>/dev/null || true
+    fi
+}
+
+# Snapshot every plugin file plus the watched paths listed in list_file.
+_watch_snapshot() {
+    local list_file="$1" p
+    local -a paths=()
+    while IFS= read -r p; do
+        paths+=("$p")
+    done < <(find "$PLUGINS_DIR" -type f 2>/dev/null; cat "$list_file")
+    _watch_stat "${paths[@]}" | LC_ALL=C sort
+}
+
+# Polling event source: print each path whose snapshot line appeared, changed
+# or vanished since the previous poll. The first line is an empty "ready" line,
+# written once the baseline snapshot is taken. Args: list_file
+_watch_poll_events() {
+    local list_file="$1" prev cur
+    prev=$(_watch_snapshot "$list_file")
+    echo ""
+    while true; do
+        sleep "$WATCH_INTERVAL"
+        cur=$(_watch_snapshot "$list_file")
+        if [[ "$cur" != "$prev" ]]; then
+            LC_ALL=C comm -3 <(printf '%s\n' "$prev") <(printf '%s\n' "$cur") \
+                | sed 's/^[[:space:]]*//' | cut -d'|' -f3- | LC_ALL=C sort -u
+            prev="$cur"
+        fi
+    done
+}
+
+# inotify event source: plugins/ recursively, plus the parent directory of each
+# watched path (non-recursively — a target like ~/.gitconfig must not put a
+# recursive watch on $HOME). Starts with an empty "ready" line, written once
+# every inotifywait has reported "Watches established" on stderr (or exited):
+# backgrounding one returns before its watches exist. Args: list_file
+_watch_inotify_events() {
+    local list_file="$1" err="${1%/*}/inotify.err" p n
+    local -a dirs=() pids=()
+    while IFS= read -r p; do
+        [[ -d "$p" ]] && dirs+=("$p")
+    done < <(sed 's|/[^/]*$||' "$list_file" | LC_ALL=C sort -u)
+    local events="close_write,create,delete,moved_to,moved_from,attrib"
+    trap 'kill $(jobs -p) 2>/dev/null; exit 0' TERM
+    : > "$err.0"
+    inotifywait -mr -e "$events" --format '%w%f' "$PLUGINS_DIR" 2> "$err.0" &
+    pids+=($!)
+    if [[ ${#dirs[@]} -gt 0 ]]; then
+        : > "$err.1"
+        inotifywait -m -e "$events" --format '%w%f' "${dirs[@]}" 2> "$err.1" &
+        pids+=($!)
+    fi
+    for n in "${!pids[@]}"; do
+        until [[ "$(< "$err.$n")" == *"Watches established"* ]]; do
+            kill -0 "${pids[n]}" 2>/dev/null || break
+            sleep 0.05
+        done
+    done
+    echo ""
+    wait
+}
+
+# Write the selection file and every resolved plan target to list_file.
+_watch_list_paths() {
+    local list_file="$1" enabled source target method label
+    {
+        printf '%s\n' "$_w_deploy_json"
+        while IFS=$'\t' read -r enabled source target method label; do
+            [[ -z "$source" ]] && continue
+            resolve_target "$target" "$_w_project_root"
+            echo ""
+        done <<< "$_w_plan"
+    } | LC_ALL=C sort -u > "$list_file"
+}
+
+# (Re)start the event source on fd 3 for the current plan's paths.
+_watch_start_events() {
+    _watch_stop_events
+    _watch_list_paths "$_w_tmp/paths"
+    rm -f "$_w_tmp/events"
+    mkfifo "$_w_tmp/events"
+    if [[ "$_w_backend" == "inotify" ]]; then
+        _watch_inotify_events "$_w_tmp/paths" > "$_w_tmp/events" &
+    else
+        _watch_poll_events "$_w_tmp/paths" > "$_w_tmp/events" &
+    fi
+    _w_events_pid=$!
+    exec 3< "$_w_tmp/events"
+    # Block until the source is ready, so no change slips in before its baseline.
+    IFS= read -r -u 3 _ || true
+}
+
+_watch_stop_events() {
+    if [[ -n "${_w_events_pid:-}" ]]; then
+        kill "$_w_events_pid" 2>/dev/null || true
+        wait "$_w_events_pid" 2>/dev/null || true
+        exec 3<&-
+        _w_events_pid=""
+    fi
+}
+
+# Labels ("<plugin>/<category>/<item>") whose catalogue entry differs between
+# two compiled catalogues, one per line. Args: old_json, new_json
+_watch_changed_entries() {
+    # Both catalogues on stdin: as --argjson a large one overflows the
+    # kernel's per-argument limit.
+    printf '%s\n%s\n' "$1" "$2" | jq -rn '
+        def flat: [to_entries[] as $p | $p.value | to_entries[] as $c
+                   | $c.value | to_entries[] | {("\($p.key)/\($c.key)/\(.key)"): .value}]
+                  | add // {};
+        input as $old | input as $new
+        | ($old | flat) as $o | ($new | flat) as $n
+        | ($o + $n) | keys[] | select($o[.] != $n[.])
+    ' 2>/dev/null || true
+}
+
+# Decide which plan items a batch of changed paths affects, apply them, and log
+# the batch. Args: batch (newline-separated paths), first_ms, last_ms
+_watch_apply() {
+    local batch="$1" first_ms="$2" last_ms="$3"
+    local p labels=$'\n' manifest="false" selection="false" nevents=0
+    while IFS= read -r p; do
+        [[ -z "$p" ]] && continue
+        nevents=$((nevents + 1))
+        case "$p" in
+            "$PLUGINS_DIR"/*/manifest.json) manifest="true" ;;
+            "$_w_deploy_json") selection="true" ;;
+        esac
+    done <<< "$batch"
+
+    local enabled source target method label row
+    if [[ "$manifest" == "true" || "$selection" == "true" ]]; then
+        local old_plan="$_w_plan" old_catalogue="$_COMPILED_CATALOGUE" new_plan
+        if [[ "$manifest" == "true" ]] && ! compile_catalogue "$PLUGINS_DIR"; then
+            _COMPILED_CATALOGUE="$old_catalogue"
+            printf "%b  catalogue does not parse (mid-edit?): keeping the previous plan%b\n" \
+                "${COLOUR_YELLOW:-}" "${COLOUR_RESET:-}"
+            return 0
+        fi
+        new_plan=$(resolve_plan "$PLUGINS_DIR" "$_w_deploy_json" "$_w_scope")
+        if [[ -z "$new_plan" ]] || ! jq -e . "$_w_deploy_json" >/dev/null 2>&1; then
+            _COMPILED_CATALOGUE="$old_catalogue"
+            printf "%b  selection does not parse (mid-edit?): keeping the previous plan%b\n" \
+                "${COLOUR_YELLOW:-}" "${COLOUR_RESET:-}"
+            return 0
+        fi
+        _w_plan="$new_plan"
+        while IFS= read -r row; do
+            [[ -n "$row" ]] && labels+="${row##*$'\t'}"$'\n'
+        done < <(grep -vxF -f <(printf '%s\n' "$old_plan") <<< "$_w_plan" || true)
+        if [[ "$manifest" == "true" ]]; then
+            while IFS= read -r label; do
+                [[ -n "$label" ]] && labels+="$label"$'\n'
+            done < <(_watch_changed_entries "$old_catalogue" "$_COMPILED_CATALOGUE")
+        fi
+        # Settings hooks are synthesised from the Claude hooks' wiring + selection.
+        case "$labels" in
+            *$'\n'claude/hooks/*) labels+="claude/config/settings"$'\n' ;;
+        esac
+    fi
+
+    # Sources that changed, and deployed targets that drifted.
+    local rtarget abs_source state
+    while IFS=$'\t' read -r enabled source target method label; do
+        [[ -z "$source" ]] && continue
+        case "$labels" in *$'\n'"$label"$'\n'*) continue ;; esac
+        abs_source=$(_abs_source "$source" "$REPO_ROOT")
+        rtarget=$(resolve_target "$target" "$_w_project_root")
+        while IFS= read -r p; do
+            [[ -z "$p" ]] && continue
+            if [[ "$p" == "$abs_source" || "$p" == "$abs_source"/* ]]; then
+                labels+="$label"$'\n'
+                break
+            fi
+            if [[ "$enabled" == "true" ]] && [[ "$p" == "$rtarget" || "$p" == "$rtarget"/* ]]; then
+                state=$(check_module_state "$source" "$rtarget" "$method" "$REPO_ROOT")
+                if [[ "${state%%$'\t'*}" != "deployed" ]]; then
+                    labels+="$label"$'\n'
+                    break
+                fi
+            fi
+        done <<< "$batch"
+    done <<< "$_w_plan"
+
+    local applied=0
+    created=0; updated=0; unchanged=0; skipped=0; removed=0; errors=0; warnings=0
+    while IFS=$'\t' read -r enabled source target method label; do
+        [[ -z "$source" ]] && continue
+        case "$labels" in *$'\n'"$label"$'\n'*) ;; *) continue ;; esac
+        rtarget=$(resolve_target "$target" "$_w_project_root")
+        _deploy_plan_item "$enabled" "$source" "$rtarget" "$method" "$label" \
+            "$PLUGINS_DIR" "$_w_deploy_json" "$REPO_ROOT" false "$_w_interactive"
+        applied=$((applied + 1))
+    done <<< "$_w_plan"
+
+    if [[ "$manifest" == "true" || "$selection" == "true" ]]; then
+        [[ "$manifest" == "true" ]] \
+            && _sweep_stale_symlinks "$_w_plan" "$_w_project_root" "$REPO_ROOT" false
+        if [[ "$_w_scope" == "machine" ]]; then
+            materialise_hook_checks "$PLUGINS_DIR" "$_w_deploy_json" false
+        else
+            registry_record "$(cd "$_w_project_root" && pwd -P)" "$_w_deploy_json"
+        fi
+        # The plan's targets may have moved: re-subscribe.
+        _watch_start_events
+    fi
+
+    # Our own writes echo back as events on in-sync targets: nothing to log.
+    [[ "$applied" -eq 0 && "$manifest" != "true" && "$selection" != "true" ]] && return 0
+
+    local now; now=$(_now_ms)
+    local colour="${COLOUR_GREEN:-}"
+    [[ "$errors" -gt 0 ]] && colour="${COLOUR_RED:-}"
+    printf "%b[%s] %d event(s) -> %d item(s) re-applied (%d changed, %d error(s)); latency %dms from first event, %dms from last%b\n" \
+        "$colour" "$(date +%H:%M:%S)" "$nevents" "$applied" "$((created + updated + removed))" \
+        "$errors" "$((now - first_ms))" "$((now - last_ms))" "${COLOUR_RESET:-}"
+}
+
+# Args: scope, deploy_json, project_root ("" for machine), backend (auto|poll),
+#       force (true/false)
+watch_reconcile() {
+    _w_scope="$1"; _w_deploy_json="$2"; _w_project_root="$3"
+    local backend="${4:-auto}" force="${5:-false}"
+    _w_backend="poll"
+    if [[ "$backend" != "poll" ]] && command -v inotifywait >/dev/null 2>&1; then
+        _w_backend="inotify"
+    fi
+    # Never prompt, on the first deploy or mid-watch: skip conflicts unless --force.
+    local deploy_mode="batch"
+    _w_interactive="false"
+    [[ "$force" == "true" ]] && deploy_mode="true" _w_interactive="force"
+    # Fractional `read -t` needs bash >= 4.
+    local debounce="$WATCH_DEBOUNCE"
+    [[ "${BASH_VERSINFO[0]}" -lt 4 ]] && debounce=1
+
+    compile_catalogue "$PLUGINS_DIR" || return 1
+    deploy_from_json "$PLUGINS_DIR" "$_w_deploy_json" "$_w_scope" "$REPO_ROOT" false "$deploy_mode" "$_w_project_root" || true
+    _w_plan=$(resolve_plan "$PLUGINS_DIR" "$_w_deploy_json" "$_w_scope")
+
+    _w_tmp=$(mktemp -d "${TMPDIR:-/tmp}/dotconfigs-watch.XXXXXX")
+    _w_events_pid=""
+    trap '_watch_stop_events; rm -rf "$_w_tmp"; exit 0' INT TERM
+    _watch_start_events
+    echo ""
+    echo "Watching $PLUGINS_DIR, $_w_deploy_json and the deployed targets ($_w_backend). Ctrl-C to stop."
+
+    local path batch first_ms last_ms
+    while true; do
+        if ! IFS= read -r -u 3 path; then
+            # Event source died (e.g. inotify watch limit): fall back to polling.
+            if [[ "$_w_backend" == "inotify" ]]; then
+                echo "inotify event source stopped; falling back to polling"
+                _w_backend="poll"
+                _watch_start_events
+                continue
+            fi
+            echo "Error: event source stopped" >&2
+            _watch_stop_events
+            rm -rf "$_w_tmp"
+            return 1
+        fi
+        first_ms=$(_now_ms); last_ms="$first_ms"
+        batch="$path"$'\n'
+        while IFS= read -r -t "$debounce" -u 3 path; do
+            last_ms=$(_now_ms)
+            case $'\n'"$batch" in
+                *$'\n'"$path"$'\n'*) ;;
+                *) batch+="$path"$'\n' ;;
+            esac
+        done
+        _watch_apply "$batch" "$first_ms" "$last_ms"
+    done
+}
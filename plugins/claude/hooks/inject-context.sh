@@ -4,7 +4,7 @@
 # NAME: inject-context
 # TYPE: claude-hook
 # PLUGIN: claude
-# DESCRIPTION: UserPromptSubmit hook prepending git context (branch, dirty count, head sha + subject) to every prompt
+# DESCRIPTION: UserPromptSubmit hook prepending git context (branch, dirty count, head sha + subject, divergence) to every prompt
 # ================
 
 # shellcheck source=_hook-common.sh
@@ -20,9 +20,7 @@ stdin_data=$(cat)
 project_dir="${CLAUDE_PROJECT_DIR:-$PWD}"
 
 # No-op gracefully outside git repos
-if ! git -C "$project_dir" rev-parse --git-dir >/dev/null 2>&1; then
-    exit 0
-fi
+git_dir=$(git -C "$project_dir" rev-parse --absolute-git-dir 2>/dev/null) || exit 0
 
 # Batched git calls: `status --branch --porcelain` returns branch + dirty
 # in one process; `log -1` returns sha + subject in one process.
@@ -37,9 +35,19 @@ dirty=$(printf '%s\n' "$status_output" | tail -n +2 | grep -c .)
 {
     IFS= read -r sha
     IFS= read -r subject
-} < <(git -C "$project_dir" log -1 --format='%h%n%s' 2>/dev/null)
+    IFS= read -r full_sha
+} < <(git -C "$project_dir" log -1 --format='%h%n%s%n%H' 2>/dev/null)
+
+# Divergence from main/master as the git post-checkout hook last counted it
+# ("<head sha>\t<base>\t<behind>\t<ahead>"), if it was counted for this HEAD.
+divergence=""
+if [[ -f "$git_dir/dotconfigs-divergence" ]]; then
+    IFS=$'\t' read -r div_head div_base div_behind div_ahead < "$git_dir/dotconfigs-divergence"
+    [[ -n "$full_sha" && "$div_head" == "$full_sha" ]] \
+        && divergence=" | vs ${div_base}: ${div_ahead} ahead, ${div_behind} behind"
+fi
 
-context="[context: branch=${branch} | dirty=${dirty} modified | head=${sha} ${subject}]"
+context="[context: branch=${branch} | dirty=${dirty} modified | head=${sha} ${subject}${divergence}]"
 
 jq -n --arg ctx "$context" '{hookSpecificOutput: {hookEventName: "UserPromptSubmit", additionalContext: $ctx}}'
 exit 0
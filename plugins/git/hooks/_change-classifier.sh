@@ -0,0 +1,94 @@
+#!/usr/bin/env bash
+# === METADATA ===
+# NAME: _change-classifier
+# TYPE: git-hook-library
+# PLUGIN: git
+# DESCRIPTION: Shared change classifier for post-merge and post-rewrite (sourced, never run by git)
+# CONFIGURABLE: rules via git config dotconfigs._change-classifier.rule ("<id>=<kind>|<advice>|<ERE>"), merged over the built-in defaults by id
+# ================
+
+# Classifies the paths changed by a merge or rebase against a rule table and
+# prints the dependency-install and migration advice. Sourced by post-merge and
+# post-rewrite after _hook-runtime.sh.
+#
+# The table is the built-in one below (the git manifest's `rules`, so a fresh
+# machine or a project-only deploy has it too) with every
+# `dotconfigs._change-classifier.rule` value from DOTCONFIGS_TOGGLES merged over
+# it by id: deploy materialises the manifest's rules there, and a project adds
+# its own with `git config --add dotconfigs._change-classifier.rule
+# '<id>=<kind>|<advice>|<ERE>'`. A value whose id is a built-in's replaces it,
+# `<id>=` alone drops it, and a bare `<kind>|<advice>|<ERE>` is just added.
+# (kind: dependency or migration; the ERE is matched against each changed path;
+# no {n,m} intervals, which mawk lacks.)
+#
+# One `git diff --name-only` and one awk pass, whatever the number of rules.
+
+_CHANGE_CLASSIFIER_RULES='npm=dependency|npm install    (or yarn install / pnpm install)|(^|/)(package\.json|package-lock\.json|yarn\.lock|pnpm-lock\.yaml)$
+pip=dependency|pip install -r requirements.txt|(^|/)requirements\.txt$
+pipenv=dependency|pipenv install|(^|/)Pipfile(\.lock)?$
+poetry=dependency|poetry install|(^|/)poetry\.lock$
+bundler=dependency|bundle install|(^|/)Gemfile(\.lock)?$
+go=dependency|go mod download|(^|/)go\.(mod|sum)$
+cargo=dependency|cargo build|(^|/)Cargo\.(toml|lock)$
+composer=dependency|composer install|(^|/)composer\.(json|lock)$
+rails=migration|Rails: rails db:migrate|(^|/)db/migrate/
+django=migration|Django: python manage.py migrate|(^|/)migrations/
+alembic=migration|Alembic: alembic upgrade head|(^|/)alembic/versions/
+prisma=migration|Prisma: prisma migrate deploy|(^|/)prisma/migrations/
+laravel=migration|Laravel: php artisan migrate|(^|/)database/migrations/'
+
+# Print the advice for the changes between two revisions.
+# Args: from, to, heading suffix (e.g. " (rebase)"), where (e.g. "in merge")
+classify_changes() {
+    # The built-in table goes in through the environment: awk -v would eat
+    # the regexes' backslashes.
+    git -c core.quotePath=false diff --name-only --no-renames "$1" "$2" 2>/dev/null \
+        | _CHANGE_CLASSIFIER_RULES="$_CHANGE_CLASSIFIER_RULES" awk -v suffix="$3" -v where="$4" '
+        # A rule with an id takes the slot of an earlier one with that id; an
+        # empty or malformed body leaves the slot off.
+        function rule(spec,    id, k) {
+            if (match(spec, /^[A-Za-z0-9_.-]+=/)) {
+                id = substr(spec, 1, RLENGTH - 1); spec = substr(spec, RLENGTH + 1)
+            } else {
+                id = "\001" (++anon)
+            }
+            if (!(id in slot)) slot[id] = ++n
+            k = slot[id]; kind[k] = ""
+            if (split(spec, f, "|") < 3 || (f[1] != "dependency" && f[1] != "migration")) return
+            kind[k] = f[1]; advice[k] = f[2]
+            re[k] = substr(spec, length(f[1]) + length(f[2]) + 3)
+        }
+        BEGIN {
+            m = split(ENVIRON["_CHANGE_CLASSIFIER_RULES"], line, "\n")
+            for (k = 1; k <= m; k++) rule(line[k])
+            m = split(ENVIRON["DOTCONFIGS_TOGGLES"], line, "\n")
+            for (k = 1; k <= m; k++) {
+                if (index(line[k], "dotconfigs._change-classifier.rule ") == 1) rule(substr(line[k], 36))
+            }
+        }
+        {
+            for (k = 1; k <= n; k++) {
+                if (kind[k] == "" || $0 !~ re[k]) continue
+                if (!(($0, kind[k]) in seen)) {
+                    seen[$0, kind[k]] = 1
+                    files[kind[k]] = files[kind[k]] "  - " $0 "\n"
+                }
+                if (!((advice[k], kind[k]) in said)) {
+                    said[advice[k], kind[k]] = 1
+                    todo[kind[k]] = todo[kind[k]] "  " (kind[k] == "migration" ? "- " : "") advice[k] "\n"
+                }
+            }
+        }
+        END {
+            if (files["dependency"] != "") {
+                printf "\n📦 DEPENDENCY CHANGES DETECTED%s\n\nChanged files:\n%s\n", suffix, files["dependency"]
+                printf "Consider running:\n%s\n", todo["dependency"]
+            }
+            if (files["migration"] != "") {
+                printf "\n🗄️  DATABASE MIGRATIONS DETECTED%s\n\nMigration files changed %s:\n%s\n", suffix, where, files["migration"]
+                printf "Consider running migrations:\n%s", todo["migration"]
+                printf "  - Or your project-specific migration command\n\n"
+            }
+        }
+    '
+}
@@ -0,0 +1,223 @@
+#!/usr/bin/env bash
+# === METADATA ===
+# NAME: _hook-runtime
+# TYPE: git-hook-library
+# PLUGIN: git
+# DESCRIPTION: Shared git-hook runtime (sourced by the hooks, never run by git)
+# CONFIGURABLE: none
+# ================
+
+# Shared runtime for the dotconfigs git hooks. Sourced from each hook, after it
+# sets HOOK, via:
+#   source "$HOOK_DIR/_hook-runtime.sh"
+# where HOOK_DIR is the hook's own directory, or that of the file it links to
+# when the runtime isn't next to the link (deployed next to the hooks, so it is
+# found in .git/hooks, the template dir and a central core.hooksPath alike).
+#
+# Replaces the helpers every hook used to carry, and the forks they cost:
+#   - _check_on reads every dotconfigs.* toggle from ONE `git config
+#     --get-regexp` made at load, instead of one `git config --bool` per check;
+#   - HOOK_TOPLEVEL, HOOK_GIT_DIR, HOOK_COMMON_DIR and HOOK_BRANCH come from
+#     ONE `git rev-parse`, and LOCAL_HOOK is the project .local hook path;
+#   - _hook_value reads a hook's other dotconfigs.<hook>.<key> settings from
+#     the same preload;
+#   - _block prints the uniform blocking message and exits;
+#   - _hook_detach and _hook_record let a hook time checks it runs as jobs;
+#   - _verified and _verified_add read and extend the verified-tree cache.
+# DOTCONFIGS_TOGGLES, DOTCONFIGS_HOOK_TOPLEVEL and DOTCONFIGS_HOOK_COMMON_DIR
+# are exported so helpers a hook launches (check-facade-consumers.py from a
+# .local hook) need no forks.
+#
+# Every run appends its per-check wall time and outcome (pass, block, skip) to
+# the hook-stats log read by `dotconfigs hooks stats`: a check runs from its
+# _check_on to the next one. DOTCONFIGS_HOOK_STATS names the log (default
+# ~/.dotconfigs/hook-stats.log; 0 turns it off) and DOTCONFIGS_HOOK_TIMING=1
+# also prints the times when the hook exits.
+
+# "\n<key> <value>\n..." as `git config --get-regexp` prints it. Raw values,
+# normalised in _check_on: a `--bool` read dies on the first malformed value
+# anywhere under dotconfigs.*, which would silently turn every check on.
+DOTCONFIGS_TOGGLES=$'\n'$(git config --get-regexp '^dotconfigs\.' 2>/dev/null)$'\n'
+
+# One rev-parse for all four. On an unborn branch it still prints every line
+# (the branch as "HEAD") before failing on the revision, so the rc is ignored.
+{
+    IFS= read -r HOOK_TOPLEVEL
+    IFS= read -r HOOK_GIT_DIR
+    IFS= read -r HOOK_COMMON_DIR
+    IFS= read -r HOOK_BRANCH
+} <<< "$(git rev-parse --show-toplevel --git-dir --git-common-dir --abbrev-ref HEAD 2>/dev/null)"
+HOOK_BRANCH="${HOOK_BRANCH:-HEAD}"
+# Project-specific hook. Resolved through the common git dir rather than a
+# cwd-relative .git/hooks so it is found from linked worktrees and under a
+# central core.hooksPath (where git itself no longer looks in .git/hooks).
+LOCAL_HOOK="${HOOK_COMMON_DIR:-.git}/hooks/$HOOK.local"
+export DOTCONFIGS_TOGGLES DOTCONFIGS_HOOK_TOPLEVEL="$HOOK_TOPLEVEL" \
+    DOTCONFIGS_HOOK_COMMON_DIR="$HOOK_COMMON_DIR"
+
+# A check runs unless it is explicitly disabled in git config. A MISSING key
+# means on, so a freshly-cloned repo whose config was never materialised still
+# enforces everything. Values read as `git config --bool` would: the last
+# occurrence wins, a bare key is true, an empty value is false.
+_check_on() {
+    [[ -n "${_HOOK_T0:-}" ]] && _hook_mark "$1"
+    local v="${DOTCONFIGS_TOGGLES##*$'\n'"dotconfigs.$HOOK.$1 "}"
+    [[ "$v" == "$DOTCONFIGS_TOGGLES" ]] && return 0
+    case "${v%%$'\n'*}" in
+        [Ff][Aa][Ll][Ss][Ee]|[Nn][Oo]|[Oo][Ff][Ff]|0|"") _HOOK_OUTCOME=skip; return 1 ;;
+    esac
+    return 0
+}
+
+# Value of dotconfigs.$HOOK.<key> into HOOK_VALUE, last occurrence winning,
+# else the default: a hook's non-toggle settings, from the same preload.
+# Args: key, default
+_hook_value() {
+    HOOK_VALUE="${DOTCONFIGS_TOGGLES##*$'\n'"dotconfigs.$HOOK.$1 "}"
+    if [[ "$HOOK_VALUE" == "$DOTCONFIGS_TOGGLES" ]]; then
+        HOOK_VALUE="$2"
+    else
+        HOOK_VALUE="${HOOK_VALUE%%$'\n'*}"
+    fi
+}
+
+# Verified-tree cache, shared by every hook and worktree:
+# $HOOK_COMMON_DIR/dotconfigs/verified holds one "<check> <key> <tree> <parent>"
+# line per tree that passed a check, where the check covered the changes from
+# the parent tree (a commit's parent's tree; "-" for the whole tree) and <key>
+# names what the verdict also depends on outside the tree (tool version,
+# pattern set). pre-commit records what it verified and skips a staged tree it
+# has already passed; pre-push skips a ref whose commits all passed. Read once,
+# on first use, with a builtin; past 1 MiB it starts over.
+_HOOK_VERIFIED_FILE="${HOOK_COMMON_DIR:-.git}/dotconfigs/verified"
+
+# Whether <check> passed <tree> against <parent> under <key>.
+# Args: check, key, tree, parent
+_verified() {
+    if [[ -z "${_HOOK_VERIFIED+set}" ]]; then
+        _HOOK_VERIFIED=""
+        IFS= read -r -d '' _HOOK_VERIFIED 2>/dev/null < "$_HOOK_VERIFIED_FILE"
+        _HOOK_VERIFIED=$'\n'"$_HOOK_VERIFIED"
+    fi
+    [[ -n "$3" && "$_HOOK_VERIFIED" == *$'\n'"$1 $2 $3 $4"$'\n'* ]]
+}
+
+# Record that <check> passed <tree> against <parent> under <key>: one append.
+# Args: check, key, tree, parent
+_verified_add() {
+    [[ -n "$3" ]] || return 0
+    [[ -d "${_HOOK_VERIFIED_FILE%/*}" ]] || mkdir -p "${_HOOK_VERIFIED_FILE%/*}" 2>/dev/null || return 0
+    _verified "$@" && return 0
+    if [[ ${#_HOOK_VERIFIED} -gt 1048576 ]]; then
+        { printf '%s %s %s %s\n' "$@" > "$_HOOK_VERIFIED_FILE"; } 2>/dev/null
+        _HOOK_VERIFIED=$'\n'
+    else
+        { printf '%s %s %s %s\n' "$@" >> "$_HOOK_VERIFIED_FILE"; } 2>/dev/null
+    fi
+    _HOOK_VERIFIED+="$1 $2 $3 $4"$'\n'
+}
+
+# Cache key for a tool's verdict: its version (spaces dashed) and one cksum of
+# the names and contents of the config files it reads, so editing a config
+# that the verified tree does not hold (an unstaged copy, a user-level file)
+# runs the check again. Missing files add nothing. Sets _VERIFIED_KEY.
+# Args: version, config file...
+_verified_key() {
+    local version="${1// /-}" sum
+    shift
+    sum=$({ printf '%s\n' "$@"; cat -- "$@"; } 2>/dev/null | cksum)
+    _VERIFIED_KEY="$version-${sum// /-}"
+}
+
+# ruff's key, shared by pre-commit (which records it) and pre-push (which looks
+# it up): its version and configs, the repo's work-tree copies and the
+# user-level ones it falls back to. Sets _VERIFIED_KEY; empty without ruff.
+_ruff_key() {
+    local version path configs=() dir="${XDG_CONFIG_HOME:-$HOME/.config}/ruff"
+    _VERIFIED_KEY=""
+    version=$(ruff --version 2>/dev/null) && [[ -n "$version" ]] || return 0
+    while IFS= read -r -d '' path; do
+        configs+=("$path")
+    done < <(git ls-files -z -- ':(glob)**/pyproject.toml' ':(glob)**/ruff.toml' ':(glob)**/.ruff.toml' 2>/dev/null)
+    _verified_key "$version" "${configs[@]}" "$dir/pyproject.toml" "$dir/ruff.toml" "$dir/.ruff.toml"
+}
+
+# Loud, uniform block: name the check and how to turn it off in deploy.json.
+# Args: check, reason
+_block() {
+    _HOOK_OUTCOME=block
+    echo "❌ BLOCKED by $HOOK/$1: $2" >&2
+    echo "   to temporarily disable this check (NOT-recommended, requires explicit user opt-in): set \`git.hooks.$HOOK.checks.$1=false\` in \`~/.dotconfigs/deploy.json\`, then: \`dotconfigs deploy\`" >&2
+    exit 1
+}
+
+# Microseconds into _HOOK_NOW: EPOCHREALTIME on bash 5, whole seconds on 3.2.
+_hook_now() {
+    if [[ -n "${EPOCHREALTIME:-}" ]]; then
+        _HOOK_NOW="${EPOCHREALTIME/[.,]/}"
+    else
+        _HOOK_NOW=$(( SECONDS * 1000000 ))
+    fi
+}
+
+# Close the running check's timer, with its outcome, and start one for the
+# next. Args: check
+_hook_mark() {
+    _hook_now
+    [[ -n "${_HOOK_CHECK:-}" ]] \
+        && _HOOK_TIMES+="$_HOOK_CHECK $_HOOK_OUTCOME $(( (_HOOK_NOW - _HOOK_T) / 1000 ))"$'\n'
+    _HOOK_CHECK="$1" _HOOK_T="$_HOOK_NOW" _HOOK_OUTCOME=pass
+}
+
+# Stop timing the running check: a hook that runs it as a background job
+# times the job itself and reports it with _hook_record.
+_hook_detach() {
+    _HOOK_CHECK=""
+}
+
+# Add a row for a check timed by the hook itself. Args: check, outcome, ms
+_hook_record() {
+    [[ -n "${_HOOK_T0:-}" ]] && _HOOK_TIMES+="$1 $2 $3"$'\n'
+}
+
+# EXIT trap: append "<repo>\t<hook>\t<check>\t<outcome>\t<ms>" per check, then
+# a "-" row for the whole hook, to the hook-stats log in ONE write (O_APPEND,
+# well under PIPE_BUF, so concurrent hooks never interleave and need no lock).
+# The log is a two-segment ring: about one run in 64 checks its size and,
+# past _HOOK_STATS_MAX bytes, renames it over <log>.1. Under
+# DOTCONFIGS_HOOK_TIMING also prints "⏱ <hook>/<check>: N ms" per check, then
+# the hook's total.
+_hook_report_times() {
+    local rc=$? check outcome ms rows="" size repo="${HOOK_TOPLEVEL:-$HOOK_GIT_DIR}"
+    _hook_mark ""
+    while read -r check outcome ms; do
+        [[ -n "$check" ]] || continue
+        rows+="$repo"$'\t'"$HOOK"$'\t'"$check"$'\t'"$outcome"$'\t'"$ms"$'\n'
+        [[ -n "${DOTCONFIGS_HOOK_TIMING:-}" ]] && printf '⏱ %s/%s: %d ms\n' "$HOOK" "$check" "$ms" >&2
+    done <<< "$_HOOK_TIMES"
+    ms=$(( (_HOOK_NOW - _HOOK_T0) / 1000 ))
+    [[ -n "${DOTCONFIGS_HOOK_TIMING:-}" ]] && printf '⏱ %s: %d ms\n' "$HOOK" "$ms" >&2
+    if [[ -n "$_HOOK_STATS" ]]; then
+        outcome=pass
+        (( rc )) && outcome=block
+        rows+="$repo"$'\t'"$HOOK"$'\t-\t'"$outcome"$'\t'"$ms"$'\n'
+        { printf '%s' "$rows" >> "$_HOOK_STATS"; } 2>/dev/null
+        if (( RANDOM % 64 == 0 )); then
+            size=$(wc -c < "$_HOOK_STATS" 2>/dev/null)
+            (( ${size:-0} > _HOOK_STATS_MAX )) && mv -f "$_HOOK_STATS" "$_HOOK_STATS.1" 2>/dev/null
+        fi
+    fi
+    return $rc
+}
+
+case "${DOTCONFIGS_HOOK_STATS:-}" in
+    0|false|no|off) _HOOK_STATS="" ;;
+    "")             _HOOK_STATS="${HOME:+$HOME/.dotconfigs/hook-stats.log}" ;;
+    *)              _HOOK_STATS="$DOTCONFIGS_HOOK_STATS" ;;
+esac
+_HOOK_STATS_MAX=262144
+if [[ -n "$_HOOK_STATS" || -n "${DOTCONFIGS_HOOK_TIMING:-}" ]]; then
+    _hook_now
+    _HOOK_T0="$_HOOK_NOW" _HOOK_T="$_HOOK_NOW" _HOOK_CHECK="" _HOOK_TIMES="" _HOOK_OUTCOME=pass
+    trap _hook_report_times EXIT
+fi
@@ -28,9 +28,17 @@ themselves:
 
 No-op on repos with no facades. Project-agnostic: lives in dotconfigs
 and works against any ``src/<project>/.../__init__.py`` layout.
+
+A pass is recorded in the hooks' verified-tree cache
+(``.git/dotconfigs/verified``) against the index tree, when the work tree
+matches it, so the same tree is not re-grepped by the next hook that runs
+the check. The key covers this script and the facade files themselves,
+which may be untracked.
 """
 
 import ast
+import hashlib
+import os
 import re
 import subprocess
 import sys
@@ -38,6 +46,14 @@ from pathlib import Path
 
 
 def repo_root() -> Path:
+    # Launched from a dotconfigs hook (e.g. its .local), the shared runtime has
+    # already resolved the work tree; trust it when we are still inside it.
+    toplevel = os.environ.get("DOTCONFIGS_HOOK_TOPLEVEL")
+    if toplevel:
+        root = Path(toplevel)
+        cwd = Path.cwd()
+        if cwd == root or root in cwd.parents:
+            return root
     out = subprocess.run(
         ["git", "rev-parse", "--show-toplevel"],
         capture_output=True,
@@ -125,14 +141,54 @@ def has_consumer(name: str, module: str, all_facades: list[Path], root: Path) ->
     return False
 
 
-def _check_on(name: str) -> bool:
-    """A check runs unless explicitly disabled in git config; missing key => on."""
-    out = subprocess.run(
-        ["git", "config", "--bool", f"dotconfigs.check-facade-consumers.{name}"],
-        capture_output=True,
-        text=True,
+def _git(root: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", *args], cwd=root, capture_output=True, text=True, check=False
+    )
+
+
+def verified_entry(root: Path, facades: list[Path]) -> tuple[Path, str] | None:
+    """(cache file, line) for this tree and facade set, or None when the work
+    tree has unstaged changes (git grep reads the work tree, not the index)."""
+    if _git(root, "diff", "--quiet").returncode != 0:
+        return None
+    tree = _git(root, "write-tree")
+    if tree.returncode != 0:
+        return None
+    key = hashlib.sha1(Path(__file__).read_bytes())
+    for f in facades:
+        key.update(str(f.relative_to(root)).encode() + b"\0" + f.read_bytes())
+    common = os.environ.get("DOTCONFIGS_HOOK_COMMON_DIR") or (
+        _git(root, "rev-parse", "--git-common-dir").stdout.strip()
     )
-    return out.stdout.strip() != "false"
+    cache = (root / common / "dotconfigs" / "verified").resolve()
+    return cache, f"facade-consumers {key.hexdigest()} {tree.stdout.strip()} -"
+
+
+def _check_on(name: str) -> bool:
+    """A check runs unless explicitly disabled in git config; missing key => on.
+
+    Reads the toggles the shared hook runtime exported (DOTCONFIGS_TOGGLES, as
+    `git config --get-regexp` prints them) when a hook launched us, else asks
+    git once. Values read like `git config --bool`: the last occurrence wins,
+    a bare key is true, an empty value is false.
+    """
+    toggles = os.environ.get("DOTCONFIGS_TOGGLES")
+    if toggles is None:
+        toggles = subprocess.run(
+            ["git", "config", "--get-regexp", r"^dotconfigs\."],
+            capture_output=True,
+            text=True,
+        ).stdout
+    key = f"dotconfigs.check-facade-consumers.{name}"
+    value = None
+    for line in toggles.splitlines():
+        k, sep, v = line.partition(" ")
+        if k == key:
+            value = v if sep else "true"
+    if value is None:
+        return True
+    return value.lower() not in {"false", "no", "off", "0", ""}
 
 
 def main() -> int:
@@ -148,6 +204,15 @@ def main() -> int:
     if not facades:
         return 0
 
+    entry = verified_entry(root, facades)
+    if entry:
+        cache, line = entry
+        try:
+            if line in cache.read_text().splitlines():
+                return 0
+        except OSError:
+            pass
+
     failures: list[str] = []
     for init in facades:
         module = module_path(init, src)
@@ -162,6 +227,13 @@ def main() -> int:
         sys.stderr.write("\n".join(failures) + "\n")
         sys.stderr.write("\nAdd a real consumer, or remove the entry from __all__.\n")
         return 1
+    if entry:
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            with cache.open("a") as fh:
+                fh.write(line + "\n")
+        except OSError:
+            pass
     return 0
 
 
@@ -0,0 +1,42 @@
+# dotconfigs bash completion (dotconfigs + dots)
+# Sourced from ~/.bashrc via ~/.dotconfigs/shell/completion.bash.
+# Candidates come from the cache `dotconfigs init`/`deploy` keep current
+# (~/.dotconfigs/completion-cache): subcommands, options, plugin names and
+# registered project paths. Reading it is builtins only - no dotconfigs, jq
+# or compgen subshell per <Tab>. Path arguments fall back to directory
+# completion (-o dirnames) when no registered project matches.
+
+_dotconfigs_complete() {
+    local cache="${DOTCONFIGS_COMPLETION_CACHE:-$HOME/.dotconfigs/completion-cache}"
+    local cur="${COMP_WORDS[COMP_CWORD]}" cmd="" i kind a b
+    COMPREPLY=()
+    [ -f "$cache" ] || return 0
+
+    # The subcommand is the first non-option word before the cursor.
+    for (( i = 1; i < COMP_CWORD; i++ )); do
+        case "${COMP_WORDS[i]}" in
+            -*) ;;
+            *) cmd="${COMP_WORDS[i]}"; break ;;
+        esac
+    done
+
+    while IFS=$'\t' read -r kind a b; do
+        if [ -z "$cmd" ]; then
+            [ "$kind" = cmd ] || continue
+        elif [[ "$cur" == -* ]]; then
+            [ "$kind" = flag ] && [ "$a" = "$cmd" ] || continue
+            a="$b"
+        else
+            case "$kind:$cmd" in
+                arg:*) [ "$a" = "$cmd" ] || continue; a="$b" ;;
+                cmd:help|plugin:status) ;;
+                project:init|project:deploy|project:undeploy|project:cleanup|project:watch) ;;
+                *) continue ;;
+            esac
+        fi
+        [[ "$a" == "$cur"* ]] && COMPREPLY+=("$a")
+    done < "$cache"
+    return 0
+}
+
+complete -o dirnames -F _dotconfigs_complete dotconfigs dots
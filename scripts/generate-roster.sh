@@ -106,15 +106,16 @@ done < <(jq -r '(.skills // {}) | keys[]' "$CLAUDE_MANIFEST")
     echo '"git": { "hooks": { "pre-commit": { "enabled": true, "checks": { "block-main": false } } } }'
     echo '```'
     echo ""
-    echo "\`dotconfigs deploy\` materialises these into git config (\`dotconfigs.<hook>.<check>\`),"
-    echo "read by the hooks at run time. To flip one ad-hoc: \`git config --global"
-    echo "dotconfigs.pre-commit.block-main false\`. A missing key means on."
+    echo "\`dotconfigs deploy\` materialises these into git config (\`dotconfigs.<hook>.<check>\`,"
+    echo "kept in the included \`~/.dotconfigs/hook-checks.gitconfig\`), read by the hooks at run time."
+    echo "To flip one ad-hoc: \`git config --global dotconfigs.pre-commit.block-main false\`. A missing"
+    echo "key means on."
     echo ""
     echo "For per-project additions without editing the shared hook, use \`.local\` scripts:"
-    echo ""
-    echo "- \`.git/hooks/pre-commit.local\` — runs at end of pre-commit"
-    echo "- \`.git/hooks/pre-push.local\` — runs at end of pre-push"
-    echo "- \`.git/hooks/commit-msg.local\` — runs at end of commit-msg"
+    echo "every git hook chains into \`.git/hooks/<hook>.local\` if it is executable, with the"
+    echo "same arguments (and, for pre-push, the same stdin). Blocking hooks (pre-commit,"
+    echo "commit-msg, pre-push, pre-rebase) run it last and fail if it fails; the others run it"
+    echo "first. This also holds in central \`core.hooksPath\` mode (\`git/config/hooks-path\`)."
     echo ""
     echo "---"
     echo ""
@@ -0,0 +1,153 @@
+"""Synthetic catalogues, selections, target trees and registries for the bench.
+
+build_catalogue lays out a throwaway dotconfigs checkout whose catalogue is a
+generated `bench` plugin of n items spread across all four deploy methods (plus
+the real `git` plugin, which the status audit reads its expected hooks from);
+seed_foreign fills the target tree with files dotconfigs doesn't own, and
+build_registry registers a fleet of project repos.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+# Share of items per method. Symlinks dominate real catalogues; the line- and
+# JSON-oriented methods each write into a handful of shared targets, which is
+# where per-target rework would show up as superlinear cost.
+METHOD_SHARE = {"symlink": 0.7, "merge": 0.1, "append": 0.1, "managed": 0.1}
+SHARED_TARGETS = 8  # merge/append/managed items share this many target files
+FANOUT = 100  # symlink targets per directory
+DISABLED_EVERY = 5  # every 5th item is toggled off in the selection
+FOREIGN_PER_DIR = 20  # foreign (non-dotconfigs) files per target directory
+
+
+def _item(method: str, i: int) -> tuple[str, dict, str, str]:
+    """One catalogue item: (name, manifest entry, source path, source text)."""
+    name = f"{method}-{i:05d}"
+    shard = f"d{i // FANOUT:03d}"
+    if method == "symlink":
+        src = f"plugins/bench/files/{shard}/{name}.sh"
+        target = f"~/.bench/links/{shard}/{name}.sh"
+        text = f"# {name}\n"
+    elif method == "merge":
+        src = f"plugins/bench/merge/{name}.json"
+        target = f"~/.bench/merged/settings-{i % SHARED_TARGETS}.json"
+        text = json.dumps({"bench": {name: {"on": True, "n": i}}}) + "\n"
+    elif method == "append":
+        src = f"plugins/bench/append/{name}"
+        target = f"~/.bench/appended/list-{i % SHARED_TARGETS}"
+        text = f"{name}\n"
+    else:
+        src = f"plugins/bench/managed/{name}"
+        target = f"~/.bench/managed/rc-{i % SHARED_TARGETS}"
+        text = f"export BENCH_{i}=1\n"
+    entry = {
+        "description": f"synthetic {method} item {i}",
+        "source": src,
+        "method": method,
+        "target": target,
+        "default": True,
+    }
+    return name, entry, src, text
+
+
+def build_catalogue(root: Path, repo: Path, n_items: int) -> list[str]:
+    """Copy bin/lib and the git plugin into root and generate plugins/bench.
+
+    Returns every symlink target directory (relative to HOME).
+    """
+    for part in ("bin", "lib"):
+        shutil.copytree(repo / part, root / part, symlinks=True)
+    shutil.copytree(repo / "plugins" / "git", root / "plugins" / "git", symlinks=True)
+
+    manifest: dict[str, dict] = {}
+    link_dirs: set[str] = set()
+    i = 0
+    for method, share in METHOD_SHARE.items():
+        count = max(1, round(n_items * share))
+        category = manifest.setdefault(method, {})
+        for _ in range(count):
+            name, entry, src, text = _item(method, i)
+            path = root / src
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+            category[name] = entry
+            if method == "symlink":
+                link_dirs.add(entry["target"][2:].rsplit("/", 1)[0])
+            i += 1
+    bench = root / "plugins" / "bench"
+    (bench / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n")
+    return sorted(link_dirs)
+
+
+def toggle_selection(deploy_json: Path) -> int:
+    """Turn every DISABLED_EVERY-th bench item off. Returns how many."""
+    data = json.loads(deploy_json.read_text())
+    off = 0
+    for items in data.get("bench", {}).values():
+        for k, name in enumerate(sorted(items)):
+            if k % DISABLED_EVERY == DISABLED_EVERY - 1:
+                items[name] = False
+                off += 1
+    deploy_json.write_text(json.dumps(data, indent=2) + "\n")
+    return off
+
+
+def seed_foreign(home: Path, link_dirs: list[str]) -> None:
+    """Fill each target directory, and each shared target file, with content
+    dotconfigs doesn't own."""
+    for rel in link_dirs:
+        d = home / rel
+        d.mkdir(parents=True, exist_ok=True)
+        for k in range(FOREIGN_PER_DIR):
+            (d / f"foreign-{k:02d}.txt").write_text("not ours\n")
+    for sub, name, text in (
+        ("merged", "settings-{}.json", '{"user": {"keep": true}}\n'),
+        ("appended", "list-{}", "user line\n"),
+        ("managed", "rc-{}", "# user rc\nexport USER_OWN=1\n"),
+    ):
+        d = home / ".bench" / sub
+        d.mkdir(parents=True, exist_ok=True)
+        for k in range(SHARED_TARGETS):
+            (d / name.format(k)).write_text(text)
+
+
+def build_registry(registry: Path, repos_root: Path, n_repos: int) -> None:
+    """Register n_repos repos, each with a .git/hooks dir and a project
+    selection, as `deploy <repo>` would have left them (no real git repos:
+    the audit only stats their hook dirs and hashes their deploy.json)."""
+    registry.parent.mkdir(parents=True, exist_ok=True)
+    lines = []
+    for k in range(n_repos):
+        repo = repos_root / f"repo-{k:04d}"
+        (repo / ".git" / "hooks").mkdir(parents=True)
+        (repo / ".git" / "config").write_text("[core]\n")
+        (repo / ".dotconfigs").mkdir()
+        (repo / ".dotconfigs" / "deploy.json").write_text('{"git": {"hooks": {}}}\n')
+        lines.append(
+            json.dumps(
+                {
+                    "path": str(repo),
+                    "deployed_at": "2026-01-01T00:00:00Z",
+                    "commit": "",
+                    "selection_hash": "",
+                    "catalogue": "",
+                    "hooks": [],
+                }
+            )
+        )
+    registry.write_text("\n".join(lines) + "\n")
+
+
+def drift(home: Path, link_dirs: list[str], every: int = 10) -> int:
+    """Delete every `every`-th deployed symlink so the next deploy has real
+    work to do. Returns how many were removed."""
+    gone = 0
+    for rel in link_dirs:
+        links = sorted(p for p in (home / rel).iterdir() if p.is_symlink())
+        for p in links[::every]:
+            p.unlink()
+            gone += 1
+    return gone
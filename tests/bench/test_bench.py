@@ -0,0 +1,205 @@
+"""Scaling benchmark: time the CLI against synthetic catalogues and fleets.
+
+Behaviour tests use the real catalogue, which is too small to show a change
+that makes a command quadratic. These time init, deploy (cold, warm, no-op),
+status, cleanup and undeploy against generated catalogues of 10/100/1k/10k
+items (tests/bench/synth.py), with target trees full of foreign files and a
+registry of a few hundred repos, and fail when a scenario regresses.
+
+Opt-in (deselected from the normal run):
+
+    make bench                                    # = pytest tests/bench -m bench
+    DOTCONFIGS_BENCH_SIZES=10,100 make bench      # skip the slow sizes (10k: ~15 min)
+    DOTCONFIGS_BENCH_UPDATE=1 make bench          # re-record the baseline
+
+Timings are written to .bench/results.json; the first run on a machine (or an
+UPDATE run) also writes .bench/baseline.json. A scenario fails when it runs
+over its baseline by more than DOTCONFIGS_BENCH_THRESHOLD (a fraction, default
+0.25) plus 50 ms. Baselines are per machine, so a second, machine-independent
+check fails when the per-item cost of a scenario grows more than 3x between
+100 items and the largest size run.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import re
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from tests.bench import synth
+
+REPO = Path(__file__).resolve().parent.parent.parent
+SIZES = [int(n) for n in os.environ.get("DOTCONFIGS_BENCH_SIZES", "10,100,1000,10000").split(",")]
+REPOS = int(os.environ.get("DOTCONFIGS_BENCH_REPOS", "200"))
+THRESHOLD = float(os.environ.get("DOTCONFIGS_BENCH_THRESHOLD", "0.25"))
+SLACK_MS = 50
+MAX_GROWTH = 3.0
+OUT_DIR = Path(os.environ.get("DOTCONFIGS_BENCH_DIR", REPO / ".bench"))
+BASELINE = OUT_DIR / "baseline.json"
+UPDATE = os.environ.get("DOTCONFIGS_BENCH_UPDATE") == "1"
+
+# "<size>/<scenario>" -> best wall time in ms, for this session.
+RESULTS: dict[str, float] = {}
+
+
+class World:
+    """A synthetic checkout + HOME + registry, and a timed CLI runner."""
+
+    def __init__(self, base: Path, n_items: int, n_repos: int) -> None:
+        self.root = base / "dotconfigs"
+        self.home = base / "home"
+        self.home.mkdir(parents=True)
+        self.link_dirs = synth.build_catalogue(self.root, REPO, n_items)
+        synth.seed_foreign(self.home, self.link_dirs)
+        registry = base / "state" / "projects.jsonl"
+        synth.build_registry(registry, base / "repos", n_repos)
+        gitconfig = base / "gitconfig"
+        gitconfig.write_text("")
+        self.env = {
+            **os.environ,
+            "HOME": str(self.home),
+            "GIT_CONFIG_GLOBAL": str(gitconfig),
+            "DOTCONFIGS_BIN_DIR": str(self.home / ".local" / "bin"),
+            "DOTCONFIGS_PROJECT_REGISTRY": str(registry),
+            "DOTCONFIGS_AUDIT_CACHE": str(base / "state" / "audit-cache"),
+            "DOTCONFIGS_PROMPT_STATE": str(base / "state" / "prompt-state"),
+            "DOTCONFIGS_COMPLETION_CACHE": str(base / "state" / "completion-cache"),
+        }
+        self.env.pop("DOTCONFIGS_TRACE", None)
+
+    def run(self, *args: str, repeat: int = 1) -> tuple[float, subprocess.CompletedProcess]:
+        """Run the CLI `repeat` times; return the best wall time (ms) and the
+        last result. stdin is closed, so conflicts are skipped, never asked."""
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            res = subprocess.run(
+                [str(self.root / "bin" / "dotconfigs"), *args],
+                env=self.env,
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                timeout=3600,
+            )
+            best = min(best, (time.perf_counter() - start) * 1000)
+            assert res.returncode == 0, f"dotconfigs {' '.join(args)}:\n{res.stderr[-2000:]}"
+        return best, res
+
+
+def _count(stdout: str, what: str) -> int:
+    m = re.search(rf"^  {what}:\s+(\d+)$", stdout, re.M)
+    assert m, f"no {what} count in:\n{stdout[-1000:]}"
+    return int(m.group(1))
+
+
+def run_scenarios(world: World, n_items: int, repeat: int) -> dict[str, float]:
+    """Time every scenario in order, checking each did its work (a command
+    that got fast by doing nothing must not read as a win)."""
+    t: dict[str, float] = {}
+    t["init"], _ = world.run("init")
+    synth.toggle_selection(world.home / ".dotconfigs" / "deploy.json")
+
+    t["deploy-cold"], res = world.run("deploy")
+    created = _count(res.stdout, "Created")
+    assert created >= int(n_items * synth.METHOD_SHARE["symlink"] * 0.8) - 1
+
+    removed = synth.drift(world.home, world.link_dirs)
+    t["deploy-warm"], res = world.run("deploy")
+    assert _count(res.stdout, "Created") == removed
+
+    t["deploy-noop"], res = world.run("deploy", repeat=repeat)
+    assert _count(res.stdout, "Created") == _count(res.stdout, "Updated") == 0
+
+    world.run("status")  # prime the audit cache; steady state is what's timed
+    t["status"], res = world.run("status", repeat=repeat)
+    assert "project git-hook audit" in res.stdout
+
+    t["cleanup"], _ = world.run("cleanup", repeat=repeat)
+
+    t["undeploy"], _ = world.run("undeploy", "--apply")
+    left = [p for d in world.link_dirs for p in (world.home / d).iterdir() if p.is_symlink()]
+    assert not left, f"{len(left)} symlinks left after undeploy"
+    return t
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _record():
+    """Write this session's timings (and, on first run or UPDATE, the baseline)."""
+    yield
+    if not RESULTS:
+        return
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    doc = {
+        "meta": {
+            "bash": subprocess.run(
+                ["bash", "-c", "echo $BASH_VERSION"], capture_output=True, text=True
+            ).stdout.strip(),
+            "platform": platform.platform(),
+            "repos": REPOS,
+        },
+        "scenarios": dict(sorted(RESULTS.items())),
+    }
+    (OUT_DIR / "results.json").write_text(json.dumps(doc, indent=2) + "\n")
+    if UPDATE or not BASELINE.exists():
+        # Merge, so re-recording some sizes keeps the others' baselines.
+        if BASELINE.exists():
+            kept = json.loads(BASELINE.read_text())["scenarios"]
+            doc["scenarios"] = dict(sorted({**kept, **RESULTS}.items()))
+        BASELINE.write_text(json.dumps(doc, indent=2) + "\n")
+
+
+@pytest.mark.bench
+@pytest.mark.parametrize("n_items", SIZES)
+def test_bench(tmp_path, n_items):
+    world = World(tmp_path, n_items, REPOS)
+    timings = run_scenarios(world, n_items, repeat=1 if n_items >= 10000 else 3)
+    for name, ms in timings.items():
+        RESULTS[f"{n_items}/{name}"] = round(ms, 1)
+
+    if UPDATE or not BASELINE.exists():
+        return
+    base = json.loads(BASELINE.read_text())["scenarios"]
+    over = []
+    for name, ms in timings.items():
+        ref = base.get(f"{n_items}/{name}")
+        if ref is not None and ms > ref * (1 + THRESHOLD) + SLACK_MS:
+            over.append(f"{name}: {ms:.0f} ms vs baseline {ref:.0f} ms")
+    assert not over, f"{n_items} items regressed:\n  " + "\n  ".join(over)
+
+
+@pytest.mark.bench
+def test_bench_scaling():
+    """Per-item cost may not grow much from 100 items to the largest size."""
+    big = max(SIZES)
+    if 100 not in SIZES or big <= 100 or f"{big}/deploy-cold" not in RESULTS:
+        pytest.skip("needs the 100-item and a larger size in this session")
+    grew = []
+    for name in ("init", "deploy-cold", "deploy-warm", "deploy-noop", "status", "cleanup", "undeploy"):
+        small = RESULTS[f"100/{name}"] / 100
+        large = RESULTS[f"{big}/{name}"] / big
+        if large > small * MAX_GROWTH:
+            grew.append(f"{name}: {large:.2f} ms/item at {big} vs {small:.2f} at 100")
+    assert not grew, "superlinear scaling:\n  " + "\n  ".join(grew)
+
+
+@pytest.mark.unit
+def test_bench_harness_smoke(tmp_path):
+    """The harness itself, at a size the normal suite can afford: every
+    scenario runs and does its work against a 10-item catalogue."""
+    world = World(tmp_path, 10, 3)
+    timings = run_scenarios(world, 10, repeat=1)
+    assert set(timings) == {
+        "init",
+        "deploy-cold",
+        "deploy-warm",
+        "deploy-noop",
+        "status",
+        "cleanup",
+        "undeploy",
+    }
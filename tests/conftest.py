@@ -11,6 +11,9 @@ from pathlib import Path
 
 import pytest
 
+# Last PID the kernel handed out in this namespace (Linux only).
+LAST_PID = Path("/proc/sys/kernel/ns_last_pid")
+
 
 def requires_cmd(name: str) -> None:
     """Skip test if a command-line binary is not available."""
@@ -29,9 +32,12 @@ def _hermetic_git(tmp_path_factory):
     """
     empty = tmp_path_factory.mktemp("gitconfig") / "empty"
     empty.write_text("")
-    saved = {k: os.environ.get(k) for k in ("GIT_CONFIG_GLOBAL", "GIT_CONFIG_SYSTEM")}
+    keys = ("GIT_CONFIG_GLOBAL", "GIT_CONFIG_SYSTEM", "DOTCONFIGS_HOOK_STATS")
+    saved = {k: os.environ.get(k) for k in keys}
     os.environ["GIT_CONFIG_GLOBAL"] = str(empty)
     os.environ["GIT_CONFIG_SYSTEM"] = str(empty)
+    # Hook runs record their timings here, not in the real ~/.dotconfigs.
+    os.environ["DOTCONFIGS_HOOK_STATS"] = str(empty.parent / "hook-stats.log")
     yield
     for key, val in saved.items():
         if val is None:
@@ -85,6 +91,53 @@ source "{dotconfigs_root}/lib/deploy.sh"
     return run_bash(script, cwd=dotconfigs_root, env=env)
 
 
+def count_forks(argv: list[str], env: dict[str, str] | None = None) -> int:
+    """Count PIDs allocated while argv runs, minus the one for argv itself.
+
+    Best of three, so a stray process elsewhere can't inflate the count. Skips
+    the test where ns_last_pid isn't available.
+    """
+    if not LAST_PID.exists():
+        pytest.skip("needs /proc/sys/kernel/ns_last_pid")
+    forks = []
+    for _ in range(3):
+        before = int(LAST_PID.read_text())
+        subprocess.run(
+            argv,
+            stdout=subprocess.DEVNULL,
+            env={**os.environ, **(env or {})},
+            check=True,
+        )
+        forks.append(int(LAST_PID.read_text()) - before - 1)
+    return min(forks)
+
+
+def isolated_env(
+    tmp_path: Path, name: str = "home", *, selection: bool = False
+) -> dict[str, str]:
+    """Env for a CLI run against a throwaway HOME and global git config.
+
+    The selection, project registry, prompt state and completion cache all
+    live under that HOME's ~/.dotconfigs/. `selection=True` seeds an empty
+    deploy.json there; otherwise `init` is left to write it.
+    """
+    home = tmp_path / name
+    state = home / ".dotconfigs"
+    state.mkdir(parents=True)
+    if selection:
+        (state / "deploy.json").write_text("{}")
+    gitconfig = tmp_path / f"{name}.gitconfig"
+    gitconfig.write_text("")
+    return {
+        "HOME": str(home),
+        "GIT_CONFIG_GLOBAL": str(gitconfig),
+        "DOTCONFIGS_DEPLOY_CONFIG": str(state / "deploy.json"),
+        "DOTCONFIGS_PROJECT_REGISTRY": str(state / "projects.jsonl"),
+        "DOTCONFIGS_PROMPT_STATE": str(state / "prompt-state"),
+        "DOTCONFIGS_COMPLETION_CACHE": str(state / "completion-cache"),
+    }
+
+
 # ---------------------------------------------------------------------------
 # Fixtures
 # ---------------------------------------------------------------------------
@@ -98,6 +151,12 @@ def dotconfigs_root() -> Path:
     return root
 
 
+@pytest.fixture()
+def env(tmp_path: Path) -> dict[str, str]:
+    """`isolated_env` under the test's tmp_path."""
+    return isolated_env(tmp_path)
+
+
 @pytest.fixture()
 def project_dir(tmp_path: Path) -> Path:
     """Temporary git-initialised directory."""
@@ -151,10 +210,14 @@ def fake_source_tree(tmp_path: Path):
 def run_dotconfigs(dotconfigs_root: Path, tmp_path_factory):
     """Run the real dotconfigs CLI entry point.
 
-    Isolates the project registry to a temp file by default so `project-deploy`
-    in tests never mutates the developer's real ~/.dotconfigs/projects.list.
+    Isolates the project registry (and the status audit cache, prompt state and
+    completion cache) to temp files by default so tests never mutate the
+    developer's real ~/.dotconfigs/.
     """
-    default_registry = tmp_path_factory.mktemp("registry") / "projects.list"
+    default_registry = tmp_path_factory.mktemp("registry") / "projects.jsonl"
+    default_audit_cache = default_registry.parent / "audit-cache"
+    default_prompt_state = default_registry.parent / "prompt-state"
+    default_completion_cache = default_registry.parent / "completion-cache"
 
     def _run(
         args: list[str] | None = None,
@@ -163,7 +226,12 @@ def run_dotconfigs(dotconfigs_root: Path, tmp_path_factory):
     ) -> BashResult:
         cli = str(dotconfigs_root / "bin" / "dotconfigs")
         cmd_args = " ".join(f'"{a}"' for a in (args or []))
-        merged_env = {"DOTCONFIGS_PROJECT_REGISTRY": str(default_registry)}
+        merged_env = {
+            "DOTCONFIGS_PROJECT_REGISTRY": str(default_registry),
+            "DOTCONFIGS_AUDIT_CACHE": str(default_audit_cache),
+            "DOTCONFIGS_PROMPT_STATE": str(default_prompt_state),
+            "DOTCONFIGS_COMPLETION_CACHE": str(default_completion_cache),
+        }
         if env:
             merged_env.update(env)
         return run_bash(f'"{cli}" {cmd_args}', cwd=cwd, env=merged_env)
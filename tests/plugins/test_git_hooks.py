@@ -7,7 +7,10 @@ Tests are conditional - only run if hooks exist in manifest.
 from __future__ import annotations
 
 import json
+import os
+import shutil
 import subprocess
+import time
 from pathlib import Path
 
 import pytest
@@ -79,6 +82,10 @@ def install_hook(dotconfigs_root: Path):
 
         hook_target = repo / ".git" / "hooks" / hook_name
         hook_target.parent.mkdir(parents=True, exist_ok=True)
+        # The bash hooks source their shared libraries (_hook-runtime.sh,
+        # _change-classifier.sh) from their own directory.
+        for lib in hook_source.parent.glob("_*.sh"):
+            (hook_target.parent / lib.name).write_text(lib.read_text())
         hook_target.write_text(hook_source.read_text())
         hook_target.chmod(0o755)
         return hook_target
@@ -114,6 +121,305 @@ class TestPreCommitHook:
         # Hook executed (returned 0 or 1, not crashed)
         assert result.returncode in [0, 1]
 
+    @pytest.mark.parametrize("parallel", ["false", "true"])
+    def test_missing_ruff_is_recorded_as_skip(
+        self, git_repo, install_hook, tmp_path, parallel
+    ):
+        """Without ruff on PATH the stats log says ruff was skipped, not passed."""
+        if shutil.which("ruff", path="/usr/bin:/bin"):
+            pytest.skip("ruff is installed system-wide")
+        install_hook(git_repo, "pre-commit")
+        for args in (
+            ["config", "dotconfigs.pre-commit.parallel", parallel],
+            ["checkout", "-q", "-b", "feature/no-ruff"],
+        ):
+            subprocess.run(["git", *args], cwd=git_repo, check=True)
+        (git_repo / "a.py").write_text("x = 1\n")
+        subprocess.run(["git", "add", "a.py"], cwd=git_repo, check=True)
+        log = tmp_path / "hook-stats.log"
+        env = {**os.environ, "PATH": "/usr/bin:/bin", "DOTCONFIGS_HOOK_STATS": str(log)}
+
+        result = subprocess.run(
+            [".git/hooks/pre-commit"], cwd=git_repo, env=env, capture_output=True
+        )
+        assert result.returncode == 0, result.stderr
+        rows = [line.split("\t") for line in log.read_text().splitlines()]
+        assert [r[3] for r in rows if r[2] == "ruff"] == ["skip"]
+
+    @pytest.mark.parametrize("parallel", ["false", "true"])
+    def test_ruff_fixes_staged_blobs_only(self, git_repo, install_hook, parallel):
+        """ruff formats what is staged; unstaged hunks stay in the work tree."""
+        requires_cmd("ruff")
+        install_hook(git_repo, "pre-commit")
+        subprocess.run(
+            ["git", "config", "dotconfigs.pre-commit.parallel", parallel],
+            cwd=git_repo,
+            check=True,
+        )
+        subprocess.run(
+            ["git", "checkout", "-q", "-b", "feature/ruff"], cwd=git_repo, check=True
+        )
+        partial = git_repo / "sub dir" / "a b.py"
+        partial.parent.mkdir()
+        partial.write_text("x=1\n")
+        whole = git_repo / "c.py"
+        whole.write_text("z=3\n")
+        subprocess.run(["git", "add", "."], cwd=git_repo, check=True)
+        partial.write_text("x=1\nw=2\n")
+
+        result = subprocess.run(
+            [".git/hooks/pre-commit"], cwd=git_repo, capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+
+        def staged(path: str) -> str:
+            return subprocess.run(
+                ["git", "show", f":{path}"],
+                cwd=git_repo,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+
+        assert staged("sub dir/a b.py") == "x = 1\n"
+        assert partial.read_text() == "x=1\nw=2\n"
+        assert "its unstaged edits are left as they are" in result.stdout
+        assert staged("c.py") == whole.read_text() == "z = 3\n"
+
+    def test_ruff_sees_first_party_packages(self, git_repo, install_hook):
+        """Import sorting knows the repo's own packages, though only the
+        importing file is staged."""
+        requires_cmd("ruff")
+        install_hook(git_repo, "pre-commit")
+        (git_repo / "pyproject.toml").write_text('[tool.ruff.lint]\nselect = ["I"]\n')
+        (git_repo / "mypkg").mkdir()
+        (git_repo / "mypkg" / "__init__.py").write_text("")
+        for args in (
+            ["add", "."],
+            ["commit", "-q", "--no-verify", "-m", "pkg"],
+            ["checkout", "-q", "-b", "feature/isort"],
+        ):
+            subprocess.run(["git", *args], cwd=git_repo, check=True)
+        sorted_imports = "import os\n\nimport requests\n\nimport mypkg\n"
+        (git_repo / "a.py").write_text(sorted_imports)
+        subprocess.run(["git", "add", "a.py"], cwd=git_repo, check=True)
+
+        result = subprocess.run(
+            [".git/hooks/pre-commit"], cwd=git_repo, capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+        staged = subprocess.run(
+            ["git", "show", ":a.py"], cwd=git_repo, capture_output=True, text=True
+        )
+        assert staged.stdout == sorted_imports
+
+    def test_ruff_runs_once_and_honours_excludes(
+        self, git_repo, install_hook, tmp_path
+    ):
+        """One `ruff format` and one `ruff check` cover every staged file, and a
+        path the project excludes is left as staged."""
+        requires_cmd("ruff")
+        install_hook(git_repo, "pre-commit")
+        log = tmp_path / "ruff.log"
+        shim = tmp_path / "bin" / "ruff"
+        shim.parent.mkdir()
+        shim.write_text(
+            f'#!/bin/sh\necho "$1" >> "{log}"\nexec "{shutil.which("ruff")}" "$@"\n'
+        )
+        shim.chmod(0o755)
+        config = '[tool.ruff]\nextend-exclude = ["gen"]\n'
+        (git_repo / "pyproject.toml").write_text(config)
+        (git_repo / "gen").mkdir()
+        for name in ("a.py", "b.py", "c.py", "gen/d.py"):
+            (git_repo / name).write_text("x=1\n")
+        subprocess.run(
+            ["git", "checkout", "-q", "-b", "feature/batch"], cwd=git_repo, check=True
+        )
+        subprocess.run(["git", "add", "."], cwd=git_repo, check=True)
+
+        env = {**os.environ, "PATH": f"{shim.parent}:{os.environ['PATH']}"}
+        result = subprocess.run(
+            [".git/hooks/pre-commit"],
+            cwd=git_repo,
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        assert result.returncode == 0, result.stderr
+        assert sorted(log.read_text().split()) == ["--version", "check", "format"]
+
+        def staged(path: str) -> str:
+            return subprocess.run(
+                ["git", "show", f":{path}"],
+                cwd=git_repo,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+
+        assert staged("a.py") == staged("c.py") == "x = 1\n"
+        assert staged("gen/d.py") == "x=1\n"
+
+    def test_secrets_fallback_names_file_line_and_caches(self, git_repo, install_hook):
+        """The awk fallback reports file:line: pattern, remembers clean blobs and
+        picks up extra patterns from git config."""
+        if shutil.which("gitleaks"):
+            pytest.skip("gitleaks installed: the awk fallback is not used")
+        install_hook(git_repo, "pre-commit")
+        subprocess.run(
+            ["git", "checkout", "-q", "-b", "feature/secrets"], cwd=git_repo, check=True
+        )
+        (git_repo / "clean.txt").write_text("nothing here\n")
+        (git_repo / "a b.txt").write_text("ok\nkey = AKIA" + "ABCDEFGHIJKLMNOP\n")
+        subprocess.run(["git", "add", "."], cwd=git_repo, check=True)
+
+        def run() -> subprocess.CompletedProcess:
+            return subprocess.run(
+                [".git/hooks/pre-commit"], cwd=git_repo, capture_output=True, text=True
+            )
+
+        result = run()
+        assert result.returncode == 1
+        assert "  a b.txt:2: aws-access-key" in result.stderr
+        assert "AKIAABCD" not in result.stderr  # the match itself is never echoed
+        clean_sha = subprocess.run(
+            ["git", "rev-parse", ":clean.txt"],
+            cwd=git_repo,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        cache = git_repo / ".git" / "dotconfigs-secrets-clean"
+        assert clean_sha in cache.read_text().splitlines()
+
+        subprocess.run(["git", "rm", "-q", "--cached", "a b.txt"], cwd=git_repo)
+        assert run().returncode == 0
+
+        # A new pattern resets the cache, so the clean blob is scanned again.
+        subprocess.run(
+            [
+                "git",
+                "config",
+                "--add",
+                "dotconfigs.pre-commit.secrets-pattern",
+                "here-word=here$",
+            ],
+            cwd=git_repo,
+            check=True,
+        )
+        result = run()
+        assert result.returncode == 1
+        assert "  clean.txt:1: here-word" in result.stderr
+
+    def test_parallel_block_stops_other_checks(self, git_repo, install_hook, tmp_path):
+        """In parallel mode a secrets block kills a slow ruff job, prints the
+        buffered output and leaves the index alone."""
+        if shutil.which("gitleaks"):
+            pytest.skip("gitleaks installed: the awk fallback is not used")
+        install_hook(git_repo, "pre-commit")
+        shim = tmp_path / "bin" / "ruff"
+        shim.parent.mkdir()
+        shim.write_text("#!/bin/sh\nsleep 5\n")
+        shim.chmod(0o755)
+        env = {**os.environ, "PATH": f"{shim.parent}{os.pathsep}{os.environ['PATH']}"}
+        for args in (
+            ["config", "dotconfigs.pre-commit.parallel", "true"],
+            ["checkout", "-q", "-b", "feature/parallel"],
+        ):
+            subprocess.run(["git", *args], cwd=git_repo, check=True)
+        (git_repo / "a.py").write_text("x=1\n")
+        (git_repo / "s.txt").write_text("key = AKIA" + "ABCDEFGHIJKLMNOP\n")
+        subprocess.run(["git", "add", "."], cwd=git_repo, check=True)
+
+        start = time.monotonic()
+        result = subprocess.run(
+            [".git/hooks/pre-commit"],
+            cwd=git_repo,
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        assert time.monotonic() - start < 4  # ruff's job was not waited for
+        assert result.returncode == 1
+        assert "  s.txt:1: aws-access-key" in result.stderr
+        assert "BLOCKED by pre-commit/secrets" in result.stderr
+        staged = subprocess.run(
+            ["git", "show", ":a.py"], cwd=git_repo, capture_output=True, text=True
+        )
+        assert staged.stdout == "x=1\n"
+
+    def test_parallel_job_killed_before_reporting(
+        self, git_repo, install_hook, tmp_path
+    ):
+        """A job killed before it reports (SIGKILL, OOM) blocks the commit
+        instead of leaving the hook waiting on the FIFO forever."""
+        install_hook(git_repo, "pre-commit")
+        shim = tmp_path / "bin" / "ruff"
+        shim.parent.mkdir()
+        shim.write_text("#!/bin/sh\nkill -KILL 0\n")  # the job's whole group
+        shim.chmod(0o755)
+        env = {**os.environ, "PATH": f"{shim.parent}{os.pathsep}{os.environ['PATH']}"}
+        for args in (
+            ["config", "dotconfigs.pre-commit.parallel", "true"],
+            ["checkout", "-q", "-b", "feature/parallel"],
+        ):
+            subprocess.run(["git", *args], cwd=git_repo, check=True)
+        (git_repo / "a.py").write_text("x=1\n")
+        subprocess.run(["git", "add", "."], cwd=git_repo, check=True)
+
+        result = subprocess.run(
+            [".git/hooks/pre-commit"],
+            cwd=git_repo,
+            capture_output=True,
+            text=True,
+            env=env,
+            timeout=20,
+        )
+        assert result.returncode == 1
+        assert "BLOCKED by pre-commit/ruff: the check died" in result.stderr
+
+    def test_resurrection_check_joins_numstats(self, git_repo, install_hook, tmp_path):
+        """During a merge, staged files changed on both sides are reported with
+        their numstats, and main's side is cached per merge-base."""
+        remote = tmp_path / "remote.git"
+        subprocess.run(["git", "init", "-q", "--bare", str(remote)], check=True)
+
+        def git(*args: str) -> subprocess.CompletedProcess:
+            return subprocess.run(
+                ["git", *args], cwd=git_repo, capture_output=True, text=True
+            )
+
+        git("remote", "add", "origin", str(remote))
+        (git_repo / "f.txt").write_text("a\nb\nc\n")
+        (git_repo / "only main.txt").write_text("x\n")
+        git("add", ".")
+        git("commit", "-q", "--no-verify", "-m", "base")
+        git("checkout", "-q", "-b", "feature/res")
+        (git_repo / "f.txt").write_text("a\nB\nc\n")
+        git("commit", "-q", "--no-verify", "-am", "branch")
+        git("checkout", "-q", "-")
+        (git_repo / "f.txt").write_text("a\nb\nc\nd\n")
+        (git_repo / "only main.txt").write_text("y\n")
+        git("commit", "-q", "--no-verify", "-am", "main")
+        git("push", "-q", "origin", "HEAD:refs/heads/main")
+        git("fetch", "-q", "origin")
+        git("checkout", "-q", "feature/res")
+        git("merge", "--no-commit", "--no-ff", "origin/main")
+        (git_repo / "f.txt").write_text("a\nB\nc\nd\n")
+        git("add", "f.txt")
+        install_hook(git_repo, "pre-commit")
+
+        result = subprocess.run(
+            [".git/hooks/pre-commit"], cwd=git_repo, capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+        assert "resurrection-check: f.txt overlaps main changes" in result.stdout
+        assert "main added/removed since merge-base: +1 -0" in result.stdout
+        assert "your branch's net diff vs main:      +1 -1" in result.stdout
+        assert "only main.txt" not in result.stdout  # not staged: no net diff
+        cache = (git_repo / ".git" / "dotconfigs-resurrection-main").read_text()
+        assert "1\t0\tf.txt" in cache.splitlines()
+
 
 # ---------------------------------------------------------------------------
 # commit-msg hook
@@ -197,6 +503,129 @@ class TestPrePushHook:
         # Hook executed (may fail if validation tools missing, that's ok)
         assert result.returncode in [0, 1]
 
+    def test_ruff_scoped_to_pushed_range(self, git_repo, install_hook, tmp_path):
+        """Only the pushed Python files are linted, unless a ruff config changed."""
+        requires_cmd("ruff")
+        remote = tmp_path / "remote.git"
+        subprocess.run(["git", "init", "-q", "--bare", str(remote)], check=True)
+
+        def git(*args: str) -> subprocess.CompletedProcess:
+            return subprocess.run(
+                ["git", *args], cwd=git_repo, capture_output=True, text=True
+            )
+
+        git("remote", "add", "origin", str(remote))
+        (git_repo / "old.py").write_text("x=1\n")  # unformatted, already upstream
+        git("add", "old.py")
+        git("commit", "-q", "--no-verify", "-m", "old")
+        assert git("push", "-q", "origin", "HEAD:refs/heads/main").returncode == 0
+        git("fetch", "-q", "origin")
+        install_hook(git_repo, "pre-push")
+        git("checkout", "-q", "-b", "feature/scoped")
+
+        (git_repo / "new file.py").write_text("y = 2\n")
+        git("add", "new file.py")
+        git("commit", "-q", "--no-verify", "-m", "new")
+        result = git("push", "origin", "feature/scoped")
+        assert result.returncode == 0, result.stderr
+        assert "Linting 1 Python file(s) changed in the push" in result.stdout
+
+        (git_repo / "ruff.toml").write_text("line-length = 100\n")
+        git("add", "ruff.toml")
+        git("commit", "-q", "--no-verify", "-m", "config")
+        result = git("push", "origin", "feature/scoped")
+        assert result.returncode != 0  # the full lint reaches old.py
+        assert "ruff config changed" in result.stdout
+        assert (git_repo / ".git" / "dotconfigs-ruff-cache").is_dir()
+
+    def test_verified_trees_skip_relinting(self, git_repo, install_hook, tmp_path):
+        """A tree pre-commit passed is not linted again: not by a retried
+        pre-commit, nor by pre-push for commits that each passed."""
+        requires_cmd("ruff")
+        remote = tmp_path / "remote.git"
+        subprocess.run(["git", "init", "-q", "--bare", str(remote)], check=True)
+
+        def git(*args: str) -> subprocess.CompletedProcess:
+            return subprocess.run(
+                ["git", *args], cwd=git_repo, capture_output=True, text=True
+            )
+
+        git("remote", "add", "origin", str(remote))
+        assert git("push", "-q", "origin", "HEAD:refs/heads/main").returncode == 0
+        git("fetch", "-q", "origin")
+        install_hook(git_repo, "pre-commit")
+        install_hook(git_repo, "pre-push")
+        git("checkout", "-q", "-b", "feature/verified")
+
+        (git_repo / "a.py").write_text("x=1\n")
+        git("add", "a.py")
+        run = [".git/hooks/pre-commit"]
+        first = subprocess.run(run, cwd=git_repo, capture_output=True, text=True)
+        assert first.returncode == 0 and "already passed" not in first.stdout
+        again = subprocess.run(run, cwd=git_repo, capture_output=True, text=True)
+        assert "ruff: skipped, this staged tree already passed" in again.stdout
+        assert git("commit", "-q", "-m", "a").returncode == 0
+        verified = (git_repo / ".git" / "dotconfigs" / "verified").read_text()
+        tree = git("rev-parse", "HEAD^{tree}").stdout.strip()
+        assert any(
+            line.startswith("ruff ") and line.split()[2] == tree
+            for line in verified.splitlines()
+        )
+
+        result = git("push", "origin", "feature/verified")
+        assert result.returncode == 0, result.stderr
+        assert "Nothing left to lint: 1 ref(s) already passed" in result.stdout
+
+        # A commit that skipped pre-commit is linted at push time.
+        (git_repo / "b.py").write_text("y = 2\n")
+        git("add", "b.py")
+        git("commit", "-q", "--no-verify", "-m", "b")
+        result = git("push", "origin", "feature/verified")
+        assert result.returncode == 0, result.stderr
+        assert "Linting 1 Python file(s) changed in the push" in result.stdout
+
+    def test_config_edit_invalidates_verified_tree(
+        self, git_repo, install_hook, tmp_path
+    ):
+        """Editing a ruff config the staged tree does not hold, an unstaged
+        copy or the user-level file, runs ruff again on the same tree."""
+        requires_cmd("ruff")
+        install_hook(git_repo, "pre-commit")
+        subprocess.run(["git", "checkout", "-q", "-b", "feature/config"], cwd=git_repo)
+        (git_repo / "ruff.toml").write_text("line-length = 88\n")
+        subprocess.run(["git", "add", "ruff.toml"], cwd=git_repo, check=True)
+        subprocess.run(
+            ["git", "commit", "-q", "--no-verify", "-m", "config"],
+            cwd=git_repo,
+            check=True,
+        )
+        (git_repo / "a.py").write_text("x = 1\n")
+        subprocess.run(["git", "add", "a.py"], cwd=git_repo, check=True)
+        user_config = tmp_path / "xdg" / "ruff" / "ruff.toml"
+        user_config.parent.mkdir(parents=True)
+        env = {**os.environ, "XDG_CONFIG_HOME": str(tmp_path / "xdg")}
+
+        def hook() -> str:
+            result = subprocess.run(
+                [".git/hooks/pre-commit"],
+                cwd=git_repo,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            assert result.returncode == 0, result.stderr
+            return result.stdout
+
+        skipped = "ruff: skipped, this staged tree already passed"
+        assert skipped not in hook()
+        assert skipped in hook()
+        (git_repo / "ruff.toml").write_text("line-length = 100\n")
+        assert skipped not in hook()
+        assert skipped in hook()
+        user_config.write_text("line-length = 100\n")
+        assert skipped not in hook()
+        assert skipped in hook()
+
 
 # ---------------------------------------------------------------------------
 # post-merge hook
@@ -222,6 +651,126 @@ class TestPostMergeHook:
 
         assert result.returncode == 0
 
+    def test_classifier_rules_from_git_config(
+        self, git_repo, install_hook, dotconfigs_root
+    ):
+        """The manifest's rule table (here set in repo config, as deploy would
+        materialise it) drives the advice after a merge."""
+        manifest = json.loads(
+            (dotconfigs_root / "plugins" / "git" / "manifest.json").read_text()
+        )
+        rules = manifest["hooks"]["_change-classifier"]["rules"]
+
+        def git(*args: str) -> None:
+            subprocess.run(
+                ["git", *args], cwd=git_repo, check=True, capture_output=True
+            )
+
+        for name, rule in rules.items():
+            value = f"{name}={rule['kind']}|{rule['advice']}|{rule['match']}"
+            git("config", "--add", "dotconfigs._change-classifier.rule", value)
+        uv_rule = r"dependency|uv sync|(^|/)uv\.lock$"
+        git("config", "--add", "dotconfigs._change-classifier.rule", uv_rule)
+        git("checkout", "-q", "-b", "feature/deps")
+        for path in ("web/package.json", "db/migrate/1.rb", "uv.lock", "pkg.json"):
+            (git_repo / path).parent.mkdir(parents=True, exist_ok=True)
+            (git_repo / path).write_text("x\n")
+        git("add", ".")
+        git("commit", "-q", "--no-verify", "-m", "deps")
+        git("checkout", "-q", "-")
+        install_hook(git_repo, "post-merge")
+
+        result = subprocess.run(
+            ["git", "merge", "-q", "--no-ff", "-m", "merge", "feature/deps"],
+            cwd=git_repo,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        out = result.stdout + result.stderr  # git sends hook output to stderr
+        assert "DEPENDENCY CHANGES DETECTED" in out
+        assert "  - web/package.json" in out and "  npm install" in out
+        assert "  - uv.lock" in out and "  uv sync" in out  # a project's own rule
+        assert "pkg.json" not in out
+        assert "DATABASE MIGRATIONS DETECTED" in out
+        assert "  - Rails: rails db:migrate" in out
+
+    def test_classifier_defaults_without_rules(
+        self, git_repo, install_hook, dotconfigs_root
+    ):
+        """With no rule in git config (a fresh machine, a project-only deploy)
+        the built-in table applies, and it matches the manifest's."""
+        manifest = json.loads(
+            (dotconfigs_root / "plugins" / "git" / "manifest.json").read_text()
+        )
+        rules = manifest["hooks"]["_change-classifier"]["rules"]
+        lib = dotconfigs_root / "plugins" / "git" / "hooks" / "_change-classifier.sh"
+        builtin = subprocess.run(
+            ["bash", "-c", f'source "{lib}"; printf %s "$_CHANGE_CLASSIFIER_RULES"'],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        table = [
+            f"{name}={r['kind']}|{r['advice']}|{r['match']}"
+            for name, r in rules.items()
+        ]
+        assert builtin.splitlines() == table
+
+        def git(*args: str) -> None:
+            subprocess.run(
+                ["git", *args], cwd=git_repo, check=True, capture_output=True
+            )
+
+        git("checkout", "-q", "-b", "feature/deps")
+        (git_repo / "package.json").write_text("{}\n")
+        git("add", ".")
+        git("commit", "-q", "--no-verify", "-m", "deps")
+        git("checkout", "-q", "-")
+        install_hook(git_repo, "post-merge")
+
+        result = subprocess.run(
+            ["git", "merge", "-q", "--no-ff", "-m", "merge", "feature/deps"],
+            cwd=git_repo,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        out = result.stdout + result.stderr
+        assert "  - package.json" in out and "  npm install" in out
+
+    def test_classifier_custom_rule_keeps_builtins(self, git_repo, install_hook):
+        """One project rule is merged over the built-in table by id: the other
+        built-ins still apply, and `<id>=` drops just that one."""
+
+        def git(*args: str) -> None:
+            subprocess.run(
+                ["git", *args], cwd=git_repo, check=True, capture_output=True
+            )
+
+        for value in (r"uv=dependency|uv sync|(^|/)uv\.lock$", "rails="):
+            git("config", "--add", "dotconfigs._change-classifier.rule", value)
+        git("checkout", "-q", "-b", "feature/deps")
+        for path in ("package.json", "uv.lock", "db/migrate/1.rb"):
+            (git_repo / path).parent.mkdir(parents=True, exist_ok=True)
+            (git_repo / path).write_text("x\n")
+        git("add", ".")
+        git("commit", "-q", "--no-verify", "-m", "deps")
+        git("checkout", "-q", "-")
+        install_hook(git_repo, "post-merge")
+
+        result = subprocess.run(
+            ["git", "merge", "-q", "--no-ff", "-m", "merge", "feature/deps"],
+            cwd=git_repo,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        out = result.stdout + result.stderr
+        assert "  - package.json" in out and "  npm install" in out
+        assert "  - uv.lock" in out and "  uv sync" in out
+        assert "MIGRATIONS" not in out
+
 
 # ---------------------------------------------------------------------------
 # post-checkout hook
@@ -248,6 +797,57 @@ class TestPostCheckoutHook:
 
         assert result.returncode in [0, 1]
 
+    @pytest.mark.parametrize("slow", [False, True])
+    def test_divergence_within_and_over_budget(
+        self, git_repo, install_hook, tmp_path, slow
+    ):
+        """The divergence count is printed within the budget, else left to
+        finish in the background; both record it for inject-context."""
+        env = dict(os.environ)
+        if slow:
+            # A git whose rev-list takes a second: well past a 100 ms budget.
+            shim = tmp_path / "bin" / "git"
+            shim.parent.mkdir()
+            real_git = shutil.which("git")
+            shim.write_text(
+                f'#!/bin/sh\n[ "$1" = rev-list ] && sleep 1\nexec {real_git} "$@"\n'
+            )
+            shim.chmod(0o755)
+            env["PATH"] = f"{shim.parent}{os.pathsep}{env['PATH']}"
+
+        def git(*args: str) -> str:
+            return subprocess.run(
+                ["git", *args], cwd=git_repo, check=True, capture_output=True, text=True
+            ).stdout.strip()
+
+        git("branch", "-M", "main")
+        git("config", "dotconfigs.post-checkout.divergence-budget-ms", "100")
+        git("checkout", "-q", "-b", "feature/div")
+        git("commit", "-q", "--allow-empty", "--no-verify", "-m", "ahead")
+        head = git("rev-parse", "HEAD")
+        install_hook(git_repo, "post-checkout")
+
+        start = time.monotonic()
+        result = subprocess.run(
+            [".git/hooks/post-checkout", "0" * 40, head, "1"],
+            cwd=git_repo,
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        elapsed = time.monotonic() - start
+        assert result.returncode == 0
+        record = git_repo / ".git" / "dotconfigs-divergence"
+        if slow:
+            assert elapsed < 0.9  # the hook did not wait for the count
+            assert "finishing in the background" in result.stdout
+            deadline = time.monotonic() + 5
+            while not record.exists() and time.monotonic() < deadline:
+                time.sleep(0.05)
+        else:
+            assert "↑ 1 commit(s) ahead" in result.stdout
+        assert record.read_text() == f"{head}\tmain\t0\t1\n"
+
 
 # ---------------------------------------------------------------------------
 # post-rewrite hook
@@ -301,6 +901,64 @@ class TestPreRebaseHook:
         assert result.returncode in [0, 1]
 
 
+# ---------------------------------------------------------------------------
+# .local chaining (per-repo and central core.hooksPath)
+# ---------------------------------------------------------------------------
+
+
+def _write_local(repo: Path, hook_name: str, body: str) -> None:
+    local = repo / ".git" / "hooks" / f"{hook_name}.local"
+    local.parent.mkdir(parents=True, exist_ok=True)
+    local.write_text("#!/bin/sh\n" + body)
+    local.chmod(0o755)
+
+
+class TestLocalChaining:
+    """Hooks chain into the repo's .git/hooks/<hook>.local - also when git runs
+    them from one central core.hooksPath directory and ignores .git/hooks."""
+
+    def test_blocking_local_hook_runs_under_central_hookspath(
+        self, git_repo, dotconfigs_root
+    ):
+        hooks_dir = dotconfigs_root / "plugins" / "git" / "hooks"
+        _write_local(git_repo, "commit-msg", 'echo "local saw $1" >&2\nexit 1\n')
+        subprocess.run(
+            ["git", "checkout", "-q", "-b", "feature/local"],
+            cwd=git_repo,
+            check=True,
+        )
+        (git_repo / "f.txt").write_text("x\n")
+        subprocess.run(["git", "add", "f.txt"], cwd=git_repo, check=True)
+
+        result = subprocess.run(
+            ["git", "-c", f"core.hooksPath={hooks_dir}", "commit", "-m", "feat: x"],
+            cwd=git_repo,
+            capture_output=True,
+            text=True,
+        )
+        # The .local hook's failure blocks the commit, as it would per-repo.
+        assert result.returncode != 0
+        assert "local saw" in result.stderr
+
+    def test_informational_local_runs_when_check_disabled(
+        self, git_repo, dotconfigs_root
+    ):
+        hooks_dir = dotconfigs_root / "plugins" / "git" / "hooks"
+        marker = git_repo / "local-ran"
+        _write_local(git_repo, "post-checkout", f'touch "{marker}"\n')
+        subprocess.run(
+            ["git", "config", "dotconfigs.post-checkout.branch-info", "false"],
+            cwd=git_repo,
+            check=True,
+        )
+        subprocess.run(
+            ["git", "-c", f"core.hooksPath={hooks_dir}", "checkout", "-q", "-b", "y"],
+            cwd=git_repo,
+            check=True,
+        )
+        assert marker.exists()
+
+
 # ---------------------------------------------------------------------------
 # Generic hook tests
 # ---------------------------------------------------------------------------
@@ -0,0 +1,182 @@
+"""Tests for plugins/git/hooks/_hook-runtime.sh.
+
+Exercises the shared git-hook runtime in isolation: toggle reads from the one
+preloaded `git config`, the cached branch and git dirs, the fork budget, and
+per-check timing and its hook-stats log.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import requires_cmd, run_bash
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def runtime(dotconfigs_root: Path) -> Path:
+    path = dotconfigs_root / "plugins" / "git" / "hooks" / "_hook-runtime.sh"
+    if not path.exists():
+        pytest.skip("_hook-runtime.sh not present")
+    return path
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    requires_cmd("git")
+    path = tmp_path / "repo"
+    subprocess.run(["git", "init", "-q", "-b", "feature/x", str(path)], check=True)
+    return path
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(["git", "-C", str(repo), *args], check=True)
+
+
+def _run(runtime: Path, repo: Path, body: str, env: dict[str, str] | None = None):
+    return run_bash(f'HOOK=pre-commit\nsource "{runtime}"\n{body}', cwd=repo, env=env)
+
+
+# ---------------------------------------------------------------------------
+# _check_on
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "value,on",
+    [
+        (None, True),
+        ("false", False),
+        ("off", False),
+        ("0", False),
+        ("", False),
+        ("true", True),
+        ("yes", True),
+        ("FALSE", False),
+    ],
+    ids=["missing", "false", "off", "zero", "empty", "true", "yes", "upper"],
+)
+def test_check_on_reads_like_git_bool(runtime, repo, value, on):
+    if value is not None:
+        _git(repo, "config", "dotconfigs.pre-commit.ruff", value)
+    result = _run(runtime, repo, "_check_on ruff && echo ON || echo OFF")
+    assert result.stdout.strip() == ("ON" if on else "OFF")
+
+
+def test_check_on_last_value_wins_and_is_scoped_to_hook(runtime, repo):
+    _git(repo, "config", "dotconfigs.pre-commit.ruff", "false")
+    _git(repo, "config", "--add", "dotconfigs.pre-commit.ruff", "true")
+    _git(repo, "config", "dotconfigs.pre-push.secrets", "false")
+    # A malformed value elsewhere must not take the other toggles down with it.
+    _git(repo, "config", "dotconfigs.pre-commit.bogus", "maybe")
+    _git(repo, "config", "dotconfigs.pre-commit.secrets", "false")
+    result = _run(
+        runtime,
+        repo,
+        "_check_on ruff && echo ruff; _check_on secrets || echo no-secrets",
+    )
+    assert result.stdout.split() == ["ruff", "no-secrets"]
+
+
+# ---------------------------------------------------------------------------
+# cached repo facts and the fork budget
+# ---------------------------------------------------------------------------
+
+
+def test_branch_and_dirs(runtime, repo):
+    body = 'printf "%s\\n" "$HOOK_BRANCH" "$HOOK_TOPLEVEL" "$HOOK_GIT_DIR" "$LOCAL_HOOK"'
+    unborn = _run(runtime, repo, body).stdout.splitlines()
+    # An unborn branch reads as HEAD, like `git rev-parse --abbrev-ref HEAD`.
+    assert unborn[0] == "HEAD"
+    assert Path(unborn[1]).resolve() == repo.resolve()
+    assert unborn[2] == ".git"
+    assert unborn[3] == ".git/hooks/pre-commit.local"
+
+    _git(
+        repo,
+        "-c",
+        "user.name=t",
+        "-c",
+        "user.email=t@t",
+        "commit",
+        "-q",
+        "--allow-empty",
+        "-m",
+        "init",
+    )
+    assert _run(runtime, repo, body).stdout.splitlines()[0] == "feature/x"
+
+
+def test_loads_with_two_git_forks(runtime, repo, tmp_path):
+    """However many checks a hook asks about, start-up costs two git calls."""
+    shim = tmp_path / "bin"
+    shim.mkdir()
+    log = tmp_path / "git.log"
+    real = subprocess.run(
+        ["bash", "-c", "command -v git"], capture_output=True, text=True
+    ).stdout.strip()
+    (shim / "git").write_text(
+        f'#!/bin/sh\necho "$1" >> "{log}"\nexec "{real}" "$@"\n'
+    )
+    (shim / "git").chmod(0o755)
+    result = _run(
+        runtime,
+        repo,
+        "for c in identity planning-block block-main secrets ruff; do _check_on $c; done",
+        env={"PATH": f"{shim}:{os.environ['PATH']}"},
+    )
+    assert result.returncode == 0, result.stderr
+    assert log.read_text().split() == ["config", "rev-parse"]
+
+
+def test_timing_reports_each_check(runtime, repo):
+    result = _run(
+        runtime,
+        repo,
+        "_check_on identity; sleep 0.05; _check_on ruff; exit 0",
+        env={"DOTCONFIGS_HOOK_TIMING": "1"},
+    )
+    assert result.returncode == 0
+    lines = result.stderr.splitlines()
+    assert lines[0].startswith("⏱ pre-commit/identity: ")
+    assert lines[1].startswith("⏱ pre-commit/ruff: ")
+    assert lines[2].startswith("⏱ pre-commit: ")
+
+
+def test_stats_log_records_each_check_and_outcome(runtime, repo, tmp_path):
+    log = tmp_path / "hook-stats.log"
+    _git(repo, "config", "dotconfigs.pre-commit.ruff", "false")
+    body = "_check_on identity; _check_on ruff; _check_on secrets && _block secrets x"
+    result = _run(runtime, repo, body, env={"DOTCONFIGS_HOOK_STATS": str(log)})
+    assert result.returncode == 1
+    rows = [line.split("\t") for line in log.read_text().splitlines()]
+    toplevel = str(repo.resolve())
+    assert [r[:4] for r in rows] == [
+        [toplevel, "pre-commit", "identity", "pass"],
+        [toplevel, "pre-commit", "ruff", "skip"],
+        [toplevel, "pre-commit", "secrets", "block"],
+        [toplevel, "pre-commit", "-", "block"],
+    ]
+    assert all(r[4].isdigit() for r in rows)
+
+    _run(runtime, repo, "exit 0", env={"DOTCONFIGS_HOOK_STATS": "0"})
+    assert len(log.read_text().splitlines()) == 4
+
+
+def test_hook_fails_closed_without_runtime(dotconfigs_root, repo):
+    hook = repo / ".git" / "hooks" / "commit-msg"
+    source = dotconfigs_root / "plugins" / "git" / "hooks" / "commit-msg"
+    hook.write_text(source.read_text())
+    hook.chmod(0o755)
+    msg = repo / "msg"
+    msg.write_text("feat: x\n")
+    result = subprocess.run(
+        [str(hook), str(msg)], cwd=repo, capture_output=True, text=True
+    )
+    assert result.returncode == 1
+    assert "_hook-runtime.sh" in result.stderr
@@ -119,6 +119,34 @@ def test_inject_context_in_git_repo(dotconfigs_root, home, tmp_path):
     assert "dirty=0 modified" in ctx
 
 
+def test_inject_context_reads_divergence_for_head(dotconfigs_root, home, tmp_path):
+    """post-checkout's recorded divergence is shown only while HEAD matches."""
+    requires_cmd("git")
+    repo = _git_repo(tmp_path / "repo")
+    head = subprocess.run(
+        ["git", "-C", str(repo), "rev-parse", "HEAD"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    record = repo / ".git" / "dotconfigs-divergence"
+
+    def context() -> str:
+        r = run_hook(
+            _hook(dotconfigs_root, "inject-context.sh"),
+            {"hook_event_name": "UserPromptSubmit"},
+            home=home,
+            env={"CLAUDE_PROJECT_DIR": str(repo)},
+        )
+        assert r.returncode == 0
+        return json.loads(r.stdout)["hookSpecificOutput"]["additionalContext"]
+
+    record.write_text(f"{head}\tmain\t2\t5\n")
+    assert context().endswith(" | vs main: 5 ahead, 2 behind]")
+    record.write_text(f"{'0' * 40}\tmain\t2\t5\n")
+    assert "vs main" not in context()
+
+
 # ---------------------------------------------------------------------------
 # session-start-env.sh (SessionStart)
 # ---------------------------------------------------------------------------
@@ -55,7 +55,8 @@ def catalogue_items(repo_root: Path, scope: str) -> list[dict]:
                         "name": name,
                         "source": e["source"],
                         "method": e["method"],
-                        "default": e.get("default", False),
+                        # A library deploys with its category, on in a seed.
+                        "default": e.get("default", e.get("library", False)),
                         "targets": scoped,
                     }
                 )
@@ -10,11 +10,20 @@ import json
 
 import pytest
 
-from tests.runtime.conftest import REPO_ROOT, catalogue_items, validate_item
+from tests.runtime.conftest import (
+    REPO_ROOT,
+    catalogue_items,
+    resolve_target,
+    validate_item,
+)
 
 pytestmark = pytest.mark.e2e
 
-MACHINE_ITEMS = catalogue_items(REPO_ROOT, "machine")
+_ALL_MACHINE_ITEMS = catalogue_items(REPO_ROOT, "machine")
+# A seeded selection enables exactly the default-on items; opt-in ones (e.g.
+# git/config/hooks-path) must stay undeployed.
+MACHINE_ITEMS = [i for i in _ALL_MACHINE_ITEMS if i["default"]]
+OPT_IN_MACHINE_ITEMS = [i for i in _ALL_MACHINE_ITEMS if not i["default"]]
 
 
 @pytest.mark.parametrize("item", MACHINE_ITEMS, ids=[i["label"] for i in MACHINE_ITEMS])
@@ -23,6 +32,15 @@ def test_machine_item_deployed(item, deployed_machine, dotconfigs_root):
     assert not failures, "\n".join(failures)
 
 
+@pytest.mark.parametrize(
+    "item", OPT_IN_MACHINE_ITEMS, ids=[i["label"] for i in OPT_IN_MACHINE_ITEMS]
+)
+def test_opt_in_item_not_deployed(item, deployed_machine):
+    for tstr in item["targets"]:
+        target = resolve_target(tstr, deployed_machine, "machine")
+        assert not target.exists() and not target.is_symlink(), target
+
+
 def test_settings_hooks_synthesised(deployed_machine):
     settings = json.loads((deployed_machine / ".claude" / "settings.json").read_text())
     assert "hooks" in settings, "synthesised hooks block missing"
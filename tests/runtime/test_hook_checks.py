@@ -19,10 +19,27 @@ pytestmark = pytest.mark.e2e
 
 
 def _git_env(tmp_path):
-    """An isolated global/system git config so --global writes don't leak."""
+    """An isolated global/system git config so --global writes don't leak.
+
+    HOME is redirected too: the toggles land in ~/.dotconfigs/hook-checks.gitconfig,
+    which the global config pulls in via include.path.
+    """
     cfg = tmp_path / "gitconfig"
     cfg.write_text("")
-    return {"GIT_CONFIG_GLOBAL": str(cfg), "GIT_CONFIG_SYSTEM": str(cfg)}, cfg
+    return {
+        "GIT_CONFIG_GLOBAL": str(cfg),
+        "GIT_CONFIG_SYSTEM": str(cfg),
+        "HOME": str(tmp_path),
+    }, cfg
+
+
+_SOURCE_LIBS = """
+      source "{root}/lib/colours.sh"
+      source "{root}/lib/discovery.sh"
+      source "{root}/lib/symlinks.sh"
+      source "{root}/lib/validation.sh"
+      source "{root}/lib/deploy.sh"
+"""
 
 
 def test_validate_accepts_checks_field(run_dotconfigs):
@@ -80,6 +97,46 @@ def test_nested_selection_yields_full_plan(run_dotconfigs, tmp_path):
     assert "plugins/git/hooks/commit-msg" in r.stdout
 
 
+def test_old_selection_still_deploys_hook_libraries(run_dotconfigs, tmp_path):
+    """A deploy.json written before the hooks' sourced libraries existed names
+    only hooks; the libraries are not toggles, so they deploy with any hook and
+    a commit through the deployed hooks still works."""
+    env, cfg = _git_env(tmp_path)
+    repo = tmp_path / "repo"
+    r = run_bash(_born_repo(repo, cfg), env=env)
+    assert r.returncode == 0, r.stderr
+    sel = repo / ".dotconfigs" / "deploy.json"
+    sel.parent.mkdir()
+    sel.write_text(
+        json.dumps({"git": {"hooks": {"pre-commit": True, "commit-msg": True}}})
+    )
+    r = run_dotconfigs(["deploy", str(repo), "--force"], env=env)
+    assert r.returncode == 0, r.stderr
+
+    hooks = repo / ".git" / "hooks"
+    assert (hooks / "_hook-runtime.sh").is_symlink()
+    assert (hooks / "_change-classifier.sh").is_symlink()
+    r = run_bash(f'cd "{repo}" && git commit -q -m "feat: x"', env=env)
+    assert r.returncode == 0, r.stderr
+
+
+def test_symlinked_hook_finds_its_runtime(dotconfigs_root, tmp_path):
+    """A repo seeded from a template that predates the runtime holds each hook as
+    a bare symlink (here a relative one, to a template link) with no
+    _hook-runtime.sh beside it; the hooks follow the links to find it."""
+    env, cfg = _git_env(tmp_path)
+    repo = tmp_path / "repo"
+    template = tmp_path / "template"
+    template.mkdir()
+    links = ""
+    for hook in ("pre-commit", "commit-msg"):
+        (template / hook).symlink_to(dotconfigs_root / "plugins/git/hooks" / hook)
+        links += f"ln -s ../../../template/{hook} .git/hooks/{hook}\n"
+    r = run_bash(_born_repo(repo, cfg) + links + 'git commit -q -m "feat: x"', env=env)
+    assert r.returncode == 0, r.stderr
+    assert not (repo / ".git" / "hooks" / "_hook-runtime.sh").exists()
+
+
 def test_materialise_and_unmaterialise(dotconfigs_root, tmp_path):
     env, _cfg = _git_env(tmp_path)
     sel = tmp_path / "deploy.json"
@@ -183,12 +240,137 @@ def test_materialise_legacy_bare_bool_hook(dotconfigs_root, tmp_path):
       source "{dotconfigs_root}/lib/validation.sh"
       source "{dotconfigs_root}/lib/deploy.sh"
       materialise_hook_checks "{dotconfigs_root}/plugins" "{sel}" false >/dev/null
-      echo "PC=$(git config --global --get-regexp '^dotconfigs\\.pre-commit\\.' | wc -l | tr -d ' ')"
-      echo "BM=$(git config --global --bool dotconfigs.pre-commit.block-main)"
+      echo "PC=$(git config --global --includes --get-regexp '^dotconfigs\\.pre-commit\\.' | grep -vc -- '-pattern ')"
+      echo "BM=$(git config --global --includes --bool dotconfigs.pre-commit.block-main)"
+      echo "PAT=$(git config --global --includes --get-all dotconfigs.pre-commit.secrets-pattern | wc -l | tr -d ' ')"
+      echo "RULE=$(git config --global --includes --get-all dotconfigs._change-classifier.rule | head -1)"
     """
     r = run_bash(script, env=env)
     assert "PC=6" in r.stdout, r.stdout + r.stderr  # all six pre-commit checks
     assert "BM=true" in r.stdout  # default-on
+    assert "PAT=2" in r.stdout  # the manifest's extra secrets patterns
+    # The change classifier's rule table, backslashes intact.
+    assert "RULE=npm=dependency|npm install" in r.stdout
+    assert r"(^|/)(package\.json|" in r.stdout
+
+
+def test_materialise_writes_include_file_not_gitconfig(dotconfigs_root, tmp_path):
+    """Toggles live in a dotconfigs-owned include file; ~/.gitconfig only gains the
+    include.path line, once. A re-deploy that flips nothing rewrites neither file.
+    """
+    env, cfg = _git_env(tmp_path)
+    checks = tmp_path / ".dotconfigs" / "hook-checks.gitconfig"
+    sel = tmp_path / "deploy.json"
+    sel.write_text(
+        json.dumps(
+            {
+                "git": {
+                    "hooks": {
+                        "pre-commit": {"enabled": True, "checks": {"block-main": False}}
+                    }
+                }
+            }
+        )
+    )
+    script = (
+        _SOURCE_LIBS.format(root=dotconfigs_root)
+        + f"""
+      materialise_hook_checks "{dotconfigs_root}/plugins" "{sel}" false >/dev/null
+      stat -c %Y.%i "{checks}" "{cfg}" > "{tmp_path}/before"
+      sleep 1
+      echo "=== again ==="
+      materialise_hook_checks "{dotconfigs_root}/plugins" "{sel}" false
+      stat -c %Y.%i "{checks}" "{cfg}" > "{tmp_path}/after"
+    """
+    )
+    r = run_bash(script, env=env)
+    assert r.returncode == 0, r.stderr
+    gitconfig = cfg.read_text()
+    assert "dotconfigs" not in gitconfig.replace("~/.dotconfigs/", ""), gitconfig
+    assert gitconfig.count("~/.dotconfigs/hook-checks.gitconfig") == 1
+    assert "block-main = false" in checks.read_text()
+    again = r.stdout.split("=== again ===", 1)[1]
+    assert "Hook check changed" not in again and "Hook check set" not in again
+    assert "unchanged" in again
+    # Same mtime and inode: the no-op deploy wrote nothing.
+    assert (tmp_path / "before").read_text() == (tmp_path / "after").read_text()
+
+
+def test_materialise_migrates_legacy_gitconfig_keys(dotconfigs_root, tmp_path):
+    """Keys an older deploy wrote straight into ~/.gitconfig would shadow the
+    include file, so the next materialise moves them out."""
+    env, cfg = _git_env(tmp_path)
+    cfg.write_text('[dotconfigs "pre-commit"]\n\tblock-main = true\n')
+    sel = tmp_path / "deploy.json"
+    sel.write_text(json.dumps({"git": {"hooks": {"pre-commit": True}}}))
+    script = (
+        _SOURCE_LIBS.format(root=dotconfigs_root)
+        + f"""
+      materialise_hook_checks "{dotconfigs_root}/plugins" "{sel}" false >/dev/null
+      echo "BM=$(git config --bool dotconfigs.pre-commit.block-main)"
+    """
+    )
+    r = run_bash(script, env=env)
+    assert "BM=true" in r.stdout, r.stdout + r.stderr
+    assert "[dotconfigs" not in cfg.read_text()
+    assert (
+        "block-main = true"
+        in (tmp_path / ".dotconfigs" / "hook-checks.gitconfig").read_text()
+    )
+
+
+def test_materialise_warns_before_replacing_hand_set_toggle(dotconfigs_root, tmp_path):
+    """A toggle flipped by hand in ~/.gitconfig is not replaced silently: the
+    deploy names it and the deploy.json key that would keep it."""
+    env, cfg = _git_env(tmp_path)
+    cfg.write_text('[dotconfigs "pre-commit"]\n\tblock-main = no\n\tidentity = true\n')
+    sel = tmp_path / "deploy.json"
+    sel.write_text(json.dumps({"git": {"hooks": {"pre-commit": True}}}))
+    script = (
+        _SOURCE_LIBS.format(root=dotconfigs_root)
+        + f"""
+      materialise_hook_checks "{dotconfigs_root}/plugins" "{sel}" false
+    """
+    )
+    r = run_bash(script, env=env)
+    assert r.returncode == 0, r.stderr
+    warnings = [line for line in r.stdout.splitlines() if "Warning" in line]
+    assert warnings == [
+        "  ! Warning: ~/.gitconfig sets dotconfigs.pre-commit.block-main = false;"
+        " deploy.json's true replaces it"
+        " (set git.hooks.pre-commit.checks.block-main to keep it)"
+    ]
+
+
+def test_materialise_keeps_users_own_keys(dotconfigs_root, tmp_path):
+    """Only catalogued <hook>.<check> toggles are migrated: the user's other
+    dotconfigs.* settings survive deploy, and do not force a rewrite."""
+    env, cfg = _git_env(tmp_path)
+    cfg.write_text(
+        '[dotconfigs "pre-commit"]\n\tparallel = true\n\tblock-main = false\n'
+        '[dotconfigs "post-checkout"]\n\tdivergence-budget-ms = 2000\n'
+    )
+    checks = tmp_path / ".dotconfigs" / "hook-checks.gitconfig"
+    sel = tmp_path / "deploy.json"
+    sel.write_text(json.dumps({"git": {"hooks": {"pre-commit": True}}}))
+    script = (
+        _SOURCE_LIBS.format(root=dotconfigs_root)
+        + f"""
+      materialise_hook_checks "{dotconfigs_root}/plugins" "{sel}" false >/dev/null
+      stat -c %Y.%i "{checks}" > "{tmp_path}/before"
+      sleep 1
+      materialise_hook_checks "{dotconfigs_root}/plugins" "{sel}" false >/dev/null
+      stat -c %Y.%i "{checks}" > "{tmp_path}/after"
+      git config --get dotconfigs.pre-commit.parallel
+      git config --get dotconfigs.post-checkout.divergence-budget-ms
+      git config --bool dotconfigs.pre-commit.block-main
+    """
+    )
+    r = run_bash(script, env=env)
+    assert r.returncode == 0, r.stderr
+    assert r.stdout.split() == ["true", "2000", "true"]
+    assert "block-main" not in cfg.read_text()
+    assert (tmp_path / "before").read_text() == (tmp_path / "after").read_text()
 
 
 def _born_repo(repo, cfg, branch="feature", *, identity=True):
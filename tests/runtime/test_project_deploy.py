@@ -7,11 +7,20 @@ from __future__ import annotations
 
 import pytest
 
-from tests.runtime.conftest import REPO_ROOT, catalogue_items, validate_item
+from tests.runtime.conftest import (
+    REPO_ROOT,
+    catalogue_items,
+    resolve_target,
+    validate_item,
+)
 
 pytestmark = pytest.mark.e2e
 
-PROJECT_ITEMS = catalogue_items(REPO_ROOT, "project")
+_ALL_PROJECT_ITEMS = catalogue_items(REPO_ROOT, "project")
+# A seeded selection enables exactly the default-on items; opt-in ones (e.g.
+# git/config/hooks-path) must stay undeployed.
+PROJECT_ITEMS = [i for i in _ALL_PROJECT_ITEMS if i["default"]]
+OPT_IN_PROJECT_ITEMS = [i for i in _ALL_PROJECT_ITEMS if not i["default"]]
 
 
 @pytest.mark.parametrize("item", PROJECT_ITEMS, ids=[i["label"] for i in PROJECT_ITEMS])
@@ -20,6 +29,15 @@ def test_project_item_deployed(item, deployed_project, dotconfigs_root):
     assert not failures, "\n".join(failures)
 
 
+@pytest.mark.parametrize(
+    "item", OPT_IN_PROJECT_ITEMS, ids=[i["label"] for i in OPT_IN_PROJECT_ITEMS]
+)
+def test_opt_in_item_not_deployed(item, deployed_project):
+    for tstr in item["targets"]:
+        target = resolve_target(tstr, deployed_project, "project")
+        assert not target.exists() and not target.is_symlink(), target
+
+
 def test_dotconfigs_excluded(deployed_project):
     exclude = (deployed_project / ".git" / "info" / "exclude").read_text()
     assert ".dotconfigs/" in exclude
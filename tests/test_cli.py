@@ -1,9 +1,15 @@
-"""E2E tests for CLI routing, help, and error handling."""
+"""E2E tests for CLI routing, help, error handling and the start-up budget."""
 
 from __future__ import annotations
 
+import re
+import subprocess
+import time
+
 import pytest
 
+from tests.conftest import count_forks, run_bash
+
 pytestmark = pytest.mark.e2e
 
 
@@ -31,10 +37,14 @@ def test_unknown_command_errors(run_dotconfigs):
         ("setup", "One-time initialisation"),
         ("init", "Seed a selection"),
         ("deploy", "Deploy a selection"),
+        ("watch", "Keep a selection deployed"),
         ("undeploy", "Remove deployed artefacts"),
         ("cleanup", "stale and broken symlinks"),
         ("status", "deployment status"),
         ("validate", "Lint catalogues"),
+        ("projects", "project registry"),
+        ("trace", "slow run"),
+        ("hooks", "git hooks spend time"),
     ],
 )
 def test_help_subcommand(run_dotconfigs, cmd, expected_fragment):
@@ -69,3 +79,42 @@ def test_init_project_on_non_git_dir(run_dotconfigs, tmp_path):
     result = run_dotconfigs(["init", str(plain)])
     assert result.returncode != 0
     assert "git" in result.stderr.lower()
+
+
+# ---------------------------------------------------------------------------
+# Start-up budget: each command sources only the libraries it uses, so the
+# cheap paths (help, prompt-time calls) stay cheap. Generous ceilings — they
+# catch a regression back to eager loading / subshell-heavy start-up, not noise.
+# ---------------------------------------------------------------------------
+
+HELP_BUDGET_MS = 150
+HELP_FORK_BUDGET = 3
+
+
+def test_help_sources_only_discovery(dotconfigs_root):
+    res = run_bash(f'bash -x "{dotconfigs_root}/bin/dotconfigs" help')
+    assert res.returncode == 0
+    assert re.findall(r"source \S*/lib/(\w+)\.sh", res.stderr) == ["discovery"]
+
+
+@pytest.mark.parametrize("command", ["validate", "undeploy", "cleanup"])
+def test_commands_skip_unused_libraries(dotconfigs_root, env, command):
+    res = run_bash(f'bash -x "{dotconfigs_root}/bin/dotconfigs" {command}', env=env)
+    loaded = set(re.findall(r"source \S*/lib/(\w+)\.sh", res.stderr))
+    assert "deploy" in loaded
+    assert not loaded & {"watch", "fleet", "completion", "audit", "init"}, loaded
+
+
+def test_help_startup_time_budget(dotconfigs_root):
+    entry = str(dotconfigs_root / "bin" / "dotconfigs")
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        subprocess.run([entry, "help"], capture_output=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    assert min(timings) < HELP_BUDGET_MS, timings
+
+
+def test_help_fork_budget(dotconfigs_root):
+    entry = str(dotconfigs_root / "bin" / "dotconfigs")
+    assert count_forks([entry, "help"]) <= HELP_FORK_BUDGET
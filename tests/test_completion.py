@@ -0,0 +1,96 @@
+"""Tests for shell completion (lib/completion.sh, plugins/shell/completions/).
+
+`init`/`deploy` keep a candidate cache current; the completion scripts only
+read it. These pin the cache contents, what the bash completion offers per
+position, and that a <Tab> costs no forks.
+"""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import count_forks, requires_cmd, run_bash
+
+pytestmark = pytest.mark.unit
+
+
+def _cache(env: dict[str, str]) -> list[list[str]]:
+    text = Path(env["DOTCONFIGS_COMPLETION_CACHE"]).read_text()
+    return [line.split("\t") for line in text.splitlines()]
+
+
+def _complete(dotconfigs_root: Path, env: dict[str, str], *words: str) -> list[str]:
+    script = dotconfigs_root / "plugins" / "shell" / "completions" / "dotconfigs.bash"
+    quoted = " ".join(f"'{w}'" for w in words)
+    res = run_bash(
+        f'source "{script}"; COMP_WORDS=({quoted}); COMP_CWORD={len(words) - 1}; '
+        '_dotconfigs_complete; printf "%s\\n" "${COMPREPLY[@]}"',
+        env=env,
+    )
+    assert res.returncode == 0, res.stderr
+    return [w for w in res.stdout.splitlines() if w]
+
+
+def test_init_and_deploy_write_cache(run_dotconfigs, tmp_path, env):
+    assert run_dotconfigs(["init"], env=env).returncode == 0
+    rows = _cache(env)
+    assert ["cmd", "deploy"] in rows
+    assert ["flag", "deploy", "--all-projects"] in rows
+    assert ["arg", "projects", "prune"] in rows
+    assert ["plugin", "shell"] in rows
+
+    repo = tmp_path / "repo"
+    subprocess.run(
+        ["git", "init", "--template=", str(repo)], capture_output=True, check=True
+    )
+    assert run_dotconfigs(["init", str(repo)], env=env).returncode == 0
+    assert run_dotconfigs(["deploy", str(repo)], env=env).returncode == 0
+    assert ["project", str(repo.resolve())] in _cache(env)
+
+
+def test_bash_completion_by_position(dotconfigs_root, run_dotconfigs, tmp_path, env):
+    repo = tmp_path / "repo"
+    subprocess.run(
+        ["git", "init", "--template=", str(repo)], capture_output=True, check=True
+    )
+    assert run_dotconfigs(["init", str(repo)], env=env).returncode == 0
+    assert run_dotconfigs(["deploy", str(repo)], env=env).returncode == 0
+
+    assert _complete(dotconfigs_root, env, "dots", "de") == ["deploy"]
+    assert _complete(dotconfigs_root, env, "dots", "deploy", "--a") == [
+        "--all-projects"
+    ]
+    assert _complete(dotconfigs_root, env, "dots", "status", "") == [
+        "claude",
+        "git",
+        "shell",
+    ]
+    assert _complete(dotconfigs_root, env, "dots", "projects", "p") == ["prune"]
+    assert _complete(dotconfigs_root, env, "dots", "deploy", str(tmp_path)) == [
+        str(repo.resolve())
+    ]
+
+
+def test_bash_completion_without_cache_is_silent(dotconfigs_root, env):
+    assert _complete(dotconfigs_root, env, "dots", "") == []
+
+
+def test_bash_completion_is_fork_free(dotconfigs_root, run_dotconfigs, env):
+    """A bash that sources the script and completes once forks nothing."""
+    assert run_dotconfigs(["init"], env=env).returncode == 0
+    script = dotconfigs_root / "plugins" / "shell" / "completions" / "dotconfigs.bash"
+    complete = (
+        f'source "{script}"; COMP_WORDS=(dots status ""); COMP_CWORD=2; '
+        "_dotconfigs_complete"
+    )
+    assert count_forks(["bash", "-c", complete], env) == 0
+
+
+def test_zsh_completion_parses(dotconfigs_root):
+    requires_cmd("zsh")
+    script = dotconfigs_root / "plugins" / "shell" / "completions" / "dotconfigs.zsh"
+    res = subprocess.run(["zsh", "-n", str(script)], capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr
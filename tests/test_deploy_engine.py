@@ -71,8 +71,15 @@ def test_resolve_plan_machine_rows_are_scoped_and_enabled(dotconfigs_root, tmp_p
     rows = [r.split(TAB) for r in res.stdout.strip().splitlines()]
     labels = [r[4] for r in rows]
     assert "claude/hooks/block-rm-rf-root" in labels
-    for enabled, _source, target, _method, _label in rows:
-        assert enabled == "true"  # seeded defaults are all on
+    for enabled, _source, target, _method, label in rows:
+        plugin, category, name = label.split("/")
+        manifest = json.loads(
+            (dotconfigs_root / "plugins" / plugin / "manifest.json").read_text()
+        )
+        # seeded values follow the manifest default (almost all on; opt-in off);
+        # a library follows its category's other items, so here it is on
+        default = manifest[category][name].get("default", True)
+        assert enabled == str(default).lower()
         assert target.startswith(("~", "/"))  # machine scope only
 
 
@@ -91,6 +98,26 @@ def test_resolve_plan_reflects_toggle(dotconfigs_root, tmp_path):
     assert enabled["claude/hooks/block-rm-rf-root"] == "true"
 
 
+def test_resolve_plan_libraries_follow_their_category(dotconfigs_root, tmp_path):
+    """Library items are not toggles: they are left out of the seed and are on
+    exactly when another item of their category is."""
+    seed = json.loads(_engine(dotconfigs_root, "seed_deploy_json project").stdout)
+    assert "_hook-runtime" not in seed["git"]["hooks"]
+
+    def libraries(selection: dict) -> set[str]:
+        sel = tmp_path / "deploy.json"
+        sel.write_text(json.dumps(selection))
+        res = _engine(dotconfigs_root, f'resolve_plan "$PLUGINS_DIR" "{sel}" project')
+        rows = [r.split(TAB) for r in res.stdout.strip().splitlines()]
+        return {r[4] for r in rows if r[0] == "true" and "/hooks/_" in r[4]}
+
+    both = {"git/hooks/_hook-runtime", "git/hooks/_change-classifier"}
+    assert libraries({"git": {"hooks": {"commit-msg": True}}}) == both
+    assert libraries({"git": {"hooks": {"commit-msg": {"enabled": True}}}}) == both
+    off = {"git": {"hooks": {"commit-msg": False, "_hook-runtime": True}}}
+    assert libraries(off) == set()
+
+
 def _synth_commands(root, sel):
     hooks = json.loads(
         _engine(root, f'synthesise_claude_hooks "$PLUGINS_DIR" "{sel}"').stdout
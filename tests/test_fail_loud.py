@@ -118,6 +118,57 @@ refcheck_settings_json "{settings}" "{tmp_path}"
     assert result.returncode == 0, result.stderr
 
 
+def test_refcheck_targets_scans_each_file_against_its_base(dotconfigs_root, tmp_path):
+    """One pass over several files: each resolves relative refs against its
+    own base, and a path referenced twice is reported at each site."""
+    a, b = tmp_path / "a", tmp_path / "b"
+    a.mkdir()
+    b.mkdir()
+    (a / "ok.sh").write_text("#!/bin/sh\n")
+    (a / "settings.json").write_text(
+        json.dumps(
+            {
+                "statusLine": {"command": "./ok.sh"},
+                "hooks": {"Stop": [{"hooks": [{"command": "/nowhere/h.sh"}]}]},
+            }
+        )
+    )
+    # ./ok.sh exists under a/ but not under b/.
+    (b / "settings.json").write_text(
+        json.dumps(
+            {
+                "statusLine": {"command": "./ok.sh"},
+                "apiKeyHelper": "/nowhere/h.sh",
+            }
+        )
+    )
+    script = f"""
+{_source(dotconfigs_root, "refcheck.sh")}
+refcheck_targets "{a}/settings.json" "{a}" "{b}/settings.json" "{b}"
+"""
+    result = run_bash(script)
+    assert result.returncode == 1
+    lines = [ln for ln in result.stderr.splitlines() if "dangling reference" in ln]
+    assert len(lines) == 3, result.stderr
+    assert f"{b}/ok.sh" in result.stderr
+    assert f"{a}/ok.sh" not in result.stderr
+    assert sum("/nowhere/h.sh" in ln for ln in lines) == 2
+
+
+def test_refcheck_targets_survives_unparseable_file(dotconfigs_root, tmp_path):
+    """A broken file falls back to per-file parses; the others still scan."""
+    (tmp_path / "bad.json").write_text("{not json")
+    good = tmp_path / "good.json"
+    good.write_text(json.dumps({"statusLine": {"command": "./gone.sh"}}))
+    script = f"""
+{_source(dotconfigs_root, "refcheck.sh")}
+refcheck_targets "{tmp_path}/bad.json" "{tmp_path}" "{good}" "{tmp_path}"
+"""
+    result = run_bash(script)
+    assert result.returncode == 1
+    assert "gone.sh" in result.stderr
+
+
 # ---------------------------------------------------------------------------
 # _warn_merge_collisions
 # ---------------------------------------------------------------------------
@@ -217,3 +268,32 @@ def test_validate_detects_broken_manifest(repo_copy):
     assert "invalid method 'frobnicate'" in result.stdout
     assert "unknown key(s): bogus" in result.stdout
     assert "source not found" in result.stdout
+
+
+def test_validate_scans_registered_projects(repo_copy, tmp_path):
+    """validate also checks each registered repo's .claude/settings.json,
+    resolving ${CLAUDE_PROJECT_DIR} against that repo."""
+    registry = tmp_path / "projects.jsonl"
+    rows = []
+    for name, cmd in (("clean", "./hook.sh"), ("broken", "${CLAUDE_PROJECT_DIR}/gone.sh")):
+        repo = tmp_path / name
+        (repo / ".claude").mkdir(parents=True)
+        (repo / "hook.sh").write_text("#!/bin/sh\n")
+        (repo / ".claude" / "settings.json").write_text(
+            json.dumps({"hooks": {"Stop": [{"hooks": [{"command": cmd}]}]}})
+        )
+        rows.append(json.dumps({"path": str(repo)}))
+    registry.write_text("\n".join(rows) + "\n")
+    env = {
+        "HOME": str(tmp_path / "home"),
+        "DOTCONFIGS_PROJECT_REGISTRY": str(registry),
+        "DOTCONFIGS_AUDIT_JOBS": "1",
+    }
+
+    result = run_bash(f'"{repo_copy}/bin/dotconfigs" validate', cwd=repo_copy, env=env)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert f"{tmp_path}/broken/gone.sh" in result.stderr
+    assert "clean" not in result.stderr
+
+    strict = run_bash(f'"{repo_copy}/bin/dotconfigs" validate --strict', cwd=repo_copy, env=env)
+    assert strict.returncode == 1
@@ -0,0 +1,116 @@
+"""Tests for fleet deploy (`dotconfigs deploy --all-projects`, lib/fleet.sh).
+
+Pins that only repos whose selection or catalogue changed are redeployed, that
+the summary follows registry order, and that one failing repo fails the run
+without stopping the others.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import run_bash
+
+pytestmark = pytest.mark.unit
+
+
+def _deployed_repo(run_dotconfigs, path: Path, env: dict[str, str]) -> Path:
+    subprocess.run(
+        ["git", "init", "--template=", str(path)], capture_output=True, check=True
+    )
+    assert run_dotconfigs(["init", str(path), "--force"], env=env).returncode == 0
+    assert run_dotconfigs(["deploy", str(path)], env=env).returncode == 0
+    return path.resolve()
+
+
+def _row(out: str, repo: Path) -> str:
+    return next(line for line in out.splitlines() if line.endswith(f" {repo}"))
+
+
+def test_fleet_redeploys_only_changed_repos(run_dotconfigs, tmp_path, env):
+    changed = _deployed_repo(run_dotconfigs, tmp_path / "changed", env)
+    same = _deployed_repo(run_dotconfigs, tmp_path / "same", env)
+
+    selection = changed / ".dotconfigs" / "deploy.json"
+    data = json.loads(selection.read_text())
+    data["git"]["hooks"]["pre-push"] = False
+    selection.write_text(json.dumps(data, indent=2))
+
+    res = run_dotconfigs(["deploy", "--all-projects", "--jobs", "2"], env=env)
+    assert res.returncode == 0, res.stdout + res.stderr
+    assert "deployed" in _row(res.stdout, changed)
+    assert "unchanged" in _row(res.stdout, same)
+    assert res.stdout.index(str(changed)) < res.stdout.index(str(same))
+    assert not (changed / ".git" / "hooks" / "pre-push").exists()
+    assert "1 deployed, 1 skipped, 0 failed" in res.stdout
+
+    # The redeploy was recorded: nothing is stale any more.
+    again = run_dotconfigs(["deploy", "--all-projects"], env=env)
+    assert "0 deployed, 2 skipped" in again.stdout
+
+
+def test_fleet_force_redeploys_everything(run_dotconfigs, tmp_path, env):
+    repo = _deployed_repo(run_dotconfigs, tmp_path / "repo", env)
+    res = run_dotconfigs(["deploy", "--all-projects", "--force"], env=env)
+    assert res.returncode == 0, res.stderr
+    assert "deployed" in _row(res.stdout, repo)
+
+
+def test_fleet_failure_exits_nonzero(dotconfigs_root, tmp_path, env):
+    """A repo whose deploy errors is reported FAILED with its log, the others
+    still deploy, and the run exits non-zero."""
+    # A catalogue copy with an opt-in item whose source is missing: deploying
+    # it is a hard error, so only the repo that selects it fails.
+    root = tmp_path / "dotconfigs"
+    for part in ("bin", "lib", "plugins"):
+        shutil.copytree(dotconfigs_root / part, root / part, symlinks=True)
+    manifest = root / "plugins" / "git" / "manifest.json"
+    data = json.loads(manifest.read_text())
+    data["config"]["bogus"] = {
+        "source": "plugins/git/templates/no-such-file",
+        "method": "symlink",
+        "target": ".git/dotconfigs-bogus",
+        "default": False,
+    }
+    manifest.write_text(json.dumps(data, indent=2))
+
+    def cli(*args: str):
+        return run_bash(
+            f'"{root / "bin" / "dotconfigs"}" ' + " ".join(f'"{a}"' for a in args),
+            env=env,
+        )
+
+    repos = []
+    for name in ("good", "broken"):
+        repo = tmp_path / name
+        subprocess.run(
+            ["git", "init", "--template=", str(repo)], capture_output=True, check=True
+        )
+        assert cli("init", str(repo), "--force").returncode == 0
+        repos.append(repo.resolve())
+    good, broken = repos
+    assert cli("deploy", str(good)).returncode == 0
+    selection = broken / ".dotconfigs" / "deploy.json"
+    data = json.loads(selection.read_text())
+    data["git"]["config"]["bogus"] = True
+    selection.write_text(json.dumps(data, indent=2))
+    registry = Path(env["DOTCONFIGS_PROJECT_REGISTRY"])
+    registry.write_text(registry.read_text() + f"{broken}\n")
+
+    res = cli("deploy", "--all-projects", "--force")
+    assert res.returncode != 0
+    assert "deployed" in _row(res.stdout, good)
+    assert "FAILED" in _row(res.stdout, broken)
+    assert f"--- {broken} ---" in res.stdout
+    assert "source not found" in res.stdout
+
+
+def test_fleet_rejects_path(run_dotconfigs, tmp_path, env):
+    res = run_dotconfigs(["deploy", str(tmp_path), "--all-projects"], env=env)
+    assert res.returncode != 0
+    assert "drop the path" in res.stderr
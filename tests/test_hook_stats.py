@@ -0,0 +1,81 @@
+"""Tests for `dotconfigs hooks stats` (lib/hookstats.sh).
+
+The git hooks append per-check timings to the hook-stats log (see
+tests/plugins/test_hook_runtime.py); these pin the report over a known log:
+percentiles, ordering, outcome counts, the rotated segment and the filters.
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import requires_cmd
+
+pytestmark = pytest.mark.unit
+
+
+def _row(text: str, hook: str, check: str) -> list[str]:
+    m = re.search(rf"^  {re.escape(hook)}\s+{re.escape(check)}\s+([\d ]+)$", text, re.M)
+    assert m, f"no {hook}/{check} row in:\n{text}"
+    return m.group(1).split()
+
+
+@pytest.fixture
+def stats_log(tmp_path: Path) -> Path:
+    """Twenty pre-commit runs in repo a (ruff 1..20 ms, one block, the
+    identity check skipped), the older ten in the rotated segment, and one
+    post-checkout run in repo b."""
+    requires_cmd("git")
+    a, b = tmp_path / "a", tmp_path / "b"
+    for repo in (a, b):
+        subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    log = tmp_path / "hook-stats.log"
+    rows = []
+    for ms in range(1, 21):
+        outcome = "block" if ms == 20 else "pass"
+        rows.append(f"{a}\tpre-commit\tidentity\tskip\t0\n")
+        rows.append(f"{a}\tpre-commit\truff\t{outcome}\t{ms}\n")
+        rows.append(f"{a}\tpre-commit\t-\t{outcome}\t{ms + 1}\n")
+    Path(f"{log}.1").write_text("".join(rows[:30]))
+    log.write_text("".join(rows[30:]) + f"{b}\tpost-checkout\t-\tpass\t7\n")
+    return log
+
+
+def test_hooks_stats_percentiles(run_dotconfigs, stats_log):
+    env = {"DOTCONFIGS_HOOK_STATS": str(stats_log)}
+    res = run_dotconfigs(["hooks", "stats"], env=env)
+    assert res.returncode == 0, res.stderr
+    assert "21 run(s) across 2 repo(s)" in res.stdout
+    # RUNS BLOCK SKIP P50 P95 MAX
+    assert _row(res.stdout, "pre-commit", "ruff") == ["20", "1", "0", "10", "19", "20"]
+    identity = _row(res.stdout, "pre-commit", "identity")
+    assert identity == ["20", "0", "20", "0", "0", "0"]
+    assert _row(res.stdout, "pre-commit", "(whole hook)")[:2] == ["20", "1"]
+    # Within a hook: the whole-hook row, then the slowest check first.
+    order = re.findall(r"^  pre-commit\s+(\S+)", res.stdout, re.M)
+    assert order == ["(whole", "ruff", "identity"]
+
+
+def test_hooks_stats_filters(run_dotconfigs, stats_log, tmp_path):
+    env = {"DOTCONFIGS_HOOK_STATS": str(stats_log)}
+    res = run_dotconfigs(["hooks", "stats", "--repo", str(tmp_path / "b")], env=env)
+    assert res.returncode == 0, res.stderr
+    whole = _row(res.stdout, "post-checkout", "(whole hook)")
+    assert whole == ["1", "0", "0", "7", "7", "7"]
+    assert "pre-commit" not in res.stdout
+
+    res = run_dotconfigs(["hooks", "stats", "--hook", "pre-push"], env=env)
+    assert res.returncode != 0
+    assert "No hook runs match" in res.stderr
+
+
+def test_hooks_stats_without_log(run_dotconfigs, tmp_path):
+    res = run_dotconfigs(
+        ["hooks", "stats"], env={"DOTCONFIGS_HOOK_STATS": str(tmp_path / "none.log")}
+    )
+    assert res.returncode != 0
+    assert "No hook stats" in res.stderr
@@ -0,0 +1,155 @@
+"""Tests for `--json` NDJSON output (lib/events.sh).
+
+deploy/status/undeploy/cleanup stream one event per item and a closing summary
+on stdout, and nothing else. These pin the event shape, that events stream as
+they happen, and that per-item failures carry their reason.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import run_bash
+
+pytestmark = pytest.mark.unit
+
+ITEM_KEYS = {
+    "event",
+    "command",
+    "label",
+    "target",
+    "method",
+    "prior",
+    "action",
+    "duration_ms",
+    "error",
+}
+
+
+def _events(stdout: str) -> list[dict]:
+    return [json.loads(line) for line in stdout.splitlines()]
+
+
+def test_deploy_json_stream_shape(run_dotconfigs, env):
+    assert run_dotconfigs(["init"], env=env).returncode == 0
+    res = run_dotconfigs(["deploy", "--json"], env=env)
+    assert res.returncode == 0, res.stderr
+    assert "\033[" not in res.stdout
+
+    events = _events(res.stdout)
+    assert events[0] == {
+        "event": "start",
+        "command": "deploy",
+        "scope": "machine",
+        "dry_run": False,
+    }
+    items = [e for e in events if e["event"] == "item"]
+    assert items and all(set(e) == ITEM_KEYS for e in items)
+    hook = next(e for e in items if e["label"] == "claude/hooks/notify")
+    assert (hook["prior"], hook["action"], hook["error"]) == (
+        "not-deployed",
+        "created",
+        None,
+    )
+    assert Path(hook["target"]).is_symlink()
+
+    summary = events[-1]
+    assert summary["event"] == "summary" and summary["ok"] is True
+    assert summary["created"] == sum(e["action"] == "created" for e in items)
+
+
+def test_deploy_json_streams_before_exit(dotconfigs_root, run_dotconfigs, env):
+    assert run_dotconfigs(["init"], env=env).returncode == 0
+    proc = subprocess.Popen(
+        [str(dotconfigs_root / "bin" / "dotconfigs"), "deploy", "--json"],
+        env={**os.environ, **env},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        assert json.loads(proc.stdout.readline())["event"] == "start"
+        assert json.loads(proc.stdout.readline())["event"] == "item"
+        assert proc.poll() is None, "first item arrived only at exit"
+    finally:
+        proc.stdout.close()
+        proc.wait(timeout=60)
+
+
+def test_status_and_undeploy_json(run_dotconfigs, env):
+    assert run_dotconfigs(["init"], env=env).returncode == 0
+    assert run_dotconfigs(["deploy"], env=env).returncode == 0
+    hook = Path(env["HOME"]) / ".claude" / "hooks" / "notify.sh"
+    hook.unlink()
+    hook.write_text("mine\n")
+
+    status = _events(run_dotconfigs(["status", "--json"], env=env).stdout)
+    item = next(e for e in status if e.get("label") == "claude/hooks/notify")
+    assert (item["prior"], item["action"]) == ("drifted-foreign", "checked")
+    assert status[-1]["drifted"] == 1
+
+    undeploy = _events(
+        run_dotconfigs(["undeploy", "--apply", "--json"], env=env).stdout
+    )
+    item = next(e for e in undeploy if e.get("label") == "claude/hooks/notify")
+    assert item["action"] == "skipped"
+    assert item["error"].startswith("Skipped (foreign)")
+    assert hook.read_text() == "mine\n"
+
+
+def test_cleanup_json_reports_swept_links(run_dotconfigs, env, dotconfigs_root):
+    assert run_dotconfigs(["init"], env=env).returncode == 0
+    assert run_dotconfigs(["deploy"], env=env).returncode == 0
+    orphan = Path(env["HOME"]) / ".claude" / "hooks" / "gone.sh"
+    orphan.symlink_to(dotconfigs_root / "plugins" / "claude" / "hooks" / "gone.sh")
+
+    events = _events(run_dotconfigs(["cleanup", "--apply", "--json"], env=env).stdout)
+    (item,) = [e for e in events if e["event"] == "item"]
+    assert (item["target"], item["action"]) == (str(orphan), "removed")
+    assert events[-1]["removed"] == 1
+    assert not orphan.is_symlink()
+
+
+def test_item_error_is_reported(dotconfigs_root, tmp_path, env):
+    """A missing source is an item-level error: the stream carries its reason,
+    the summary says not ok, and the exit status is non-zero."""
+    root = tmp_path / "dotconfigs"
+    for part in ("bin", "lib", "plugins"):
+        shutil.copytree(dotconfigs_root / part, root / part, symlinks=True)
+    (root / "plugins" / "claude" / "hooks" / "notify.sh").unlink()
+    cli = root / "bin" / "dotconfigs"
+    assert run_bash(f'"{cli}" init', env=env).returncode == 0
+
+    res = run_bash(f'"{cli}" deploy --json', env=env)
+    assert res.returncode != 0
+    events = _events(res.stdout)
+    item = next(e for e in events if e.get("label") == "claude/hooks/notify")
+    assert item["action"] == "error"
+    assert "source not found" in item["error"]
+    assert events[-1]["ok"] is False and events[-1]["errors"] >= 1
+
+
+def test_json_rejects_all_projects(run_dotconfigs, env):
+    res = run_dotconfigs(["deploy", "--all-projects", "--json"], env=env)
+    assert res.returncode != 0
+    assert "--all-projects" in res.stderr
+
+
+def test_json_string_escapes_every_control_character(dotconfigs_root):
+    """Each of U+0001-U+001F is escaped, so any value round-trips through a
+    strict JSON parser."""
+    value = "".join(chr(c) for c in range(1, 32)) + 'x"\\é\x7f'
+    script = f"""
+      source "{dotconfigs_root}/lib/events.sh"
+      _json_string "$VALUE"
+      printf '%s' "$_JSON_STR"
+    """
+    res = run_bash(script, env={"VALUE": value})
+    assert res.returncode == 0, res.stderr
+    assert json.loads(res.stdout) == value
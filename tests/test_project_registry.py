@@ -0,0 +1,161 @@
+"""Tests for the project registry (lib/registry.sh, `dotconfigs projects`).
+
+Every project deploy appends one JSON record; the latest record per repo wins.
+These pin the record shape, the "needs redeploy" query, prune/gc, and that
+legacy flat registries (bare paths, the old projects.list) keep working.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import isolated_env, run_bash
+
+pytestmark = pytest.mark.unit
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ENTRY = REPO_ROOT / "bin" / "dotconfigs"
+
+
+def _repo(path: Path) -> Path:
+    subprocess.run(
+        ["git", "init", "--template=", str(path)], capture_output=True, check=True
+    )
+    return path
+
+
+@pytest.fixture()
+def env(tmp_path: Path) -> dict[str, str]:
+    """`status` refuses to run without a global selection, so seed an empty one."""
+    return isolated_env(tmp_path, selection=True)
+
+
+def _records(env: dict[str, str]) -> list[dict]:
+    text = Path(env["DOTCONFIGS_PROJECT_REGISTRY"]).read_text()
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def _deploy(run_dotconfigs, repo: Path, env: dict[str, str]) -> None:
+    assert run_dotconfigs(["init", str(repo), "--force"], env=env).returncode == 0
+    res = run_dotconfigs(["deploy", str(repo), "--force"], env=env)
+    assert res.returncode == 0, res.stderr
+
+
+def test_deploy_appends_structured_record(run_dotconfigs, tmp_path, env):
+    repo = _repo(tmp_path / "repo")
+    _deploy(run_dotconfigs, repo, env)
+
+    (rec,) = _records(env)
+    assert rec["path"] == str(repo.resolve())
+    assert rec["deployed_at"].endswith("Z")
+    assert len(rec["selection_hash"]) == 40
+    assert len(rec["catalogue"]) == 40
+    assert "commit-msg" in rec["hooks"]
+
+    # A redeploy appends; the listing still shows the repo once.
+    assert run_dotconfigs(["deploy", str(repo)], env=env).returncode == 0
+    assert len(_records(env)) == 2
+    listing = run_dotconfigs(["projects", "list"], env=env).stdout
+    assert listing.count(str(repo.resolve())) == 1
+    assert "current" in listing
+
+
+def test_selection_change_flags_needs_redeploy(run_dotconfigs, tmp_path, env):
+    repo = _repo(tmp_path / "repo")
+    _deploy(run_dotconfigs, repo, env)
+
+    selection = repo / ".dotconfigs" / "deploy.json"
+    data = json.loads(selection.read_text())
+    data["git"]["hooks"]["pre-commit"] = False
+    selection.write_text(json.dumps(data, indent=2))
+
+    res = run_dotconfigs(["status", "git"], env=env)
+    audit = res.stdout.split("project git-hook audit", 1)[-1]
+    assert "(needs redeploy: selection changed)" in audit
+    assert "1 repo(s) need redeploy" in audit
+    assert "needs redeploy: selection changed" in run_dotconfigs(
+        ["projects"], env=env
+    ).stdout
+
+    assert run_dotconfigs(["deploy", str(repo)], env=env).returncode == 0
+    again = run_dotconfigs(["status", "git"], env=env).stdout
+    assert "needs redeploy" not in again
+
+
+def test_prune_is_dry_run_by_default(run_dotconfigs, tmp_path, env):
+    keep = _repo(tmp_path / "keep")
+    registry = Path(env["DOTCONFIGS_PROJECT_REGISTRY"])
+    registry.write_text(f"{keep}\n{tmp_path / 'gone'}\n")
+
+    dry = run_dotconfigs(["projects", "prune"], env=env)
+    assert f"Would prune: {tmp_path / 'gone'}" in dry.stdout
+    assert "gone" in registry.read_text()
+
+    assert run_dotconfigs(["projects", "prune", "--apply"], env=env).returncode == 0
+    assert _records(env) == [{"path": str(keep)}]
+
+
+def test_gc_compacts_to_latest_record(run_dotconfigs, tmp_path, env):
+    repo = _repo(tmp_path / "repo")
+    registry = Path(env["DOTCONFIGS_PROJECT_REGISTRY"])
+    registry.write_text(
+        f"{repo}\n"
+        + json.dumps({"path": str(repo), "deployed_at": "2026-01-01T00:00:00Z"})
+        + "\n"
+        + json.dumps({"path": str(repo), "deployed_at": "2026-02-01T00:00:00Z"})
+        + "\n"
+    )
+    res = run_dotconfigs(["projects", "gc"], env=env)
+    assert "3 record(s) -> 1 repo(s)" in res.stdout
+    assert _records(env) == [
+        {"path": str(repo), "deployed_at": "2026-02-01T00:00:00Z"}
+    ]
+
+
+@pytest.mark.parametrize(
+    "command,kept", [("registry_prune false", 1), ("registry_gc", 2)]
+)
+def test_rewrite_keeps_records_appended_meanwhile(tmp_path, env, command, kept):
+    """A fleet worker's deploy landing while prune/gc rewrites the log survives."""
+    keep, late = _repo(tmp_path / "keep"), _repo(tmp_path / "late")
+    registry = Path(env["DOTCONFIGS_PROJECT_REGISTRY"])
+    registry.write_text(f"{keep}\n{tmp_path / 'gone'}\n")
+
+    res = run_bash(
+        f"""
+        source "{REPO_ROOT}/lib/registry.sh"
+        PROJECT_REGISTRY="{registry}"
+        eval "_read_$(declare -f registry_latest)"
+        registry_latest() {{
+            _read_registry_latest
+            printf '%s\\n' '{{"path": "{late}"}}' >> "$PROJECT_REGISTRY"
+        }}
+        {command}
+        """,
+        env=env,
+    )
+    assert res.returncode == 0, res.stderr
+    paths = [str(keep), str(tmp_path / "gone")][:kept] + [str(late)]
+    assert [r["path"] for r in _records(env)] == paths
+    assert sorted(p.name for p in registry.parent.iterdir()) == [
+        "deploy.json",
+        "projects.jsonl",
+    ]
+
+
+def test_legacy_projects_list_is_adopted(tmp_path: Path):
+    repo = _repo(tmp_path / "repo")
+    home = tmp_path / "home"
+    (home / ".dotconfigs").mkdir(parents=True)
+    (home / ".dotconfigs" / "deploy.json").write_text("{}")
+    (home / ".dotconfigs" / "projects.list").write_text(f"{repo}\n")
+
+    res = run_bash(f'"{ENTRY}" projects list', env={"HOME": str(home)})
+    assert res.returncode == 0, res.stderr
+    assert str(repo) in res.stdout
+    assert not (home / ".dotconfigs" / "projects.list").exists()
+    assert (home / ".dotconfigs" / "projects.jsonl").read_text() == f"{repo}\n"
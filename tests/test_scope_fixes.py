@@ -18,7 +18,10 @@ git hooks inert:
 from __future__ import annotations
 
 import json
+import os
+import re
 import subprocess
+import time
 from pathlib import Path
 
 import pytest
@@ -209,6 +212,57 @@ def test_undeploy_clears_templatedir(tmp_path: Path):
     assert templatedir() == ""
 
 
+def test_hookspath_mode_wires_include_and_audits_central_dir(tmp_path: Path):
+    """Selecting git/config/hooks-path includes the core.hooksPath gitconfig from
+    ~/.gitconfig; status then verifies the one central hook dir, not each repo's
+    .git/hooks. Deselecting drops the include again."""
+    manifest = json.loads((REPO_ROOT / "plugins/git/manifest.json").read_text())
+    hooks = {name: True for name in manifest["hooks"]}
+    home = tmp_path / "home"
+    (home / ".dotconfigs").mkdir(parents=True)
+    gitconfig = tmp_path / "gitconfig"
+    gitconfig.write_text("")
+    deploy_json = home / ".dotconfigs" / "deploy.json"
+    repo = tmp_path / "repo"
+    subprocess.run(
+        ["git", "init", "--template=", str(repo)], capture_output=True, check=True
+    )
+    registry = tmp_path / "projects.list"
+    registry.write_text(str(repo) + "\n")
+    env = {
+        "HOME": str(home),
+        "GIT_CONFIG_GLOBAL": str(gitconfig),
+        "GIT_CONFIG_SYSTEM": str(gitconfig),
+        "DOTCONFIGS_DEPLOY_CONFIG": str(deploy_json),
+        "DOTCONFIGS_PROJECT_REGISTRY": str(registry),
+    }
+
+    def hooks_path():
+        return run_bash(
+            "git config --global --includes --get core.hooksPath || true", env=env
+        ).stdout.strip()
+
+    deploy_json.write_text(
+        json.dumps({"git": {"hooks": hooks, "config": {"hooks-path": True}}})
+    )
+    assert run_bash(f'"{ENTRY}" deploy --force', env=env).returncode == 0
+    assert hooks_path() == "~/.dotconfigs/git-template/hooks"
+
+    # The repo has no .git/hooks copies, yet is clean: the central dir covers it.
+    status = run_bash(f'"{ENTRY}" status git', env=env)
+    audit = (status.stdout + status.stderr).split("project git-hook audit", 1)[-1]
+    assert "central hooks" in audit
+    assert str(repo) in audit
+    assert "missing" not in audit and "dangling" not in audit
+
+    deploy_json.write_text(
+        json.dumps({"git": {"hooks": hooks, "config": {"hooks-path": False}}})
+    )
+    assert run_bash(f'"{ENTRY}" deploy --force', env=env).returncode == 0
+    assert hooks_path() == ""
+    assert "hooks-path" not in gitconfig.read_text()
+
+
 def _undeploy_hooks(root: Path, target: Path, dry: str = "false"):
     script = f"""
 set -e
@@ -319,6 +373,196 @@ def test_status_audit_clean_then_flags_drift(run_dotconfigs, tmp_path: Path):
     assert "missing" in drift_audit
 
 
+def test_status_audit_flags_stale_copy_and_fix_stale(run_dotconfigs, tmp_path: Path):
+    """A hook copied from an older source is `stale`; --fix-stale backs it up
+    and redeploys only that repo."""
+    repo = tmp_path / "repo"
+    subprocess.run(
+        ["git", "init", "--template=", str(repo)], capture_output=True, check=True
+    )
+    home = _home_with_selection(tmp_path)
+    registry = tmp_path / "projects.jsonl"
+    env = {
+        "HOME": str(home),
+        "DOTCONFIGS_DEPLOY_CONFIG": str(home / ".dotconfigs" / "deploy.json"),
+        "DOTCONFIGS_PROJECT_REGISTRY": str(registry),
+    }
+    assert run_dotconfigs(["init", str(repo), "--force"], env=env).returncode == 0
+    assert run_dotconfigs(["deploy", str(repo), "--force"], env=env).returncode == 0
+    hashes = json.loads(registry.read_text().splitlines()[-1])["hook_hashes"]
+    source = ENTRY.parent.parent / "plugins" / "git" / "hooks" / "commit-msg"
+    assert hashes["commit-msg"] == subprocess.run(
+        ["git", "hash-object", str(source)], capture_output=True, text=True
+    ).stdout.strip()
+
+    hook = repo / ".git" / "hooks" / "commit-msg"
+    hook.unlink()
+    hook.write_text("#!/bin/sh\n# an old dotconfigs commit-msg\n")
+    res = run_dotconfigs(["status", "git"], env=env)
+    audit = res.stdout.split("project git-hook audit", 1)[-1]
+    assert re.search(r"^\s+stale commit-msg$", audit, re.M), audit
+    assert "dotconfigs status --fix-stale" in audit
+
+    fixed = run_dotconfigs(["status", "git", "--fix-stale"], env=env)
+    assert fixed.returncode == 0, fixed.stdout + fixed.stderr
+    assert "Fleet summary: 1 deployed" in fixed.stdout
+    assert hook.is_symlink()
+    assert list(hook.parent.glob("commit-msg.bak.*"))
+    again = run_dotconfigs(["status", "git"], env=env)
+    assert f"[OK] {repo}" in again.stdout.split("project git-hook audit", 1)[-1]
+
+
+def _old_repo(path: Path) -> Path:
+    """A hookless repo whose .git/hooks and .git/config mtimes are safely in the
+    past, so the audit cache will trust them."""
+    subprocess.run(
+        ["git", "init", "--template=", str(path)], capture_output=True, check=True
+    )
+    (path / ".git" / "hooks").mkdir(exist_ok=True)
+    for p in (path / ".git" / "hooks", path / ".git" / "config"):
+        os.utime(p, (1_000_000_000, 1_000_000_000))
+    return path
+
+
+def test_status_audit_parallel_keeps_registry_order(tmp_path: Path):
+    repos = [_old_repo(tmp_path / f"repo{i}") for i in range(5)]
+    registry = tmp_path / "projects.list"
+    # Reverse order: output must follow the registry, not completion order.
+    registry.write_text("".join(f"{r}\n" for r in reversed(repos)))
+    home = _home_with_selection(tmp_path)
+    res = run_bash(
+        f'"{ENTRY}" status git',
+        env={
+            "HOME": str(home),
+            "DOTCONFIGS_PROJECT_REGISTRY": str(registry),
+            "DOTCONFIGS_AUDIT_JOBS": "2",
+        },
+    )
+    out = res.stdout
+    positions = [out.index(f"{r}") for r in reversed(repos)]
+    assert positions == sorted(positions), out
+
+
+def test_status_audit_cache_skips_unchanged_repos(tmp_path: Path):
+    repo = _old_repo(tmp_path / "repo")
+    registry = tmp_path / "projects.list"
+    registry.write_text(f"{repo}\n")
+    home = _home_with_selection(tmp_path)
+    cache = home / ".dotconfigs" / "audit-cache"
+
+    first = _audit(registry, home)
+    assert "missing" in first
+    lines = cache.read_text().splitlines()
+    assert lines[1].endswith(f"|{repo}")
+    # Doctor the cached record: a cache hit must print it instead of re-auditing.
+    stamp = lines[1].split("|", 1)[0]
+    cache.write_text(f"{lines[0]}\n{stamp}|hooks||" + f"|{repo}\n")
+    assert "missing" not in _audit(registry, home)
+
+    # A changed .git/hooks mtime invalidates the entry.
+    os.utime(repo / ".git" / "hooks", (1_000_000_100, 1_000_000_100))
+    assert "missing" in _audit(registry, home)
+
+
+def test_status_no_projects_skips_audit(tmp_path: Path):
+    registry = tmp_path / "projects.list"
+    registry.write_text(f"{_old_repo(tmp_path / 'repo')}\n")
+    home = _home_with_selection(tmp_path)
+    res = run_bash(
+        f'"{ENTRY}" status git --no-projects',
+        env={"HOME": str(home), "DOTCONFIGS_PROJECT_REGISTRY": str(registry)},
+    )
+    assert res.returncode == 0, res.stderr
+    assert "project git-hook audit" not in res.stdout
+
+
+def test_audit_worker_times_out(dotconfigs_root, tmp_path: Path):
+    """A repo whose audit stalls yields a `timeout` record instead of blocking."""
+    out = tmp_path / "rec"
+    script = f"""
+set -e
+source "{dotconfigs_root}/lib/audit.sh"
+_audit_repo() {{ sleep 20; }}
+start=$SECONDS
+_audit_repo_bounded "{out}" 1 /nowhere "" false
+echo "elapsed=$((SECONDS - start))"
+"""
+    res = run_bash(script)
+    assert out.read_text() == "timeout||\n", res.stderr
+    assert int(res.stdout.split("elapsed=")[1]) < 5
+
+
+def test_audit_timeout_kills_the_workers_children(dotconfigs_root, tmp_path: Path):
+    """The stalled git/jq a timed-out worker was waiting on dies with it."""
+    if not Path("/proc/self/stat").exists():
+        pytest.skip("needs /proc")
+    pid = tmp_path / "pid"
+    script = f"""
+source "{dotconfigs_root}/lib/audit.sh"
+_audit_repo() {{ sh -c 'echo $$ > "{pid}"; exec sleep 20'; }}
+_audit_repo_bounded "{tmp_path / 'rec'}" 1 /nowhere "" false
+"""
+    res = run_bash(script)
+    assert res.returncode == 0, res.stderr
+    stat = Path(f"/proc/{pid.read_text().strip()}/stat")
+    for _ in range(60):
+        try:
+            if stat.read_text().split()[2] == "Z":
+                return
+        except FileNotFoundError:
+            return
+        time.sleep(0.05)
+    pytest.fail("the worker's child outlived the timeout")
+
+
+def test_perf_profile_tunes_repo_and_reverses_on_undeploy(run_dotconfigs, tmp_path):
+    """A project deploy includes the perf fragment from .git/config and registers
+    the repo for git maintenance; undeploy reverses both, restores the repo keys
+    register changed, and the audit then reports the repo as untuned."""
+    repo = tmp_path / "repo"
+    subprocess.run(
+        ["git", "init", "--template=", str(repo)], capture_output=True, check=True
+    )
+    # The user's own value, which register overwrites with false.
+    subprocess.run(
+        ["git", "-C", str(repo), "config", "maintenance.auto", "true"], check=True
+    )
+    home = _home_with_selection(tmp_path)
+    gitconfig = tmp_path / "gitconfig"
+    gitconfig.write_text("")
+    env = {
+        "HOME": str(home),
+        "GIT_CONFIG_GLOBAL": str(gitconfig),
+        "DOTCONFIGS_DEPLOY_CONFIG": str(home / ".dotconfigs" / "deploy.json"),
+        "DOTCONFIGS_PROJECT_REGISTRY": str(tmp_path / "projects.list"),
+    }
+
+    def git_get(*args):
+        return run_bash(
+            f'git -C "{repo}" config {" ".join(args)} || true', env=env
+        ).stdout.strip()
+
+    def audit():
+        res = run_dotconfigs(["status", "git"], env=env)
+        return (res.stdout + res.stderr).split("project git-hook audit", 1)[-1]
+
+    assert run_dotconfigs(["init", str(repo), "--force"], env=env).returncode == 0
+    assert run_dotconfigs(["deploy", str(repo), "--force"], env=env).returncode == 0
+    assert git_get("--get", "feature.manyFiles") == "true"
+    assert git_get("--get", "core.untrackedCache") == "true"
+    assert str(repo.resolve()) in git_get("--global", "--get-all", "maintenance.repo")
+    assert git_get("--local", "--get", "maintenance.strategy") == "incremental"
+    assert "untuned" not in audit()
+
+    res = run_dotconfigs(["undeploy", str(repo), "--apply"], env=env)
+    assert res.returncode == 0, res.stderr
+    assert git_get("--get", "feature.manyFiles") == ""
+    assert git_get("--global", "--get-all", "maintenance.repo") == ""
+    assert git_get("--local", "--get", "maintenance.auto") == "true"
+    assert git_get("--local", "--get", "maintenance.strategy") == ""
+    assert "(untuned)" in audit()
+
+
 # ---------------------------------------------------------------------------
 # attribution guards: must BLOCK across every guarded surface
 # ---------------------------------------------------------------------------
@@ -0,0 +1,82 @@
+"""Tests for `dotconfigs status --prompt` (lib/prompt.sh).
+
+The prompt summary is read back from the verdict the last machine deploy or
+status recorded. These pin that it tracks that verdict, that cheap mtime/kind
+checks turn it `stale` when the selection or a sampled target moves, and that
+the prompt path stays fork-free.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import time
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import count_forks, run_bash
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def deployed(run_dotconfigs, env) -> dict[str, str]:
+    assert run_dotconfigs(["init"], env=env).returncode == 0
+    res = run_dotconfigs(["deploy"], env=env)
+    assert res.returncode == 0, res.stderr
+    return env
+
+
+def _sentinels(env: dict[str, str], kind: str) -> list[Path]:
+    lines = Path(env["DOTCONFIGS_PROMPT_STATE"]).read_text().splitlines()
+    return [Path(v) for k, _, v in (line.partition("\t") for line in lines) if k == kind]
+
+
+def _prompt(run_dotconfigs, env: dict[str, str]) -> tuple[int, str]:
+    res = run_dotconfigs(["status", "--prompt"], env=env)
+    return res.returncode, res.stdout.strip()
+
+
+def test_prompt_reports_recorded_verdict(run_dotconfigs, env):
+    assert run_dotconfigs(["init"], env=env).returncode == 0
+    assert _prompt(run_dotconfigs, env) == (2, "unknown")
+
+    assert run_dotconfigs(["deploy"], env=env).returncode == 0
+    assert _prompt(run_dotconfigs, env) == (0, "ok")
+    assert 1 <= len(_sentinels(env, "link")) <= 8
+
+
+def test_sentinel_change_is_stale_until_status(run_dotconfigs, deployed):
+    env = deployed
+    _sentinels(env, "link")[0].unlink()
+    assert _prompt(run_dotconfigs, env) == (2, "stale")
+
+    assert run_dotconfigs(["status", "--no-projects"], env=env).returncode == 0
+    assert _prompt(run_dotconfigs, env) == (1, "1 drifted")
+
+
+def test_selection_edit_is_stale(run_dotconfigs, deployed):
+    env = deployed
+    selection = Path(env["DOTCONFIGS_DEPLOY_CONFIG"])
+    later = time.time() + 5
+    os.utime(selection, (later, later))
+    assert _prompt(run_dotconfigs, env) == (2, "stale")
+
+
+def test_plugin_filter_rejected(run_dotconfigs, deployed):
+    res = run_dotconfigs(["status", "git", "--prompt"], env=deployed)
+    assert res.returncode != 0
+    assert "drop the plugin" in res.stderr
+
+
+def test_prompt_loads_only_prompt_lib(dotconfigs_root, deployed):
+    entry = dotconfigs_root / "bin" / "dotconfigs"
+    res = run_bash(f'bash -x "{entry}" status --prompt', env=deployed)
+    assert res.stdout.strip() == "ok"
+    assert re.findall(r"source \S*/lib/(\w+)\.sh", res.stderr) == ["prompt"]
+
+
+def test_prompt_is_fork_free(dotconfigs_root, deployed):
+    entry = str(dotconfigs_root / "bin" / "dotconfigs")
+    assert count_forks([entry, "status", "--prompt"], deployed) == 0
@@ -0,0 +1,63 @@
+"""Tests for DOTCONFIGS_TRACE and `dotconfigs trace report` (lib/trace.sh).
+
+Tracing wraps engine functions and external commands in shims; these pin the
+trace records, the report, and that a traced deploy does exactly what an
+untraced one does.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import isolated_env
+
+pytestmark = pytest.mark.unit
+
+
+def _summary(stdout: str) -> list[str]:
+    return re.findall(r"^  (?:Created|Updated|Unchanged|Removed|Skipped):.*$", stdout, re.M)
+
+
+def test_traced_deploy_matches_untraced(run_dotconfigs, tmp_path):
+    plain, traced = isolated_env(tmp_path, "plain"), isolated_env(tmp_path, "traced")
+    trace = tmp_path / "trace.jsonl"
+    for env in (plain, traced):
+        assert run_dotconfigs(["init"], env=env).returncode == 0
+
+    a = run_dotconfigs(["deploy"], env=plain)
+    b = run_dotconfigs(["deploy"], env={**traced, "DOTCONFIGS_TRACE": str(trace)})
+    assert a.returncode == b.returncode == 0, b.stderr
+    assert _summary(a.stdout) == _summary(b.stdout)
+    assert (Path(traced["HOME"]) / ".claude" / "hooks" / "notify.sh").is_symlink()
+
+    records = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert records[0]["type"] == "run" and records[0]["argv"] == "deploy"
+    calls = [r for r in records if r["type"] == "call"]
+    link = next(r for r in calls if r["fn"] == "link_one")
+    assert link["item"].startswith("claude/") and link["rc"] == 0
+    assert 0 <= link["self_us"] <= link["us"]
+    forks = {r["cmd"] for r in records if r["type"] == "fork"}
+    assert {"readlink", "jq"} <= forks
+
+
+def test_trace_report(run_dotconfigs, tmp_path, env):
+    trace = tmp_path / "trace.jsonl"
+    assert run_dotconfigs(["init"], env=env).returncode == 0
+    run_dotconfigs(["deploy"], env={**env, "DOTCONFIGS_TRACE": str(trace)})
+
+    res = run_dotconfigs(["trace", "report", str(trace)], env=env)
+    assert res.returncode == 0, res.stderr
+    assert "Trace of 'dotconfigs deploy'" in res.stdout
+    assert re.search(r"^\s+deploy_module\s+\d+\s", res.stdout, re.M)
+    assert re.search(r"^\s+readlink\s+\d+$", res.stdout, re.M)
+    assert re.search(r"^\s+claude/\S+\s+\d+\s+\w+ \d+", res.stdout, re.M)
+
+
+def test_trace_report_without_trace(run_dotconfigs, env):
+    res = run_dotconfigs(["trace", "report"], env=env)
+    assert res.returncode != 0
+    assert "DOTCONFIGS_TRACE=1" in res.stderr
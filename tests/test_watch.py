@@ -0,0 +1,150 @@
+"""Tests for `dotconfigs watch` (lib/watch.sh).
+
+Runs the watcher against a copy of the catalogue (so sources can be edited)
+with the polling backend, and pins that each kind of change re-applies the
+affected item: a selection toggle, a managed-block source edit, and a deployed
+target that drifts.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import signal
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from tests.conftest import isolated_env
+
+pytestmark = pytest.mark.unit
+
+
+def _wait_for(check: Callable[[], bool], timeout: float = 15.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if check():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+@pytest.fixture()
+def watched(dotconfigs_root: Path, tmp_path: Path, request):
+    """The watcher running on a fresh repo. An indirect param names a hook to
+    leave in the repo beforehand, as a foreign file the first deploy meets."""
+    root = tmp_path / "dotconfigs"
+    for part in ("bin", "lib", "plugins"):
+        shutil.copytree(dotconfigs_root / part, root / part, symlinks=True)
+    env = {
+        **os.environ,
+        **isolated_env(tmp_path, selection=True),
+        "DOTCONFIGS_WATCH_INTERVAL": "0.2",
+        "DOTCONFIGS_WATCH_DEBOUNCE": "0.2",
+    }
+    repo = tmp_path / "repo"
+    subprocess.run(
+        ["git", "init", "--template=", str(repo)], capture_output=True, check=True
+    )
+    cli = str(root / "bin" / "dotconfigs")
+    subprocess.run(
+        [cli, "init", str(repo), "--force"], env=env, check=True, capture_output=True
+    )
+
+    conflict = getattr(request, "param", None)
+    if conflict:
+        (repo / ".git" / "hooks").mkdir()
+        (repo / ".git" / "hooks" / conflict).write_text("#!/bin/sh\n")
+
+    log = tmp_path / "watch.log"
+    with log.open("w") as out:
+        proc = subprocess.Popen(
+            [cli, "watch", str(repo), "--poll"],
+            env=env,
+            stdout=out,
+            stderr=subprocess.STDOUT,
+        )
+    try:
+        assert _wait_for(lambda: "Watching" in log.read_text()), log.read_text()
+        yield root, repo.resolve(), log
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+
+
+def test_watch_reapplies_selection_toggle(watched):
+    _, repo, log = watched
+    pre_push = repo / ".git" / "hooks" / "pre-push"
+    assert pre_push.is_symlink()
+
+    selection = repo / ".dotconfigs" / "deploy.json"
+    data = json.loads(selection.read_text())
+    data["git"]["hooks"]["pre-push"] = False
+    selection.write_text(json.dumps(data, indent=2))
+
+    assert _wait_for(lambda: not pre_push.is_symlink()), log.read_text()
+    assert _wait_for(lambda: "latency" in log.read_text()), log.read_text()
+
+
+def test_watch_rerenders_managed_block_on_source_edit(watched):
+    root, repo, log = watched
+    source = root / "plugins" / "git" / "templates" / "project-excludes"
+    source.write_text(source.read_text() + "watched-pattern/\n")
+    exclude = repo / ".git" / "info" / "exclude"
+    assert _wait_for(lambda: "watched-pattern/" in exclude.read_text()), (
+        log.read_text()
+    )
+
+
+def test_watch_restores_drifted_target(watched):
+    _, repo, log = watched
+    hook = repo / ".git" / "hooks" / "commit-msg"
+    hook.unlink()
+    assert _wait_for(hook.is_symlink), log.read_text()
+
+
+@pytest.mark.parametrize("watched", ["pre-push"], indirect=True)
+def test_watch_skips_conflicts_without_prompting(watched):
+    _, repo, log = watched
+    assert (repo / ".git" / "hooks" / "pre-push").read_text() == "#!/bin/sh\n"
+    assert "Options:" not in log.read_text()
+
+
+def test_inotify_ready_waits_for_watches(dotconfigs_root, tmp_path):
+    """The inotify source's ready line waits for inotifywait's "Watches
+    established", which comes after backgrounding it returns."""
+    shim = tmp_path / "bin" / "inotifywait"
+    shim.parent.mkdir()
+    shim.write_text(
+        "#!/bin/sh\n"
+        "echo 'Setting up watches.' >&2\n"
+        "sleep 1\n"
+        "echo 'Watches established.' >&2\n"
+        "exec sleep 30\n"
+    )
+    shim.chmod(0o755)
+    (tmp_path / "paths").write_text(f"{tmp_path / 'home' / '.gitconfig'}\n")
+    (tmp_path / "home").mkdir()
+    script = f"""
+PLUGINS_DIR="{dotconfigs_root}/plugins"
+source "{dotconfigs_root}/lib/watch.sh"
+_watch_inotify_events "{tmp_path}/paths" &
+"""
+    env = {**os.environ, "PATH": f"{shim.parent}{os.pathsep}{os.environ['PATH']}"}
+    proc = subprocess.Popen(
+        ["bash", "-c", script + "wait"],
+        stdout=subprocess.PIPE,
+        env=env,
+        start_new_session=True,
+    )
+    try:
+        start = time.monotonic()
+        assert proc.stdout.readline() == b"\n"
+        assert time.monotonic() - start >= 0.9
+    finally:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()